@@ -1,155 +1,408 @@
 import streamlit as st
-import pandas as pd
-from io import BytesIO
-import tempfile
-import shutil
-from openpyxl import load_workbook
-import datetime as dt
-from docxtpl import DocxTemplate
+import os
+import sys
+from dataclasses import fields
+from types import MappingProxyType
 
+import numpy as np
+import pandas as pd
 
-# ─── 공통 로직: 노임단가 & 손해보험요율 로드 ───
-@st.cache_data
-def load_노임단가():
-    url = "https://docs.google.com/spreadsheets/d/e/2PACX-1vSlIUPyOxmtCRrXFqQKZ7Ge3um3xi5VCaua1OvyC27Y7vw5jqJhzbFpnTeb-fcxGS3_wNxuhnBddRl4/pub?output=csv"
-    df = pd.read_csv(url)
+import engine
+import export
+import pipeline
+import refdata
+import simulate
+import solver
+import store
+import sweep
+import wages
+from engine import 직급리스트
+
+
+# ─── 공통 로직: 기준자료 캐시 & 노임단가·손해보험요율 로드 ───
+@st.cache_resource
+def 기준자료() -> refdata.ReferenceCache:
+    # 프로세스당 한 번: 모든 기준자료를 동시에 읽고, 뒤에서 원본을 다시 확인한다
+    cache = refdata.ReferenceCache().prefetch()
+    cache.revalidate()
+    return cache
+
+# 기준자료 표는 프로세스마다 한 벌만 두고 모든 세션이 같은 객체를 읽기만 한다.
+# 세션 상태에는 참조만 넣으며, 화면·엑셀 쪽에서 제자리 수정하지 않는다.
+@st.cache_resource(max_entries=4)
+def _노임단가(version):
+    df = 기준자료().get("노임단가").copy()
     df.columns = [c.strip() for c in df.columns]
     return df
 
-@st.cache_data
+def load_노임단가():
+    return _노임단가(기준자료().version("노임단가"))
+
+@st.cache_resource(max_entries=4)
+def _노임단가_색인(version):
+    # 스냅샷 버전마다 한 번만 해석해 모든 세션·두 분야가 같이 쓴다
+    return engine.노임단가표.from_frame(기준자료().get("노임단가"))
+
+def load_노임단가_색인() -> engine.노임단가표:
+    return _노임단가_색인(기준자료().version("노임단가"))
+
+@st.cache_resource(max_entries=4)
+def _노임단가_이력(key):
+    # 이력 파일·노임단가 스냅샷 목록(key)이 바뀔 때만 다시 모은다
+    return wages.load(store=기준자료().store)
+
+def load_노임단가_이력() -> wages.노임단가이력:
+    return _노임단가_이력(wages.이력_키(store=기준자료().store))
+
 def load_손해보험요율():
-    url = "https://docs.google.com/spreadsheets/d/e/2PACX-1vRzdleYSG38-1FpxjoIkQbhWHbwY4himRBCO7LR8wWkCg0bnplhSTecIHNInZ-5NCjcjfuwmGotRFd_/pub?output=csv"
-    df = pd.read_csv(url)
-    return df
+    return 기준자료().get("손해보험요율")
+
+@st.cache_resource
+def 저장소() -> store.EstimateStore:
+    # 호출마다 연결을 여는 저장소라 모든 세션이 하나를 같이 쓴다
+    return store.EstimateStore()
+
+def 기준자료_버전(*names) -> dict:
+    return {name: 기준자료().version(name) for name in names}
+
+def 공유_객체() -> list:
+    """모든 세션이 함께 쓰는 기준자료와 공유 캐시·산출 결과 (세션 메모리에서 뺀다)."""
+    cache = 기준자료()
+    공유 = [cache.get(name) for name in refdata.SOURCES] + [load_노임단가(), load_노임단가_색인()]
+    return 공유 + [cache, export.artifacts, 저장소()] + pipeline.공유_객체()
+
+def 메모리_사용량(obj, 본것: set) -> int:
+    """
+    obj 가 붙잡고 있는 바이트 수(근사). 본것 에 든 id 의 객체는 세지 않으므로
+    공유 객체를 미리 넣어 두면 빠지고, 여러 곳에서 가리키는 객체는 한 번만 센다.
+    """
+    if id(obj) in 본것 or isinstance(obj, (type, type(sys))) or callable(obj):
+        return 0
+    본것.add(id(obj))
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return int(np.sum(obj.memory_usage(index=True, deep=True)))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, complex, bool, type(None))):
+        return size
+    if isinstance(obj, (dict, MappingProxyType)):
+        자식 = [*obj.keys(), *obj.values()]
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        자식 = list(obj)
+    else:
+        자식 = list(getattr(obj, "__dict__", {}).values())
+        for cls in type(obj).__mro__:
+            for slot in getattr(cls, "__slots__", ()):
+                if hasattr(obj, slot):
+                    자식.append(getattr(obj, slot))
+    return size + sum(메모리_사용량(c, 본것) for c in 자식)
+
+def 세션_메모리() -> pd.DataFrame:
+    """세션 상태 키별 메모리(KB). 공유 기준자료와 앞 키에서 이미 센 객체는 빠진다."""
+    본것 = {id(obj) for obj in 공유_객체()}
+    행 = [
+        (str(key), 메모리_사용량(value, 본것) / 1024)
+        for key, value in st.session_state.to_dict().items()
+    ]
+    return pd.DataFrame(행, columns=["키", "KB"]).sort_values("KB", ascending=False, ignore_index=True)
+
+def 기간_편집기(기간항목, key, on_submit):
+    """
+    기간 입력란을 폼 안의 표 하나로 그리고 {행 번호: 기간} 을 돌려준다.
+    표를 고치는 동안에는 다시 실행되지 않고, '기간 반영' 을 누를 때 모든 행이 한 번에 넘어온다.
+    기간항목이 None 인 행(기술인력 없음)은 표에 넣지 않는다.
+    """
+    행 = [i for i, 항목 in enumerate(기간항목) if 항목 is not None]
+    지문 = export.fingerprint(기간항목)
+    # 불러온 용역의 기간: (기간항목 지문, {행 번호: 기간}, 불러온 번호). 항목이 같을 때만 쓴다
+    복원 = st.session_state.get(f"{key}_복원")
+    복원값 = 복원[1] if 복원 is not None and 복원[0] == 지문 else None
+    표 = pd.DataFrame({
+        "업무": [기간항목[i][0] for i in 행],
+        "기간": [(복원값 or {}).get(i, 기간항목[i][1]) for i in 행],
+    })
+    # 산정기준이 바뀌어 항목이 달라지거나 용역을 불러오면 편집 내용도 새로 시작한다
+    편집키 = f"{key}_{지문[:12]}" + (f"_{복원[2]}" if 복원값 is not None else "")
+    with st.form(f"{key}_form"):
+        편집 = st.data_editor(
+            표,
+            key=편집키,
+            hide_index=True,
+            num_rows="fixed",
+            disabled=["업무"],
+            column_config={
+                "기간": st.column_config.NumberColumn(min_value=0, step=1, format="%d", required=True),
+            },
+        )
+        st.form_submit_button("✅ 기간 반영", on_click=on_submit)
+    return {i: int(v) for i, v in zip(행, 편집["기간"])}
+
+def 현재_요율(suffix: str = "") -> engine.내역서요율:
+    """내역서 탭에 입력한 요율. 아직 입력 전이면 기본값."""
+    기본 = engine.내역서요율()
+    return engine.내역서요율(**{
+        f.name: st.session_state.get(f"{f.name}{suffix}", getattr(기본, f.name))
+        for f in fields(engine.내역서요율)
+    })
+
+def 요율_기본값(suffix: str = ""):
+    """내역서 요율 입력란 기본값을 세션에 처음 한 번만 넣는다 (불러온 값은 그대로 둔다)."""
+    기본 = engine.내역서요율()
+    for f in fields(engine.내역서요율):
+        st.session_state.setdefault(f"{f.name}{suffix}", getattr(기본, f.name))
+
+def 면적_범위_입력(면적, 최소) -> np.ndarray:
+    """민감도 분석 폼의 면적 하한·상한·점 수 입력 → 등간격 면적 배열."""
+    면적 = 면적 or 10000.0   # 기초입력 전이면 1만㎡ 를 가운데로
+    c1, c2, c3 = st.columns(3)
+    하한 = c1.number_input("면적 하한 (㎡)", min_value=최소, value=max(최소, 면적 * 0.5), step=100.0)
+    상한 = c2.number_input("면적 상한 (㎡)", min_value=최소, value=max(최소, 면적 * 1.5, 하한), step=100.0)
+    점수 = c3.number_input("면적 점 수", min_value=2, max_value=5000, value=100, step=10)
+    return np.linspace(하한, max(하한, 상한), int(점수))
+
+def 민감도_결과(결과: pd.DataFrame):
+    """격자 산출 결과: 값이 여럿인 보기 열로 계열을 나눠 면적-도급예정액 선 그래프와 표."""
+    구분열 = [
+        c for c in 결과.columns
+        if c not in ("면적", "직접인건비", "도급예정액") and 결과[c].nunique() > 1
+    ]
+    if 구분열:
+        그래프 = 결과.assign(구분=결과[구분열].astype(str).agg(" · ".join, axis=1))
+        st.line_chart(그래프, x="면적", y="도급예정액", color="구분")
+    else:
+        st.line_chart(결과, x="면적", y="도급예정액")
+    st.caption(f"{len(결과):,}개 조합")
+    st.dataframe(
+        결과,
+        hide_index=True,
+        column_config={
+            c: st.column_config.NumberColumn(format="localized")
+            for c in ("면적", "직접인건비", "도급예정액")
+        },
+    )
+
+def 역산_폼(key: str, 도급예정액, 역산, 기간항목):
+    """목표 도급예정액과 바꿀 값 하나를 받아 solver 로 역산한 결과를 보여 준다."""
+    st.subheader("🎯 목표 금액 역산")
+    st.caption("목표 이하가 되는 가장 큰 값을 찾습니다. 나머지 입력은 지금 값을 그대로 씁니다.")
+    설명 = {"면적": "면적", "기간": "기간 (기술인력 행 같은 배율)", "제경비율": "제경비율 (110~120%)", "기술료율": "기술료율 (20~40%)"}
+    with st.form(f"{key}_form"):
+        목표 = st.number_input(
+            "목표 도급예정액 (원)", min_value=0, step=1_000_000,
+            value=int(도급예정액 or 100_000_000),
+        )
+        변수 = st.radio("바꿀 값", solver.변수목록, format_func=설명.get, horizontal=True)
+        제출 = st.form_submit_button("🎯 역산")
+    if 제출:
+        st.session_state[key] = 역산(float(목표), 변수)
+    결과 = st.session_state.get(key)
+    if 결과 is None:
+        return
+    if 결과.변수 == "면적":
+        값 = f"{결과.값:,.2f} ㎡"
+    elif 결과.변수 == "기간":
+        값 = f"× {np.floor(결과.값 * 1e4) / 1e4:.4f}"   # 반올림하면 기간이 한 칸 올라간 배율로 보인다
+    else:
+        값 = f"{결과.값:.3f} %"
+    c1, c2 = st.columns(2)
+    c1.metric(설명[결과.변수], 값)
+    c2.metric("도급예정액", f"{결과.도급예정액:,.0f}원", f"{결과.도급예정액 - 결과.목표:,.0f}원", delta_color="off")
+    if not 결과.도달:
+        st.warning("범위 안에서는 목표에 맞출 수 없어 범위 끝 값을 보여 줍니다.")
+    구간 = "" if 결과.구간 is None else f" · 환산계수 구간 {결과.구간[0]:,.0f}~{결과.구간[1]:,.0f} ㎡ 에서 찾음"
+    st.caption(f"엔진 평가 {결과.평가횟수}회{구간}")
+    if 결과.기간 is not None and 기간항목 is not None:
+        st.dataframe(
+            pd.DataFrame(
+                [(기간항목[i][0], v) for i, v in 결과.기간.items()],
+                columns=["업무", "기간"],
+            ),
+            hide_index=True,
+        )
+
+def 모의실험_폼(key: str, 요율: engine.내역서요율, 실행):
+    """기간 배율·제경비율·기술료율 분포를 받아 도급예정액 분포(P10/P50/P90, 히스토그램)를 보여 준다."""
+    st.subheader("🎲 금액 범위 모의실험")
+    st.caption("기간(행마다 배율, 일·회 단위 반올림)과 요율을 분포에서 뽑아 도급예정액 분포를 구합니다.")
+    이름표 = {"기간배율": "기간 배율", "제경비율": "제경비율 (%)", "기술료율": "기술료율 (%)"}
+    with st.form(f"{key}_form"):
+        표본수 = st.select_slider(
+            "표본 수", [10_000, 100_000, 200_000, 500_000, 1_000_000], value=200_000,
+            format_func=lambda n: f"{n:,}",
+        )
+        분포들 = {}
+        for 이름, 기본 in simulate.기본_분포(요율).items():
+            c0, c1, c2, c3 = st.columns([2, 1, 1, 1])
+            종류 = c0.selectbox(이름표[이름], simulate.분포종류, index=simulate.분포종류.index(기본.종류), key=f"{key}_{이름}_종류")
+            하한 = c1.number_input("하한", value=float(기본.하한), key=f"{key}_{이름}_하한")
+            최빈 = c2.number_input("최빈값", value=float(기본.최빈), key=f"{key}_{이름}_최빈")
+            상한 = c3.number_input("상한", value=float(기본.상한), key=f"{key}_{이름}_상한")
+            분포들[이름] = (종류, 하한, 최빈, 상한)
+        제출 = st.form_submit_button("🎲 모의실험")
+    if 제출:
+        try:
+            st.session_state[key] = 실행({k: simulate.분포(*v) for k, v in 분포들.items()}, 표본수)
+        except ValueError as e:
+            st.error(str(e))
+    결과 = st.session_state.get(key)
+    if 결과 is None:
+        return
+    for col, (이름, 값) in zip(st.columns(len(결과.분위수)), 결과.분위수.items()):
+        col.metric(이름, f"{값:,.0f}원")
+    도수, 경계 = 결과.히스토그램
+    st.bar_chart(
+        pd.DataFrame({"도급예정액": (경계[:-1] + 경계[1:]) / 2, "표본 수": 도수}),
+        x="도급예정액", y="표본 수",
+    )
+    st.caption(f"표본 {결과.표본수:,}개 · 평균 {결과.평균:,.0f}원")
+
+def 노임단가_이력_표(분야: str):
+    """적용일마다의 노임단가를 직종명 × 적용일 표로 보여 준다."""
+    try:
+        이력 = load_노임단가_이력()
+    except FileNotFoundError as e:
+        st.info(str(e))
+        return
+    try:
+        표 = 이력.to_frame().xs(분야, level="분야")["단가"].unstack("적용일").rename(columns=str)
+    except KeyError:
+        st.warning(f"노임단가 이력에 '{분야}' 단가가 없습니다")
+        return
+    st.dataframe(표, column_config={c: st.column_config.NumberColumn(format="localized") for c in 표.columns})
+    st.caption(" · ".join(f"{d}: {출처}" for d, 출처 in zip(이력.적용일, 이력.출처)))
+
+def 연도별_단가(분야: str, 기준결과, 기간값, 요율: engine.내역서요율, key: str):
+    """지금 산정기준을 이력의 모든 적용일 단가로 다시 합산하고, 다년 계약의 연차별 금액을 구한다."""
+    st.subheader("📅 연도별 노임단가")
+    st.caption("지금 산정기준의 투입인원을 적용일마다의 노임단가로 한 번에 다시 합산합니다. 기간·요율은 지금 값을 씁니다.")
+    if 기준결과 is None:
+        st.info("산정기준이 산출되면 표시됩니다.")
+        return
+    try:
+        이력 = load_노임단가_이력()
+    except FileNotFoundError as e:
+        st.info(str(e))
+        return
+    금액열 = {c: st.column_config.NumberColumn(format="localized") for c in ("직접인건비", "도급예정액")}
+    try:
+        표 = wages.시점별(분야, 기준결과, 기간값, 이력, 요율)
+    except KeyError as e:
+        # 어떤 적용일 시트에 이 분야·직급 단가가 없으면 그 이력으로는 다시 합산할 수 없다
+        st.warning(e.args[0])
+        return
+    표["증감률(%)"] = (표["도급예정액"] / 표["도급예정액"].iloc[-1] - 1) * 100
+    c1, c2 = st.columns([3, 2])
+    c1.dataframe(표, hide_index=True, column_config={**금액열, "증감률(%)": st.column_config.NumberColumn(format="%.2f")})
+    c2.line_chart(표.assign(적용일=pd.to_datetime(표["적용일"])), x="적용일", y="도급예정액")
+
+    with st.form(f"{key}_form"):
+        c1, c2 = st.columns(2)
+        착수일 = c1.date_input("착수일", key=f"{key}_착수일")
+        연차수 = c2.number_input("연차 수", min_value=1, max_value=10, value=3, step=1, key=f"{key}_연차수")
+        제출 = st.form_submit_button("📅 연차별 산출")
+    if 제출:
+        날짜 = [(pd.Timestamp(착수일) + pd.DateOffset(years=n)).date() for n in range(int(연차수))]
+        try:
+            결과 = wages.시점별(분야, 기준결과, 기간값, 이력, 요율, 날짜)
+        except KeyError as e:
+            st.warning(e.args[0])
+        else:
+            결과.insert(0, "연차", range(1, len(결과) + 1))
+            st.session_state[key] = 결과
+    결과 = st.session_state.get(key)
+    if 결과 is not None:
+        st.caption("연차마다 그 해 착수일에 적용되는 노임단가로 전체 과업을 산출한 금액입니다.")
+        st.dataframe(결과, hide_index=True, column_config=금액열)
+
+def 저장소_탭(분야: str, 설계유형들, 저장할_수_있음: bool, 저장, 불러오기):
+    """저장된 용역 탭: 지금 용역 저장, 발주기관·설계유형·저장일·금액으로 검색, 불러오기."""
+    db = 저장소()
+    st.button("💾 지금 용역 저장", key=f"{분야}_저장", on_click=저장, disabled=not 저장할_수_있음)
+    if not 저장할_수_있음:
+        st.caption("※ 내역서 탭에서 산출 완료 후 저장할 수 있습니다.")
+    알림 = st.session_state.pop(f"{분야}_저장소_알림", None)
+    if 알림:
+        st.success(알림)
+
+    st.subheader("🔍 저장된 용역 찾기")
+    with st.form(f"{분야}_검색_form"):
+        c1, c2 = st.columns(2)
+        기관 = c1.selectbox("발주기관명", ["(전체)", *db.발주기관목록(분야)])
+        유형 = c2.selectbox("설계유형", ["(전체)", *설계유형들])
+        용역명 = c1.text_input("용역명 (일부)")
+        저장일 = c2.date_input("저장일", value=(), format="YYYY-MM-DD")
+        최소금액 = c1.number_input("도급예정액 하한 (원)", min_value=0, value=0, step=10_000_000)
+        최대금액 = c2.number_input("도급예정액 상한 (원, 0 = 제한 없음)", min_value=0, value=0, step=10_000_000)
+        st.form_submit_button("🔍 검색")
+
+    결과 = db.search(
+        분야=분야,
+        발주기관명=None if 기관 == "(전체)" else 기관,
+        설계유형=None if 유형 == "(전체)" else 유형,
+        용역명=용역명,
+        시작일=저장일[0] if len(저장일) > 0 else None,
+        종료일=저장일[-1] if len(저장일) > 0 else None,
+        최소금액=최소금액 or None,
+        최대금액=최대금액 or None,
+    )
+    if 결과.empty:
+        st.info("조건에 맞는 저장된 용역이 없습니다.")
+        return
+    st.dataframe(
+        결과.drop(columns=["분야"]),
+        hide_index=True,
+        column_config={
+            열: st.column_config.NumberColumn(format="localized")
+            for 열 in ("면적", "직접인건비", "도급예정액")
+        },
+    )
+    이름 = dict(zip(결과["id"], 결과["용역명"] + " · " + 결과["발주기관명"] + " · " + 결과["저장일시"]))
+    선택 = st.selectbox("불러올 용역", list(이름), format_func=이름.get, key=f"{분야}_불러올_용역")
+    c1, c2 = st.columns(2)
+    c1.button("📂 불러오기", key=f"{분야}_불러오기", on_click=불러오기, args=(선택,))
+    if c2.button("🗑️ 삭제", key=f"{분야}_삭제"):
+        db.delete(선택)
+        st.rerun()
 
 # ─── 조경 전용 처리 ───
 def run_조경():
     st.title("🌿 조경 설계 대가 산출 프로그램")
 
-    직급리스트 = ["기술사", "특급기술자", "고급기술자", "중급기술자", "초급기술자"]
-    # 조경 전용 글로벌 데이터
-    난이도_map = {
-        "도시공원": [
-            "단순 (소공원·묘지공원·보행자 전용도로·광장·도시공원 내 시설 교체사업)",
-            "보통 (국가도시공원·근린공원·체육공원·수변공원·도시농업공원·유원지·공공공지·광장(재생사업))",
-            "복잡1 (어린이공원·문화공원·역사공원·방재공원)",
-            "복잡2 (도시공원(재생사업))",
-        ],
-        "공동주택 및 대지의 조경": [
-            "보통 (공동주택 조경)",
-            "복잡1 (주택정원·건축물 조경·옥상조경(옥상정원))",
-            "복잡2 (실내조경(실내정원))",
-        ],
-        "녹지 및 도시숲": [
-            "단순 (완충 녹지·가로변 녹지·가로수·경관숲)",
-            "보통 (연결 녹지·경관 녹지·유휴지 녹화·마을숲·유아숲체험원)",
-            "복잡 (가로변 녹지(정원형)·학교숲·도시숲)",
-        ],
-        "주제형 사업": [
-            "단순 (야영장·둘레길·하천 경관 개선, 생태통로, 숲길조성)",
-            "보통 (테마시설 조성·관광지·관광지 활성화 사업·가로 환경개선 등)",
-            "복잡 (관광단지·동물원·골프장·스키장·2종 이상 복합 사업)",
-        ],
-    }
-
-    성격_coeffs = {
-        "도시공원":               1.0,
-        "공동주택 및 대지의 조경": 1.1,
-        "녹지 및 도시숲":          0.8,
-        "주제형 사업":             1.2,
-    }
-
-    난이도_coeffs = {
-        "도시공원": {"단순": 0.9, "보통": 1.0, "복잡1": 1.1, "복잡2": 1.2},
-        "공동주택 및 대지의 조경": {"보통": 1.0, "복잡1": 1.1, "복잡2": 1.2},
-        "녹지 및 도시숲": {"단순": 0.9, "보통": 1.0, "복잡": 1.1},
-        "주제형 사업": {"단순": 0.9, "보통": 1.0, "복잡": 1.1},
-    }
+    # 세션별 산출 그래프: 바뀐 입력에서 닿는 단계만 다시 계산한다
+    pipe = st.session_state.setdefault("pipeline_조경", pipeline.조경())
 
+    난이도_map = engine.난이도_map
 
-    @st.cache_data
     def load_조경_기준(설계유형):
-        urls = {
-            "기본설계": "https://docs.google.com/spreadsheets/d/e/2PACX-1vSffous-aCPOAcKkizEiELMpZVECskizIxlP2Vn_eHTfLnviFFCn0S1fAZPy0OkFLE508TspBu9VuuV/pub?output=csv",
-            "실시설계": "https://docs.google.com/spreadsheets/d/e/2PACX-1vSRBhcxu6BMlio-obyGAj44PhEP07BPAFC9l53gad1TqZPgQyAkj289qqshKNFQ1jHYYtIrWlO9wKOm/pub?output=csv",
-            "기본 및 실시설계": "https://docs.google.com/spreadsheets/d/e/2PACX-1vTcmEUxkny-pnOAPFvb67DH-MpINOZY6PqCGz9m6U3DUzFcTeqgd7Mvm7Ss1_m7i0RYE4locXoE1HuK/pub?output=csv"
-        }
-        return pd.read_csv(urls.get(설계유형, urls["기본설계"]))
-
-    # 조경 전용 템플릿 엑셀 생성 함수
-    def build_조경_excel(template_path="template_조경.xlsx") -> BytesIO:
-        # 1) 템플릿 복사
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx")
-        tmp.close()
-        try:
-            shutil.copy(template_path, tmp.name)
-        except FileNotFoundError:
+        if 설계유형 not in engine.조경_설계유형:
+            설계유형 = "기본설계"
+        return 기준자료().get(f"조경_{설계유형}")
+
+    # 조경 전용 템플릿 엑셀: 지금 값만 잡아 두고, 다운로드를 누를 때 만든다
+    def build_조경_excel(template_path="template_조경.xlsx"):
+        if not os.path.exists(template_path):
             st.error(f"템플릿 파일을 찾을 수 없습니다: {template_path}")
             return None
-
-        # 2) 갑지 시트에 기본 정보 채우기
-        wb = load_workbook(tmp.name)
-        ws = wb["갑지"]
-        ws["D10"].value = st.session_state.get("용역명", "")
-        ws["G22"].value = st.session_state.get("발주기관명", "")
-        raw = st.session_state.get("도급예정액", 0)
-        ws["G20"].value = f"{int(raw // 1000) * 1000:,} 원"
-        ws["A1"].value = dt.date.today().strftime("%Y-%m-%d")
-        wb.save(tmp.name)
-
-        # 3) 나머지 시트(overwrite) – pandas ExcelWriter 사용
-        with pd.ExcelWriter(tmp.name, engine="openpyxl", mode="a", if_sheet_exists="overlay") as writer:
-            # A) 내역서
-            df_detail = st.session_state.get("df_detail", pd.DataFrame())
-            if not df_detail.empty:
-                df_detail.to_excel(writer,
-                                sheet_name="내역서",
-                                index=False,
-                                header=False,
-                                startrow=2)
-
-            # B) 투입인원 및 내역
-            df_person = st.session_state.get("투입인원DF", pd.DataFrame())
-            if not df_person.empty:
-                df_person.to_excel(writer,
-                                sheet_name="투입인원 및 내역",
-                                index=False,
-                                header=False,
-                                startrow=2)
-
-            # C) 투입인원수 산정기준
-            df_basis = st.session_state.get("기준계산결과", pd.DataFrame())
-            if not df_basis.empty:
-                df_basis.to_excel(writer,
-                                sheet_name="투입인원수 산정기준",
-                                index=False,
-                                header=False,
-                                startrow=2)
-
-            # D) 노임단가
-            df_wage = st.session_state.get("최종_단가", pd.DataFrame())
-            if not df_wage.empty:
-                df_wage.to_excel(writer,
-                                sheet_name="노임단가",
-                                index=False,
-                                header=False,
-                                startrow=2)
-
-            # E) 손해보험요율
-            df_ins = st.session_state.get("보험요율DF", pd.DataFrame())
-            if not df_ins.empty:
-                df_ins.to_excel(writer,
-                                sheet_name="손해보험요율",
-                                index=False,
-                                header=False,
-                                startrow=2)
-
-        # 4) 최종 BytesIO에 담아서 반환
-        buf = BytesIO()
-        with open(tmp.name, "rb") as f:
-            buf.write(f.read())
-        buf.seek(0)
-        return buf
+        인자 = dict(
+            용역명=st.session_state.get("용역명", ""),
+            발주기관명=st.session_state.get("발주기관명", ""),
+            도급예정액=st.session_state.get("도급예정액", 0),
+            sheets={
+                "내역서": st.session_state.get("df_detail"),
+                "투입인원 및 내역": st.session_state.get("투입인원DF"),
+                "노임단가": st.session_state.get("최종_단가"),
+                "손해보험요율": st.session_state.get("보험요율DF"),
+            },
+        )
+        기준결과 = st.session_state.get("기준계산결과")
+
+        def 엑셀():
+            # 산정기준 표는 내려받을 때만 DataFrame 으로 펼친다
+            if 기준결과 is not None:
+                인자["sheets"]["투입인원수 산정기준"] = 기준결과.to_frame()
+            return export.excel_bytes(template_path, **인자)
+        return 엑셀
     (
         tab_기초입력,
         tab_갑지,
@@ -157,7 +410,9 @@ def run_조경():
         tab_투입인원및내역,
         tab_산정기준,
         tab_노임단가,
-        tab_손해보험요율
+        tab_손해보험요율,
+        tab_민감도,
+        tab_저장소,
     ) = st.tabs([
         "기초입력",
         "갑지",
@@ -165,7 +420,9 @@ def run_조경():
         "투입인원 및 내역",
         "투입인원수 산정기준",
         "노임단가",
-        "보험요율"
+        "보험요율",
+        "민감도 분석",
+        "저장된 용역",
     ])
 
     with tab_기초입력:
@@ -175,13 +432,13 @@ def run_조경():
         발주기관명 = st.text_input("발주기관명", value=st.session_state.get("발주기관명", ""))
         st.session_state["발주기관명"] = 발주기관명
         
-        options = ["기본설계", "실시설계", "기본 및 실시설계"]
+        # 키가 있는 위젯은 기본값을 세션에 먼저 넣고 value·index 없이 그린다 (불러오기가 키를 채운다)
+        options = engine.조경_설계유형
         current = st.session_state.get("설계유형", "기본설계")
-        index = options.index(current) if current in options else 0
+        st.session_state.setdefault("설계유형_radio", current if current in options else options[0])
         설계유형 = st.radio(
             "설계유형을 선택하세요",
             options,
-            index=index,
             key="설계유형_radio"
         )
         st.session_state["설계유형"] = 설계유형    
@@ -191,12 +448,7 @@ def run_조경():
                         value=st.session_state.get("면적",100.0))
         st.session_state["면적"] = 면적
 
-        성격_options = [
-            "도시공원",
-            "공동주택 및 대지의 조경",
-            "녹지 및 도시숲",
-            "주제형 사업"
-        ]
+        성격_options = engine.성격_options
         default_성격 = st.session_state.get("대상지_성격", "도시공원")
         if default_성격 not in 성격_options:                 
                 default_성격 = "도시공원"
@@ -209,20 +461,18 @@ def run_조경():
         st.session_state["대상지_성격"] = 대상지_성격
 
         options_nd = 난이도_map.get(대상지_성격, ["단순","보통","복잡"])
-        prev_nd    = st.session_state.get("난이도", options_nd[0])
-        if prev_nd not in options_nd:
-            prev_nd = options_nd[0]
+        if st.session_state.get("난이도") not in options_nd:
+            st.session_state["난이도"] = options_nd[0]
 
         난이도 = st.selectbox(
             "업무 난이도",
             options_nd,
-            index=options_nd.index(prev_nd),
             key="난이도"
         )
 
         전단계_활용 = st.checkbox(
             "기본계획 등 설계에 활용할 전 단계 성과물이 있습니까?", 
-            value=False
+            value=st.session_state.get("전단계_활용", False)
         )
         st.session_state["전단계_활용"] = 전단계_활용
 
@@ -240,7 +490,82 @@ def run_조경():
 
             st.rerun()
 
-    with tab_갑지:
+    # 갑지·내역서·투입인원 탭은 각각 조각(fragment)이라 탭 안 입력은 그 탭만 다시 그린다.
+    # 탭 사이 값은 session_state 와 pipe 로만 넘기고, 아래 콜백이 영향받는 탭을 함께 다시 그린다.
+    # 기간은 표 단위로 제출되므로 표 하나를 고칠 때 한 번만 다시 그린다.
+    def _기간_변경():
+        st.rerun(["조경_투입인원", "조경_내역서", "조경_갑지"])
+
+    def _산출_완료():
+        # 함께 다시 그리는 갑지 탭이 새 값을 보도록 도급예정액을 콜백에서 먼저 저장한다
+        pipe.set(요율=engine.내역서요율(
+            *(st.session_state[k] for k in ("제경비율", "직접경비", "기술료율", "공제율", "부가세율"))
+        ))
+        st.session_state["도급예정액"] = pipe.get("도급예정액")
+        st.rerun(["조경_내역서", "조경_갑지"])
+
+    def _저장():
+        설계유형 = st.session_state["설계유형"]
+        inputs = engine.조경입력(
+            설계유형, *(pipe.input(k) for k in ("면적", "대상지_성격", "난이도", "전단계_활용", "기간", "요율"))
+        )
+        est = engine.Estimate(pipe.get("산정기준"), *pipe.get("투입인원"), *pipe.get("내역서"))
+        id = 저장소().save(
+            "조경", st.session_state.get("용역명", ""), st.session_state.get("발주기관명", ""),
+            inputs, est, 기준자료_버전(f"조경_{설계유형}", "노임단가"),
+        )
+        st.session_state["조경_저장소_알림"] = f"저장했습니다 (번호 {id}, 도급예정액 {est.도급예정액:,.0f}원)."
+
+    def _불러오기(id):
+        # 위젯이 그려지기 전에 입력값·결과를 넣고, pipe 에는 저장된 결과를 그대로 넣는다
+        항목 = 저장소().load(id)
+        inputs, est = 항목.inputs, 항목.estimate
+        기간항목 = engine.기간항목_조경(est.기준계산결과)
+        번호 = st.session_state.get("기간_조경_복원", (None, None, 0))[2] + 1
+        st.session_state.update({
+            "용역명": 항목.용역명,
+            "발주기관명": 항목.발주기관명,
+            "설계유형": inputs.설계유형,
+            "설계유형_radio": inputs.설계유형,
+            "면적": inputs.면적,
+            "대상지_성격": inputs.대상지_성격,
+            "난이도": inputs.난이도,
+            "전단계_활용": inputs.전단계_활용,
+            "기간_조경_복원": (export.fingerprint(기간항목), inputs.기간 or {}, 번호),
+            **{f.name: getattr(inputs.요율, f.name) for f in fields(engine.내역서요율)},
+        })
+        pipe.set(
+            기준표=load_조경_기준(inputs.설계유형),
+            면적=inputs.면적,
+            대상지_성격=inputs.대상지_성격,
+            난이도=inputs.난이도,
+            전단계_활용=inputs.전단계_활용,
+            노임단가=load_노임단가_색인(),
+            기간=inputs.기간 or {},
+            요율=inputs.요율,
+        )
+        if 항목.기준자료 == 기준자료_버전(*항목.기준자료):
+            pipe.restore(
+                산정기준=est.기준계산결과,
+                투입인원=(est.투입인원DF, est.직접인건비),
+                내역서=(est.df_detail, est.도급예정액),
+            )
+            st.session_state.update({
+                "기준계산결과": est.기준계산결과,
+                "투입인원DF": est.투입인원DF,
+                "직접인건비": est.직접인건비,
+                "df_detail": est.df_detail,
+                "도급예정액": est.도급예정액,
+            })
+            알림 = f"‘{항목.용역명}’ 을 불러왔습니다 (저장일시 {항목.저장일시})."
+        else:
+            # 기준자료가 바뀌었으면 저장된 결과 대신 지금 기준자료로 다시 산출한다
+            st.session_state.pop("도급예정액", None)
+            알림 = f"‘{항목.용역명}’ 의 입력값을 불러왔습니다. 기준자료가 저장 당시와 달라 다시 산출합니다."
+        st.session_state["조경_저장소_알림"] = 알림
+
+    @st.fragment(key="조경_갑지")
+    def 갑지_탭():
         import datetime
         today = datetime.date.today().strftime("%Y-%m-%d")
 
@@ -255,7 +580,7 @@ def run_조경():
             st.info("먼저 ‘내역서’ 탭에서 **산출 완료✅** 버튼을 눌러 금액을 확정하세요.")
         else:
             raw        = st.session_state["도급예정액"]
-            용역비      = int(raw // 1000) * 1000   
+            용역비      = engine.용역비(raw)
             st.write(f"**용역비:** {용역비:,.0f} 원")
 
         발주기관 = st.session_state.get("발주기관명", "")
@@ -263,16 +588,21 @@ def run_조경():
 
         if "도급예정액" in st.session_state and st.session_state["도급예정액"] > 0:
             excel_buf = build_조경_excel("template.xlsx")
-            st.download_button(
-                label="⬇️ 산출내역서(Excel) 다운로드",
-                data=excel_buf,
-                file_name=f"{st.session_state['용역명']}_조경설계 내역서.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+            if excel_buf is not None:
+                st.download_button(
+                    label="⬇️ 산출내역서(Excel) 다운로드",
+                    data=excel_buf,
+                    file_name=f"{st.session_state['용역명']}_조경설계 내역서.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                )
         else:
             st.caption("※ 산출 완료 후 버튼이 활성화됩니다.")
 
-    with tab_내역서:
+    with tab_갑지:
+        갑지_탭()
+
+    @st.fragment(key="조경_내역서")
+    def 내역서_탭():
         st.header("내역서")
         st.caption("※ 각 숫자를 수정한 뒤 **Enter** 를 눌러야 계산이 반영됩니다.")
 
@@ -280,45 +610,32 @@ def run_조경():
         if 직접인건비 is None:
             st.warning("먼저 ‘투입인원 및 내역’ 탭에서 직접인건비를 계산해 주세요.")
         else:
-            제경비율   = st.number_input("제경비율 (110~120%)",     value=110.0, step=0.1)
-            직접경비   = st.number_input("직접경비 금액 (원)", value=5_000_000, step=1_000)
-            기술료율   = st.number_input("기술료율 (20~40%)",     value=20.0, step=0.1)
-            공제율    = st.number_input("손해공제비율 (관람집회공사,0.432적용)",   value=0.432, step=0.001)
-            부가세율   = st.number_input("부가가치세율 (%)",   value=10.0, step=0.1)
-
-            제경비     = 직접인건비 * 제경비율   / 100
-            기술료     = (직접인건비 + 제경비) * 기술료율 / 100
-            손해공제비 = (직접인건비 + 제경비 + 직접경비 + 기술료) * 공제율   / 100
-            부가세     = (직접인건비 + 제경비 + 직접경비 + 기술료 + 손해공제비) * 부가세율 / 100
-            도급예정액  = 직접인건비 + 제경비 + 직접경비 + 기술료 + 손해공제비 + 부가세
-
-            if st.button("✅ 산출 완료"):
-                st.session_state["도급예정액"] = 도급예정액
+            요율_기본값()
+            제경비율   = st.number_input("제경비율 (110~120%)",     step=0.1, key="제경비율")
+            직접경비   = st.number_input("직접경비 금액 (원)", step=1_000, key="직접경비")
+            기술료율   = st.number_input("기술료율 (20~40%)",     step=0.1, key="기술료율")
+            공제율    = st.number_input("손해공제비율 (관람집회공사,0.432적용)",   step=0.001, key="공제율")
+            부가세율   = st.number_input("부가가치세율 (%)",   step=0.1, key="부가세율")
+
+            pipe.set(요율=engine.내역서요율(제경비율, 직접경비, 기술료율, 공제율, 부가세율))
+            df, 도급예정액 = pipe.get("내역서")
+
+            if st.button("✅ 산출 완료", on_click=_산출_완료):
                 st.success(f"도급예정액 {도급예정액:,.0f}원이 저장되었습니다.")
             else:
                 st.info("▶️ 값이 맞다면 ‘✅ 산출 완료’ 버튼을 눌러 주세요.")
 
-            rows = [
-                {"공종":"직접인건비", "규격":"-",         "수량":"-", "단위":"", "총액":직접인건비, "노무비":직접인건비, "경비":"",        "비고":""},
-                {"공종":"제경비",     "규격":"직접인건비×율", "수량":"-", "단위":"", "총액":"",    "노무비":"",        "경비":제경비,    "비고":f"{제경비율}%"},
-                {"공종":"직접경비",   "규격":"제출도서 인쇄",   "수량":1,   "단위":"식", "총액":"",    "노무비":"",        "경비":직접경비,  "비고":""},
-                {"공종":"기술료",     "규격":"(직접인건비+제경비)×율","수량":"-", "단위":"", "총액":"",    "노무비":"",        "경비":기술료,    "비고":f"{기술료율}%"},
-                {"공종":"손해공제비", "규격":"용역비×율",      "수량":"-", "단위":"", "총액":"",    "노무비":"",        "경비":손해공제비,"비고":f"{공제율}"},
-                {"공종":"부가가치세", "규격":"합계×율",       "수량":"-", "단위":"", "총액":"",    "노무비":"",        "경비":부가세,    "비고":f"{부가세율}%"},
-                {"공종":"도급예정액","규격":"",             "수량":"-", "단위":"", "총액":도급예정액,"노무비":"",        "경비":"",        "비고":""},
-            ]
-            df = pd.DataFrame(rows)
-
-            for c in ["총액","노무비","경비"]:
-                df[c] = df[c].apply(lambda x: f"{int(x):,}" if isinstance(x,(int,float)) else x)
-
             st.dataframe(df[[
                 "공종","규격","수량","단위",
                 "총액","노무비","경비","비고"
             ]])
             st.session_state["df_detail"] = df
 
-    with tab_투입인원및내역:
+    with tab_내역서:
+        내역서_탭()
+
+    @st.fragment(key="조경_투입인원")
+    def 투입인원_탭():
         st.header("투입인원 및 내역")
 
         기준결과    = st.session_state.get("기준계산결과")
@@ -327,104 +644,12 @@ def run_조경():
         if 기준결과 is None or 노임단가_df is None:
             st.warning("먼저 '투입인원수 산정기준'과 '노임단가' 탭을 완료해주세요.")
         else:
-            결과표 = 기준결과.copy()
-            결과표 = 결과표[결과표["단위"] != ""].reset_index(drop=True)
-            for 직급 in 직급리스트:
-                결과표[직급] = pd.to_numeric(결과표[직급], errors='coerce').fillna(0.0)
-
-            횟수_키워드 = ["위원회 심의", "주민설명회", "관계기관 협의"]
-            기간값 = {}
-            n = len(결과표)
-            half = (n + 1) // 2
-            left, right = st.columns(2)
-
-            with left:
-                for idx, row in 결과표.iloc[:half].iterrows():
-                    업무 = row["업무구분"]
-                    단위 = row["단위"].strip()  # 단위 칼럼 읽어오기
-
-                    if 단위 == "식":
-                        기본값 = 1
-                        라벨 = f"{업무} (식)"
-
-                    elif any(kw in 업무 for kw in 횟수_키워드):
-                        if "주민설명회" in 업무:
-                            기본값 = 2
-                        else:
-                            기본값 = 1
-                        라벨 = f"{업무} (회)"
-
-                    else:
-                        기본값 = 2
-                        라벨 = f"{업무} 기간 (일)"
-
-                    값 = st.number_input(
-                    라벨,
-                    min_value=0,
-                    step=1,
-                    value=int(st.session_state.get(f"기간_{idx}", 기본값)),
-                    key=f"기간_=L_{idx}"
-                    )
-                    기간값[idx] = 값
-
-            with right:
-                for idx, row in 결과표.iloc[half:].iterrows():
-                    업무 = row["업무구분"]
-                    단위 = row["단위"].strip()  
-                    if 단위 == "식":
-                        기본값 = 1
-                        라벨 = f"{업무} (식)"
-                    else:
-                        기본값 = 2
-                        라벨 = f"{업무} 기간 (일)"
-
-                    값 = st.number_input(
-                    라벨,
-                    min_value=0,
-                    step=1,
-                    value=int(st.session_state.get(f"기간_{idx}", 기본값)),
-                    key=f"기간_=L_{idx}"
-                    )
-                    기간값[idx] = 값
-
-            결과표["기간"] = [기간값[i] for i in range(n)]
-
-            노임단가_df.columns   = [c.strip() for c in 노임단가_df.columns]
-            노임단가_df["직종명"] = 노임단가_df["직종명"].astype(str).str.strip()
-            노임단가_df["건설"]   = (
-                노임단가_df["건설"]
-                .astype(str)
-                .str.replace(",", "")
-                .str.strip()
-                .astype(float)
-            )
-            직급리스트 = ["기술사","특급기술자","고급기술자","중급기술자","초급기술자"]
-            건설단가 = {}
-            for 직급 in 직급리스트:
-                sub = 노임단가_df[노임단가_df["직종명"] == 직급]
-                건설단가[직급] = float(sub["건설"].iloc[0]) if not sub.empty else 0.0
-
-
-            계산된_계 = []
-            for _, row in 결과표.iterrows():
-                인건비합 = sum(row[직급] * 건설단가[직급] for 직급 in 직급리스트)
-                계산된_계.append(round(인건비합 * row["기간"], 2))
-            결과표["계"] = 계산된_계
-
-            표시열   = ["업무구분","계"] + 직급리스트 + ["기간"]
-            sum_계   = 결과표["계"].sum()
-            총계행    = {c: "" for c in 표시열}
-            총계행["업무구분"] = "총계"
-            총계행["계"]    = sum_계
-            total_df = pd.DataFrame([총계행])
-            final_df = pd.concat([total_df, 결과표[표시열]], ignore_index=True)
-
-            for c in ["계","기간"] + 직급리스트:
-                final_df[c] = final_df[c].apply(
-                    lambda x: f"{x:,.2f}" if isinstance(x, (int, float)) else x
-                )
+            pipe.set(노임단가=load_노임단가_색인())
+            기간항목 = pipe.get("기간항목")
+            기간값 = 기간_편집기(기간항목, "기간_조경", _기간_변경)
 
-            sum_계 = 결과표["계"].sum()
+            pipe.set(기간=기간값)
+            final_df, sum_계 = pipe.get("투입인원")
 
             st.session_state["직접인건비"] = sum_계
 
@@ -433,6 +658,9 @@ def run_조경():
             st.subheader("📊 기술자별 투입 인원 및 총액")
             st.dataframe(final_df)
 
+    with tab_투입인원및내역:
+        투입인원_탭()
+
     with tab_산정기준:
         st.header("투입인원수 산정기준")
 
@@ -442,59 +670,19 @@ def run_조경():
         성격        = st.session_state.get("대상지_성격")
         전단계_활용  = st.session_state.get("전단계_활용", False)
 
-        if 설계유형 in ["기본설계", "실시설계", "기본 및 실시설계"]:
-            기준표 = load_조경_기준(설계유형).copy()
-            for 직급 in 직급리스트:
-                기준표[직급] = pd.to_numeric(기준표[직급], errors="coerce").fillna(0.0)
-            if 면적 <= 5000:
-                환산계수 = (대상_면적 / 5000) ** 0.7
-            else:
-                환산계수 = (대상_면적 / 5000) ** 0.4
-            full_nd_label = st.session_state.get("난이도", "")
-            diff_key = full_nd_label.split()[0] if full_nd_label else ""
-            a2 = 성격_coeffs.get(성격, 1.0)
-            a3 = 난이도_coeffs.get(성격, {}).get(diff_key, 1.0)
-
-            for 직급 in 직급리스트:
-                계산값, 계산식 = [], []
-                for _, row in 기준표.iterrows():
-                    base = row[직급]
-                    v = base
-                    parts = []
-
-                    if row["환산계수(α₁)"] == "적용":
-                        v *= 환산계수; parts.append(f"{환산계수:.3f}")
-
-                    if row["보정계수(α₂, α₃)"] == "적용" and row["업무구분"] not in ["조사", "기술협의"]:
-                        v *= a2 * a3
-                        parts.append(f"{a2:.3f}")  # 성격계수
-                        parts.append(f"{a3:.3f}")  # 난이도계수
-
-
-                    if 전단계_활용:
-                        first_token = str(row["업무구분"]).strip().split()[0]
-                        if first_token.startswith("2.1"):        
-                            v *= 0.7
-                            parts.append("0.700")
-
-                    formula = f"{base} × " + " × ".join(parts) if parts else f"{base} (고정)"
-                    계산값.append(round(v,2)); 계산식.append(formula)
-                기준표[직급] = 계산값
-                기준표[f"{직급}_계산식"] = 계산식
-
-            기준표 = 기준표.fillna("") 
-
-            for 직급 in 직급리스트:
-                calc_col = f"{직급}_계산식"
-                if calc_col in 기준표.columns:
-                    기준표[calc_col] = 기준표[calc_col].str.replace(r"\s*\(고정\)", "", regex=True)
-            mask = 기준표['단위'] == ""
-            cols = 직급리스트 + [f"{j}_계산식" for j in 직급리스트]
-            기준표.loc[mask, cols] = ""
+        if 설계유형 in engine.조경_설계유형:
+            pipe.set(
+                기준표=load_조경_기준(설계유형),
+                면적=대상_면적,
+                대상지_성격=성격,
+                난이도=st.session_state.get("난이도", ""),
+                전단계_활용=전단계_활용,
+            )
+            기준표 = pipe.get("산정기준")
 
             st.subheader(f"📊 {설계유형} 계산된 투입인원 (인·일)")
             표시열 = ["업무구분", "단위"] + sum([[j, f"{j}_계산식"] for j in 직급리스트], [])
-            st.dataframe(기준표[표시열])
+            st.dataframe(기준표.to_frame()[표시열])
             st.session_state["기준계산결과"] = 기준표
 
         else:
@@ -505,145 +693,167 @@ def run_조경():
         df_wage = load_노임단가()
         st.dataframe(df_wage)
         st.session_state["최종_단가"] = df_wage
+        with st.expander("📅 노임단가 이력"):
+            노임단가_이력_표("건설")
 
     with tab_손해보험요율:
         st.header("손해보험요율")
-        st.dataframe(load_손해보험요율())
-        st.session_state["보험요율DF"] = load_손해보험요율()
+        df_ins = load_손해보험요율()
+        st.dataframe(df_ins)
+        st.session_state["보험요율DF"] = df_ins
+
+    @st.fragment(key="조경_민감도")
+    def 민감도_탭():
+        st.header("민감도 분석")
+        설계유형 = st.session_state.get("설계유형", "기본설계")
+        성격 = st.session_state.get("대상지_성격", "도시공원")
+        inputs = engine.조경입력(
+            설계유형,
+            st.session_state.get("면적", 100.0),
+            성격,
+            st.session_state.get("난이도") or 난이도_map[성격][0],
+            st.session_state.get("전단계_활용", False),
+            pipe.input("기간"),
+            현재_요율(),
+        )
+
+        # 세 기준표는 기동 때 함께 읽어 둔 것을 쓰고, 같은 입력으로 한 번에 산출한다
+        st.subheader("🔀 설계유형 비교")
+        st.caption("기초입력 값과 내역서 요율로 세 설계유형을 나란히 산출합니다. 편집한 기간은 지금 설계유형에만 씁니다.")
+        # 입력값·기준자료 버전이 그대로면 전에 구한 표를 쓴다 (탭을 보지 않는 재실행마다 다시 돌지 않게)
+        지문 = export.fingerprint(
+            inputs, 기준자료_버전(*(f"조경_{t}" for t in engine.조경_설계유형), "노임단가")
+        )
+        memo = st.session_state.get("비교_조경")
+        if memo is None or memo[0] != 지문:
+            memo = st.session_state["비교_조경"] = (지문, sweep.비교_조경(
+                {t: load_조경_기준(t) for t in engine.조경_설계유형},
+                load_노임단가_색인(),
+                inputs,
+            ))
+        비교 = memo[1]
+        c1, c2 = st.columns([3, 2])
+        c1.dataframe(
+            비교,
+            hide_index=True,
+            column_config={
+                c: st.column_config.NumberColumn(format="localized")
+                for c in ("직접인건비", "도급예정액", "용역비")
+            },
+        )
+        c2.bar_chart(비교, x="설계유형", y="용역비", horizontal=True)
+
+        st.subheader("📈 면적·보기 조합")
+        st.caption("면적 범위와 고른 보기의 모든 조합을 한 번에 산출합니다. 기간은 기본값, 요율은 내역서 탭 값을 씁니다.")
+        with st.form("민감도_조경_form"):
+            면적범위 = 면적_범위_입력(inputs.면적, 100.0)
+            설계유형들 = st.multiselect("설계유형", engine.조경_설계유형, default=[설계유형])
+            난이도들 = st.multiselect(f"업무 난이도 ({성격})", 난이도_map[성격], default=난이도_map[성격])
+            전단계들 = st.multiselect(
+                "전 단계 성과물", [False, True],
+                default=[inputs.전단계_활용],
+                format_func=lambda b: "활용" if b else "없음",
+            )
+            제출 = st.form_submit_button("📈 분석")
+        if 제출:
+            st.session_state["민감도_조경"] = sweep.sweep_조경(
+                {t: load_조경_기준(t) for t in 설계유형들},
+                load_노임단가_색인(),
+                면적범위,
+                [(성격, nd) for nd in 난이도들],
+                전단계들,
+                요율=inputs.요율,
+            )
+        결과 = st.session_state.get("민감도_조경")
+        if 결과 is not None:
+            민감도_결과(결과)
+
+        역산_폼(
+            "역산_조경",
+            st.session_state.get("도급예정액"),
+            lambda 목표, 변수: solver.역산_조경(
+                inputs, load_조경_기준(설계유형), load_노임단가_색인(), 목표, 변수
+            ),
+            pipe.get("기간항목") if pipe.ready("기간항목") else None,
+        )
+
+        모의실험_폼(
+            "모의_조경",
+            inputs.요율,
+            lambda 분포들, 표본수: simulate.simulate_조경(
+                inputs, load_조경_기준(설계유형), load_노임단가_색인(), 표본수=표본수, **분포들
+            ),
+        )
+
+        연도별_단가(
+            "조경",
+            pipe.get("산정기준") if pipe.ready("산정기준") else None,
+            inputs.기간,
+            inputs.요율,
+            "연도별_조경",
+        )
+
+    with tab_민감도:
+        민감도_탭()
+
+    with tab_저장소:
+        st.header("저장된 용역")
+        저장소_탭("조경", engine.조경_설계유형, "도급예정액" in st.session_state, _저장, _불러오기)
 
 # ─── 환경영향평가 전용 처리 ───
 def run_환경영향평가대행():
     st.title("🌱 환경영향평가 대행 비용 산출 프로그램")
 
-   # ─── 과업지시서 DOCX 생성 헬퍼 ───
+    # 세션별 산출 그래프: 바뀐 입력에서 닿는 단계만 다시 계산한다
+    pipe = st.session_state.setdefault("pipeline_환경", pipeline.환경())
+
+   # ─── 과업지시서 DOCX 생성 헬퍼 (다운로드를 누를 때 만든다) ───
     def generate_directive_docx():
-        tpl = DocxTemplate("template_directive.docx")
-        context = {
-            "용역명":     st.session_state.get("용역명_env", ""),
-            "발주기관명": st.session_state.get("발주기관명_env", ""),
-            "날짜":       dt.date.today().strftime("%Y-%m-%d"),
-            "과업대상지":   st.session_state.get("과업대상지_env", ""),
-            "면적":       f"{st.session_state.get('면적_env', 0):,.0f}㎡",
-            "과업기간":   f"{st.session_state.get('과업기간_env', 0)}일",
-        }
-        tpl.render(context)
-        buf = BytesIO()
-        tpl.save(buf)
-        buf.seek(0)
-        return buf
-
-    def build_환경_excel(template_path="template_env.xlsx") -> BytesIO:
+        context = export.directive_context(
+            st.session_state.get("용역명_env", ""),
+            st.session_state.get("발주기관명_env", ""),
+            st.session_state.get("과업대상지_env", ""),
+            st.session_state.get("면적_env", 0),
+            st.session_state.get("과업기간_env", 0),
+        )
+        return lambda: export.directive_bytes(context)
+
+    def build_환경_excel(template_path="template_env.xlsx"):
         """
-        'template_env.xlsx' 복사 후
+        다운로드 시 'template_env.xlsx' 에
         1) ‘갑지’ 시트: 날짜, 용역명, 발주기관명, 용역비(도급예정액) 입력
         2) 나머지 시트(내역서, 투입인원 및 내역, 투입인원수 산정기준, 노임단가, 손해보험요율)를
-           pandas DataFrame으로 덮어쓰기
+           DataFrame 값으로 덮어쓴 파일을 만드는 함수를 돌려준다
         """
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx")
-        tmp.close()
-        try:
-            shutil.copy(template_path, tmp.name)
-        except FileNotFoundError:
+        if not os.path.exists(template_path):
             st.error(f"템플릿 파일을 찾을 수 없습니다: {template_path}")
             return None
+        기준결과_env = st.session_state.get("기준결과_env")
+        인자 = dict(
+            용역명=st.session_state.get("용역명_env", ""),
+            발주기관명=st.session_state.get("발주기관명_env", ""),
+            도급예정액=st.session_state.get("도급예정액_env", 0),
+            sheets={
+                "내역서": st.session_state.get("df_detail_env"),
+                "투입인원 및 내역": st.session_state.get("투입인원DF_env"),
+                "노임단가": st.session_state.get("최종_단가_env"),
+                "손해보험요율": st.session_state.get("보험요율DF_env"),
+            },
+        )
 
-        wb = load_workbook(tmp.name)
-        ws = wb["갑지"]
-
-        ws["A1"].value = dt.date.today().strftime("%Y-%m-%d")
-        용역명_env = st.session_state.get("용역명_env", "")
-        ws["D10"].value = 용역명_env
-        발주기관명_env = st.session_state.get("발주기관명_env", "")
-        ws["G22"].value = 발주기관명_env
-        raw_env = st.session_state.get("도급예정액_env", 0)
-        용역비_env = int(raw_env // 1000) * 1000
-        ws["G20"].value = f"{용역비_env:,} 원"
-
-        wb.save(tmp.name)
-
-        with pd.ExcelWriter(tmp.name, engine="openpyxl", mode="a", if_sheet_exists="overlay") as writer:
-            df_detail_env = st.session_state.get("df_detail_env", pd.DataFrame())
-            if not df_detail_env.empty:
-                df_detail_env.to_excel(
-                    writer,
-                    sheet_name="내역서",
-                    index=False,
-                    header=False,
-                    startrow=2
-                )
-
-            df_person_env = st.session_state.get("투입인원DF_env", pd.DataFrame())
-            if not df_person_env.empty:
-                df_person_env.to_excel(
-                    writer,
-                    sheet_name="투입인원 및 내역",
-                    index=False,
-                    header=False,
-                    startrow=2
-                )
-
-            df_basis_env = st.session_state.get("기준결과_env", pd.DataFrame())
-            if not df_basis_env.empty:
-                cols_to_drop = [
-                    "환산계수",
-                    "α₁(환산계수)",
-                    "보정계수(가)",
-                    "보정계수(나)",
-                    "보정계수(다)",
-                    "보정계수(라)",
-                ]
-                drop_list = [c for c in cols_to_drop if c in df_basis_env.columns]
-                df_for_excel_env = df_basis_env.drop(columns=drop_list)
-                df_for_excel_env.to_excel(
-                    writer,
-                    sheet_name="투입인원수 산정기준",
-                    index=False,
-                    header=False,
-                    startrow=2
-                )
-
-            df_wage_env = st.session_state.get("최종_단가_env", pd.DataFrame())
-            if not df_wage_env.empty:
-                df_wage_env.to_excel(
-                    writer,
-                    sheet_name="노임단가",
-                    index=False,
-                    header=False,
-                    startrow=2
-                )
-
-            df_ins_env = st.session_state.get("보험요율DF_env", pd.DataFrame())
-            if not df_ins_env.empty:
-                df_ins_env.to_excel(
-                    writer,
-                    sheet_name="손해보험요율",
-                    index=False,
-                    header=False,
-                    startrow=2
-                )
-
-        buf = BytesIO()
-        with open(tmp.name, "rb") as f:
-            buf.write(f.read())
-        buf.seek(0)
-        return buf
-
-    직급리스트 = ["기술사", "특급기술자", "고급기술자", "중급기술자", "초급기술자"]
+        def 엑셀():
+            # 산정기준 표는 내려받을 때만 DataFrame 으로 펼친다
+            if 기준결과_env is not None:
+                df_basis_env = 기준결과_env.to_frame()
+                drop_list = [c for c in engine.환경_엑셀_제외열 if c in df_basis_env.columns]
+                인자["sheets"]["투입인원수 산정기준"] = df_basis_env.drop(columns=drop_list)
+            return export.excel_bytes(template_path, **인자)
+        return 엑셀
 
-    @st.cache_data
     def load_env_basis(설계유형_env):
-        urls = {
-            "소규모 환경영향평가 대행": (
-                "https://docs.google.com/spreadsheets/d/e/2PACX-1vQK25xZ-K2mo1mpr_Sz4cUEv8lHW6gY0-Ps0BVW-GSFRk7_53WBVHXBIBOQChTrtdYaJIP8T1p1U0sX/pub?output=csv"
-            ),
-        }
-        url = urls.get(설계유형_env, urls["소규모 환경영향평가 대행"])
-        df = pd.read_csv(url)
-        df.columns = [c.strip() for c in df.columns]
-        for 직급 in 직급리스트:
-            if 직급 in df.columns:
-                df[직급] = pd.to_numeric(df[직급], errors="coerce").fillna(0.0)
-        return df
+        if 설계유형_env not in engine.환경_설계유형:
+            설계유형_env = "소규모 환경영향평가 대행"
+        return 기준자료().get(f"환경_{설계유형_env}")   # 정리는 pipeline 에서 한 번만
 
     (
         tab_기초입력,
@@ -653,6 +863,8 @@ def run_환경영향평가대행():
         tab_산정기준,
         tab_노임단가,
         tab_손해보험요율,
+        tab_민감도,
+        tab_저장소,
     ) = st.tabs([
         "기초입력",
         "갑지",
@@ -661,34 +873,34 @@ def run_환경영향평가대행():
         "투입인원수 산정기준",
         "노임단가",
         "보험요율",
+        "민감도 분석",
+        "저장된 용역",
     ])
 
     # ─── 기초입력 탭 ───
     with tab_기초입력:
         st.header("기초입력")
 
+        # 입력란 값은 위젯 키(…_env)에만 두고 value·index 를 주지 않는다 (불러오기가 키를 채운다)
         # 용역명_env
         st.text_input(
             "용역명",
-            value=st.session_state.get("용역명_env", ""),
             key="용역명_env",
         )
 
         # 발주기관명_env
         st.text_input(
             "발주기관명",
-            value=st.session_state.get("발주기관명_env", ""),
             key="발주기관명_env",
         )
 
         # 설계유형_env 선택
-        env_options = ["소규모 환경영향평가 대행"]
-        current_env = st.session_state.get("설계유형_env", env_options[0])
-        idx_env = env_options.index(current_env) if current_env in env_options else 0
+        env_options = engine.환경_설계유형
+        if st.session_state.get("설계유형_env") not in env_options:
+            st.session_state["설계유형_env"] = env_options[0]
         st.radio(
             "설계유형을 선택하세요",
             env_options,
-            index=idx_env,
             key="설계유형_env",
         )
 
@@ -696,7 +908,6 @@ def run_환경영향평가대행():
         # 과업대상지_env (신규)
         st.text_input(
             "과업대상지",
-            value=st.session_state.get("과업대상지_env", ""),
             key="과업대상지_env",
         )
 
@@ -705,7 +916,6 @@ def run_환경영향평가대행():
             "대상 면적 (㎡)",
             min_value=0.0,
             step=10.0,
-            value=st.session_state.get("면적_env", 0.0),
             key="면적_env",
         )
 
@@ -714,7 +924,6 @@ def run_환경영향평가대행():
             "과업기간 (일수)",
             min_value=0,
             step=1,
-            value=st.session_state.get("과업기간_env", 0),
             help="예: 90 → 90일",
             key="과업기간_env",
         )
@@ -722,32 +931,106 @@ def run_환경영향평가대행():
         st.markdown("보정계수를 산정하기 위한 추가 질문")
         st.selectbox(
             "1. 동·식물상 조사 특성",
-            ["생태*자연도 2등급 및 3등급 권역", "생태*자연도 1등급 권역 및 별도관리지역"],
+            engine.보정_질문["보정_동식물"],
             key="보정_동식물",
         )
         st.selectbox(
             "2. 자연경관심의 대상",
-            ["대상", "미대상"],
+            engine.보정_질문["보정_자연연경관심의"],
             key="보정_자연연경관심의",
         )
         st.selectbox(
             "3. 건강영향평가 대상",
-            ["대상", "미대상"],
+            engine.보정_질문["보정_건강영향평가"],
             key="보정_건강영향평가",
         )
         st.selectbox(
             "4. 수질오염총량계획 대상",
-            ["대상", "미대상"],
+            engine.보정_질문["보정_수질오염총량계획"],
             key="보정_수질오염총량계획",
         )
 
+    # 갑지·내역서·투입인원 탭은 각각 조각(fragment)이다. 조경 쪽과 같은 방식으로
+    # session_state 와 pipe 로 값을 넘기고, 콜백이 영향받는 탭을 함께 다시 그린다.
+    def _기간_변경():
+        st.rerun(["환경_투입인원", "환경_내역서", "환경_갑지"])
+
+    def _산출_완료():
+        pipe.set(요율=engine.내역서요율(*(st.session_state[f"{k}_env"] for k in (
+            "제경비율", "직접경비", "기술료율", "공제율", "부가세율"
+        ))))
+        st.session_state["도급예정액_env"] = pipe.get("도급예정액")
+        st.rerun(["환경_내역서", "환경_갑지"])
+
+    보정키 = list(engine.보정_질문)
+
+    def _저장():
+        설계유형_env = st.session_state["설계유형_env"]
+        inputs = engine.환경입력(
+            설계유형_env, *(pipe.input(k) for k in ("면적", *보정키, "기간", "요율"))
+        )
+        est = engine.Estimate(pipe.get("산정기준"), *pipe.get("투입인원"), *pipe.get("내역서"))
+        id = 저장소().save(
+            "환경", st.session_state.get("용역명_env", ""), st.session_state.get("발주기관명_env", ""),
+            inputs, est, 기준자료_버전(f"환경_{설계유형_env}", "노임단가"),
+            부가정보={
+                "과업대상지": st.session_state.get("과업대상지_env", ""),
+                "과업기간": st.session_state.get("과업기간_env", 0),
+            },
+        )
+        st.session_state["환경_저장소_알림"] = f"저장했습니다 (번호 {id}, 도급예정액 {est.도급예정액:,.0f}원)."
+
+    def _불러오기(id):
+        # 조경 쪽과 같다: 위젯 키에 입력값을 넣고 pipe 에 저장된 결과를 넣는다
+        항목 = 저장소().load(id)
+        inputs, est = 항목.inputs, 항목.estimate
+        기간항목 = engine.기간항목_환경(est.기준계산결과)
+        번호 = st.session_state.get("기간_env_복원", (None, None, 0))[2] + 1
+        st.session_state.update({
+            "용역명_env": 항목.용역명,
+            "발주기관명_env": 항목.발주기관명,
+            "설계유형_env": inputs.설계유형,
+            "과업대상지_env": 항목.부가정보.get("과업대상지", ""),
+            "과업기간_env": 항목.부가정보.get("과업기간", 0),
+            "면적_env": inputs.면적,
+            **{key: getattr(inputs, key) for key in 보정키},
+            "기간_env_복원": (export.fingerprint(기간항목), inputs.기간 or {}, 번호),
+            **{f"{f.name}_env": getattr(inputs.요율, f.name) for f in fields(engine.내역서요율)},
+        })
+        pipe.set(
+            기준표=load_env_basis(inputs.설계유형),
+            면적=inputs.면적,
+            **{key: getattr(inputs, key) for key in 보정키},
+            노임단가=load_노임단가_색인(),
+            기간=inputs.기간 or {},
+            요율=inputs.요율,
+        )
+        if 항목.기준자료 == 기준자료_버전(*항목.기준자료):
+            pipe.restore(
+                산정기준=est.기준계산결과,
+                투입인원=(est.투입인원DF, est.직접인건비),
+                내역서=(est.df_detail, est.도급예정액),
+            )
+            st.session_state.update({
+                "기준결과_env": est.기준계산결과,
+                "투입인원DF_env": est.투입인원DF,
+                "직접인건비_env": est.직접인건비,
+                "df_detail_env": est.df_detail,
+                "도급예정액_env": est.도급예정액,
+            })
+            알림 = f"‘{항목.용역명}’ 을 불러왔습니다 (저장일시 {항목.저장일시})."
+        else:
+            st.session_state.pop("도급예정액_env", None)
+            알림 = f"‘{항목.용역명}’ 의 입력값을 불러왔습니다. 기준자료가 저장 당시와 달라 다시 산출합니다."
+        st.session_state["환경_저장소_알림"] = 알림
+
     # ─── 갑지 탭 ───
-    with tab_갑지:
+    @st.fragment(key="환경_갑지")
+    def 갑지_탭():
         import datetime
 
         용역명_env = st.session_state.get("용역명_env", "")
         발주기관명_env = st.session_state.get("발주기관명_env", "")
-        도급예정액_env = st.session_state.get("도급예정액_env", 0)
 
         today = datetime.date.today().strftime("%Y-%m-%d")
         st.markdown(f"##### 날짜: {today}")
@@ -769,17 +1052,22 @@ def run_환경영향평가대행():
 
             # 환경영향평가 내역서(Excel) 다운로드 버튼
             excel_buf = build_환경_excel("template_env.xlsx")
-            st.download_button(
-                label="⬇️ 환경영향평가 내역서(Excel) 다운로드",
-                data=excel_buf,
-                file_name=f"{용역명_env}_환경영향평가_내역서.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            )
+            if excel_buf is not None:
+                st.download_button(
+                    label="⬇️ 환경영향평가 내역서(Excel) 다운로드",
+                    data=excel_buf,
+                    file_name=f"{용역명_env}_환경영향평가_내역서.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                )
         else:
             st.caption("※ 산출 완료 후 버튼이 활성화됩니다.")
 
+    with tab_갑지:
+        갑지_탭()
+
     # ─── 내역서 탭 ───
-    with tab_내역서:
+    @st.fragment(key="환경_내역서")
+    def 내역서_탭():
         st.header("내역서")
         st.caption("※ 각 숫자를 수정한 뒤 **Enter** 를 눌러야 계산이 반영됩니다.")
 
@@ -787,155 +1075,55 @@ def run_환경영향평가대행():
         if 직접인건비_env is None:
             st.warning("먼저 ‘투입인원 및 내역’ 탭에서 직접인건비를 계산해 주세요.")
         else:
+            요율_기본값("_env")
             제경비율_env = st.number_input(
                 "제경비율 (110~120%)",
-                value=110.0,
                 step=0.1,
                 key="제경비율_env",
             )
             직접경비_env = st.number_input(
                 "직접경비 금액 (원)",
-                value=5_000_000,
                 step=1_000,
                 key="직접경비_env",
             )
             기술료율_env = st.number_input(
                 "기술료율 (20~40%)",
-                value=20.0,
                 step=0.1,
                 key="기술료율_env",
             )
             공제율_env = st.number_input(
                 "손해공제비율 (%)",
-                value=0.432,
                 step=0.001,
                 key="공제율_env",
             )
             부가세율_env = st.number_input(
                 "부가가치세율 (%)",
-                value=10.0,
                 step=0.1,
                 key="부가세율_env",
             )
 
-            제경비_env = 직접인건비_env * 제경비율_env / 100
-            기술료_env = (직접인건비_env + 제경비_env) * 기술료율_env / 100
-            손해공제비_env = (
-                (직접인건비_env + 제경비_env + 직접경비_env + 기술료_env)
-                * 공제율_env
-                / 100
-            )
-            부가세_env = (
-                (직접인건비_env
-                + 제경비_env
-                + 직접경비_env
-                + 기술료_env
-                + 손해공제비_env)
-                * 부가세율_env
-                / 100
-            )
-            도급예정액_env = (
-                직접인건비_env
-                + 제경비_env
-                + 직접경비_env
-                + 기술료_env
-                + 손해공제비_env
-                + 부가세_env
-            )
+            pipe.set(요율=engine.내역서요율(
+                제경비율_env, 직접경비_env, 기술료율_env, 공제율_env, 부가세율_env
+            ))
+            df_env, 도급예정액_env = pipe.get("내역서")
 
-            if st.button("✅ 산출 완료"):
-                st.session_state["도급예정액_env"] = 도급예정액_env
+            if st.button("✅ 산출 완료", on_click=_산출_완료):
                 st.success(f"도급예정액 {도급예정액_env:,.0f}원이 저장되었습니다.")
             else:
                 st.info("▶️ 값이 맞다면 ‘✅ 산출 완료’ 버튼을 눌러 주세요.")
 
-            rows_env = [
-                {
-                    "공종": "직접인건비",
-                    "규격": "-",
-                    "수량": "-",
-                    "단위": "",
-                    "총액": 직접인건비_env,
-                    "노무비": 직접인건비_env,
-                    "경비": "",
-                    "비고": "",
-                },
-                {
-                    "공종": "제경비",
-                    "규격": "직접인건비×율",
-                    "수량": "-",
-                    "단위": "",
-                    "총액": "",
-                    "노무비": "",
-                    "경비": 제경비_env,
-                    "비고": f"{제경비율_env}%",
-                },
-                {
-                    "공종": "직접경비",
-                    "규격": "제출도서 인쇄",
-                    "수량": 1,
-                    "단위": "식",
-                    "총액": "",
-                    "노무비": "",
-                    "경비": 직접경비_env,
-                    "비고": "",
-                },
-                {
-                    "공종": "기술료",
-                    "규격": "(직접인건비+제경비)×율",
-                    "수량": "-",
-                    "단위": "",
-                    "총액": "",
-                    "노무비": "",
-                    "경비": 기술료_env,
-                    "비고": f"{기술료율_env}%",
-                },
-                {
-                    "공종": "손해공제비",
-                    "규격": "용역비×율",
-                    "수량": "-",
-                    "단위": "",
-                    "총액": "",
-                    "노무비": "",
-                    "경비": 손해공제비_env,
-                    "비고": f"{공제율_env}",
-                },
-                {
-                    "공종": "부가가치세",
-                    "규격": "합계×율",
-                    "수량": "-",
-                    "단위": "",
-                    "총액": "",
-                    "노무비": "",
-                    "경비": 부가세_env,
-                    "비고": f"{부가세율_env}%",
-                },
-                {
-                    "공종": "도급예정액",
-                    "규격": "",
-                    "수량": "-",
-                    "단위": "",
-                    "총액": 도급예정액_env,
-                    "노무비": "",
-                    "경비": "",
-                    "비고": "",
-                },
-            ]
-            df_env = pd.DataFrame(rows_env)
-
-            for c in ["총액", "노무비", "경비"]:
-                df_env[c] = df_env[c].apply(
-                    lambda x: f"{int(x):,}" if isinstance(x, (int, float)) else x
-                )
-
             st.dataframe(df_env[[
                 "공종", "규격", "수량", "단위", "총액", "노무비", "경비", "비고"
             ]])
 
             st.session_state["df_detail_env"] = df_env
 
+    with tab_내역서:
+        내역서_탭()
+
     # ─── 투입인원 및 내역 탭 ───
-    with tab_투입인원및내역:
+    @st.fragment(key="환경_투입인원")
+    def 투입인원_탭():
         st.header("투입인원 및 내역")
 
         기준결과_env = st.session_state.get("기준결과_env")
@@ -944,116 +1132,12 @@ def run_환경영향평가대행():
         if 기준결과_env is None or 노임단가_df_env is None:
             st.warning("먼저 ‘산정기준’ 탭과 ‘노임단가’ 탭을 완료해주세요.")
         else:
-            결과표 = 기준결과_env.copy()
-            결과표 = 결과표[
-                결과표["단위"].astype(str).str.strip() != ""
-            ].reset_index(drop=True)
-
-            for 직급 in 직급리스트:
-                결과표[직급] = pd.to_numeric(결과표[직급], errors="coerce").fillna(0.0)
-
-            is_technical = 결과표[직급리스트].sum(axis=1) > 0
-
-            기간값 = {}
-            n = len(결과표)
-            half = (n + 1) // 2
-            left, right = st.columns(2)
-
-            with left:
-                for idx, row in 결과표.iloc[:half].iterrows():
-                    if not is_technical.iloc[idx]:
-                        기간값[idx] = 0
-                        continue
-                    업무 = row["업무구분"]
-                    단위 = str(row["단위"]).strip()
-
-                    if 단위 == "식":
-                        기본값 = 1
-                        라벨 = f"{업무} (식)"
-                    else:
-                        기본값 = 1
-                        라벨 = f"{업무} 기간 (일)"
-
-                    값 = st.number_input(
-                        라벨,
-                        min_value=0,
-                        step=1,
-                        value=int(st.session_state.get(f"기간_{idx}", 기본값)),
-                        key=f"기간_L_{idx}"
-                    )
-                    기간값[idx] = 값
-
-            with right:
-                for idx, row in 결과표.iloc[half:].iterrows():
-                    if not is_technical.iloc[idx]:
-                        기간값[idx] = 0
-                        continue
-                    업무 = row["업무구분"]
-                    단위 = str(row["단위"]).strip()
-
-                    if 단위 == "식":
-                        기본값 = 1
-                        라벨 = f"{업무} (식)"
-                    else:
-                        기본값 = 1
-                        라벨 = f"{업무} 기간 (일)"
-
-                    값 = st.number_input(
-                        라벨,
-                        min_value=0,
-                        step=1,
-                        value=int(st.session_state.get(f"기간_{idx}", 기본값)),
-                        key=f"기간_R_{idx}"
-                    )
-                    기간값[idx] = 값
-
-            결과표["기간"] = [기간값[i] for i in range(n)]
-
-            노임단가_df_env.columns = [c.strip() for c in 노임단가_df_env.columns]
-            노임단가_df_env["직종명"] = 노임단가_df_env["직종명"].astype(str).str.strip()
-
-            env_col = "환경"
-            노임단가_df_env[env_col] = (
-                노임단가_df_env[env_col]
-                .astype(str)
-                .str.replace(",", "")
-                .str.strip()
-                .astype(float)
-            )
-
-            단가사전 = {}
-            for 직급 in 직급리스트:
-                sub = 노임단가_df_env[노임단가_df_env["직종명"] == 직급]
-                단가사전[직급] = float(sub[env_col].iloc[0]) if not sub.empty else 0.0
-
-            계산된_계 = []
-            for idx, row in 결과표.iterrows():
-                if not is_technical.iloc[idx]:
-                    계산된_계.append(0.0)
-                    continue
-                인건비합 = sum(row[직급] * 단가사전.get(직급, 0.0) for 직급 in 직급리스트)
-                사전체 = round(인건비합 * row["기간"], 2)
-                계산된_계.append(사전체)
-
-            결과표["계"] = 계산된_계
-
-            표시열 = ["업무구분", "계"] + 직급리스트 + ["기간"]
+            pipe.set(노임단가=load_노임단가_색인())
+            기간항목 = pipe.get("기간항목")
+            기간값 = 기간_편집기(기간항목, "기간_env", _기간_변경)
 
-            sum_계_env = 결과표["계"].sum()
-            총계행 = {c: "" for c in 표시열}
-            총계행["업무구분"] = "총계"
-            총계행["계"] = sum_계_env
-            total_df = pd.DataFrame([총계행])
-
-            final_df = pd.concat([total_df, 결과표[표시열]], ignore_index=True)
-
-            def fmt(x):
-                if isinstance(x, (int, float)):
-                    return "" if x == 0 else f"{x:,.2f}"
-                return x
-
-            for c in ["계", "기간"] + 직급리스트:
-                final_df[c] = final_df[c].apply(fmt)
+            pipe.set(기간=기간값)
+            final_df, sum_계_env = pipe.get("투입인원")
 
             st.session_state["직접인건비_env"] = sum_계_env
             st.session_state["투입인원DF_env"] = final_df
@@ -1061,6 +1145,9 @@ def run_환경영향평가대행():
             st.subheader("📊 기술자별 투입 인원 및 총액")
             st.dataframe(final_df)
 
+    with tab_투입인원및내역:
+        투입인원_탭()
+
     # ─── 산정기준 탭 ───
     with tab_산정기준:
         st.header("투입인원수 산정기준")
@@ -1073,89 +1160,16 @@ def run_환경영향평가대행():
         q4 = st.session_state.get("보정_수질오염총량계획")
 
         if 설계유형_env == "소규모 환경영향평가 대행":
-            기준표_env = load_env_basis(설계유형_env).copy()
-            A = float(대상_면적_env)
-
-            α1_list = []
-            for _, row in 기준표_env.iterrows():
-                rule = row.get("환산계수", None)
-                α1 = 1.00
-                if rule == 1:
-                    α1 = 1.00
-                elif rule == 2:
-                    if A <= 10000:
-                        α1 = 0.25
-                    elif A <= 100000:
-                        α1 = round((A / 100000) ** 0.6, 3)
-                    elif A <= 1000000:
-                        α1 = round((A / 100000) ** 0.3, 3)
-                    else:
-                        α1 = 2.00
-                elif rule == 3:
-                    if A <= 30000:
-                        α1 = 0.49
-                    elif A <= 1000000:
-                        α1 = round((A / 100000) ** 0.6, 3)
-                    else:
-                        α1 = 3.98
-                else:
-                    α1 = 1.00
-                α1_list.append(α1)
-
-            기준표_env["α₁(환산계수)"] = α1_list
-
-            factor_가 = 1.00 if q1 == "생태*자연도 2등급 및 3등급 권역" else 1.20
-            factor_나 = 1.00 if q2 == "미대상" else 2.00
-            factor_다 = 1.00 if q3 == "미대상" else 1.15
-            factor_라 = 1.00 if q4 == "미대상" else 1.40
-
-            for 직급 in 직급리스트:
-                계산값_list = []
-                계산식_list = []
-                for _, row in 기준표_env.iterrows():
-                    base = row.get(직급, 0)
-                    α1 = row["α₁(환산계수)"]
-                    보정가 = row.get("보정계수(가)", "")
-                    보정나 = row.get("보정계수(나)", "")
-                    보정다 = row.get("보정계수(다)", "")
-                    보정라 = row.get("보정계수(라)", "")
-
-                    if not isinstance(base, (int, float)) or base <= 0:
-                        계산값_list.append("")
-                        계산식_list.append("")
-                        continue
-
-                    v = base * α1
-                    parts = [f"{α1:.3f}"]
-
-                    if 보정가 == "반영":
-                        v *= factor_가
-                        parts.append(f"{factor_가:.2f}")
-                    if 보정나 == "반영":
-                        v *= factor_나
-                        parts.append(f"{factor_나:.2f}")
-                    if 보정다 == "반영":
-                        v *= factor_다
-                        parts.append(f"{factor_다:.2f}")
-                    if 보정라 == "반영":
-                        v *= factor_라
-                        parts.append(f"{factor_라:.2f}")
-
-                    v_rounded = round(v, 2)
-                    계산값_list.append(v_rounded)
-
-                    formula = f"{base:.2f} × " + " × ".join(parts)
-                    계산식_list.append(formula)
-
-                기준표_env[직급] = 계산값_list
-                기준표_env[f"{직급}_계산식"] = 계산식_list
-
-            표시열 = ["업무구분", "단위"]
-            for 직급 in 직급리스트:
-                표시열 += [직급, f"{직급}_계산식"]
-
-            df_display_env = 기준표_env[표시열].copy()
-            df_display_env = df_display_env.replace(0, "").fillna("")
+            pipe.set(
+                기준표=load_env_basis(설계유형_env),
+                면적=대상_면적_env,
+                보정_동식물=q1,
+                보정_자연연경관심의=q2,
+                보정_건강영향평가=q3,
+                보정_수질오염총량계획=q4,
+            )
+            기준표_env = pipe.get("산정기준")
+            df_display_env = engine.표시용_기준표_환경(기준표_env)
 
             st.subheader(f"📊 {설계유형_env} 기준표 (환산계수 + 보정계수 반영)")
             st.dataframe(df_display_env)
@@ -1171,6 +1185,8 @@ def run_환경영향평가대행():
         df_wage_env = load_노임단가()
         st.dataframe(df_wage_env)
         st.session_state["최종_단가_env"] = df_wage_env
+        with st.expander("📅 노임단가 이력"):
+            노임단가_이력_표("환경")
 
     # ─── 보험요율 탭 ───
     with tab_손해보험요율:
@@ -1179,8 +1195,88 @@ def run_환경영향평가대행():
         st.dataframe(df_ins_env)
         st.session_state["보험요율DF_env"] = df_ins_env
 
+    # ─── 민감도 분석 탭 ───
+    @st.fragment(key="환경_민감도")
+    def 민감도_탭():
+        st.header("민감도 분석")
+        st.subheader("📈 면적·보기 조합")
+        st.caption("면적 범위와 고른 보정 답변의 모든 조합을 한 번에 산출합니다. 기간은 기본값, 요율은 내역서 탭 값을 씁니다.")
+        with st.form("민감도_env_form"):
+            면적범위 = 면적_범위_입력(st.session_state.get("면적_env", 0.0), 0.0)
+            보정 = {
+                key: st.multiselect(
+                    key.removeprefix("보정_"), opts,
+                    default=[st.session_state.get(key) or opts[0]],
+                )
+                for key, opts in engine.보정_질문.items()
+            }
+            제출 = st.form_submit_button("📈 분석")
+        if 제출:
+            설계유형_env = st.session_state.get("설계유형_env") or engine.환경_설계유형[0]
+            st.session_state["민감도_env"] = sweep.sweep_환경(
+                load_env_basis(설계유형_env),
+                load_노임단가_색인(),
+                면적범위,
+                보정,
+                요율=현재_요율("_env"),
+                설계유형=설계유형_env,
+            )
+        결과 = st.session_state.get("민감도_env")
+        if 결과 is not None:
+            민감도_결과(결과)
+
+        설계유형_env = st.session_state.get("설계유형_env") or engine.환경_설계유형[0]
+        inputs = engine.환경입력(
+            설계유형_env,
+            st.session_state.get("면적_env", 0.0),
+            **{key: st.session_state.get(key) or opts[0] for key, opts in engine.보정_질문.items()},
+            기간=pipe.input("기간"),
+            요율=현재_요율("_env"),
+        )
+        역산_폼(
+            "역산_env",
+            st.session_state.get("도급예정액_env"),
+            lambda 목표, 변수: solver.역산_환경(
+                inputs, load_env_basis(설계유형_env), load_노임단가_색인(), 목표, 변수
+            ),
+            pipe.get("기간항목") if pipe.ready("기간항목") else None,
+        )
+
+        모의실험_폼(
+            "모의_env",
+            inputs.요율,
+            lambda 분포들, 표본수: simulate.simulate_환경(
+                inputs, load_env_basis(설계유형_env), load_노임단가_색인(), 표본수=표본수, **분포들
+            ),
+        )
+
+        연도별_단가(
+            "환경",
+            pipe.get("산정기준") if pipe.ready("산정기준") else None,
+            inputs.기간,
+            inputs.요율,
+            "연도별_env",
+        )
+
+    with tab_민감도:
+        민감도_탭()
+
+    # ─── 저장된 용역 탭 ───
+    with tab_저장소:
+        st.header("저장된 용역")
+        저장소_탭("환경", engine.환경_설계유형, "도급예정액_env" in st.session_state, _저장, _불러오기)
+
 def main():
+    기준자료()
     st.sidebar.header("1️⃣ 설계 분야 선택")
+    if st.sidebar.button("🔄 기준자료 새로고침", help="노임단가·보험요율·기준표를 원본에서 다시 받아 스냅샷으로 저장합니다."):
+        try:
+            결과 = 기준자료().revalidate(wait=True)
+            갱신 = sum(fresh for _, fresh in 결과.values())
+            st.sidebar.success(f"기준자료 {len(결과)}건 중 {갱신}건을 새로 받았습니다.")
+        except Exception as e:
+            st.sidebar.error(f"기준자료를 받아오지 못했습니다: {e}")
+
     option = st.sidebar.radio(
         "어떤 설계를 하시나요?",
         ("조경", "환경영향평가 대행")
@@ -1191,5 +1287,17 @@ def main():
     }
     handlers[option]()
 
+    with st.sidebar.expander("세션 메모리"):
+        # 세션 상태 전체를 훑으므로 누를 때만 잰다
+        if st.button("📏 지금 재기", key="세션_메모리_재기"):
+            사용량 = 세션_메모리()
+            st.caption(f"이 세션 {사용량['KB'].sum():,.1f} KB (공유 기준자료·캐시 제외)")
+            st.dataframe(사용량.head(10), hide_index=True)
+
+    with st.sidebar.expander("산출 캐시"):
+        현황 = pd.DataFrame(pipeline.캐시_현황()).T
+        st.caption("산정기준·투입인원 결과를 모든 세션이 함께 쓰는 LRU")
+        st.dataframe(현황.style.format({"적중률": "{:.0%}"}, precision=0))
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,280 @@
+"""
+여러 용역을 한 번에 산출하는 일괄 처리 (Streamlit 비의존)
+
+CSV 또는 XLSX 용역 목록을 읽어 용역마다 engine.price_조경() / price_환경() 으로
+산출하고, 화면에서 내려받는 것과 같은 산출내역서 엑셀을 만들어 ZIP 하나로 묶는다.
+ZIP 에는 전체 결과를 한 표로 모은 '요약.xlsx' 가 함께 들어간다.
+
+산출과 엑셀 작성은 프로세스 풀에서 나눠 돌리므로 코어 수만큼 처리량이 늘어난다.
+기준자료는 부모 프로세스가 스냅샷에서 한 번 읽어 각 작업 프로세스에 한 번만 넘긴다.
+
+목록 열 (분야 외에는 없으면 기본값):
+    용역명, 발주기관명, 설계유형, 면적
+    조경      대상지 성격, 난이도(앞 단어만 써도 됨: 단순/보통/복잡1…), 전단계 활용(Y/N)
+    환경      보정_동식물, 보정_자연연경관심의, 보정_건강영향평가, 보정_수질오염총량계획
+    공통      기간("번호=일수" 를 쉼표로 구분, 번호는 투입인원 표의 1부터 세는 업무 순번),
+              제경비율, 직접경비, 기술료율, 공제율, 부가세율
+설계유형이 조경 설계유형이면 조경, 환경 설계유형이면 환경영향평가로 산출한다.
+
+    python batch.py 용역목록.xlsx -o 산출결과.zip [--workers N]
+"""
+import datetime as dt
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+import engine
+import export
+import refdata
+
+
+TEMPLATES = {"조경": "template.xlsx", "환경": "template_env.xlsx"}
+
+요약열 = [
+    "순번", "분야", "용역명", "발주기관명", "설계유형", "면적",
+    "직접인건비", "도급예정액", "용역비", "파일", "오류",
+]
+
+
+@dataclass
+class 작업:
+    순번: int
+    분야: str
+    용역명: str
+    발주기관명: str
+    inputs: object   # engine.조경입력 | engine.환경입력
+
+
+# ─── 목록 읽기 ───
+def read_projects(path) -> pd.DataFrame:
+    """CSV(UTF-8, BOM 허용) 또는 XLSX 첫 시트를 문자열 표로 읽는다."""
+    if str(path).lower().endswith((".xlsx", ".xlsm")):
+        df = pd.read_excel(path, dtype=str)
+    else:
+        df = pd.read_csv(path, dtype=str, encoding="utf-8-sig")
+    df.columns = [str(c).strip() for c in df.columns]
+    return df.fillna("")
+
+
+def _값(row, *names, default=""):
+    for name in names:
+        val = str(row.get(name, "")).strip()
+        if val:
+            return val
+    return default
+
+
+def _숫자(row, name, default: float) -> float:
+    val = _값(row, name).replace(",", "")
+    return float(val) if val else default
+
+
+def _예(val: str) -> bool:
+    return val.strip().upper() in ("Y", "YES", "TRUE", "1", "O", "예", "있음")
+
+
+def parse_기간(text: str) -> Optional[Dict[int, int]]:
+    """'1=30, 3=2' → {0: 30, 2: 2}. 비어 있으면 None (기본 기간 사용)."""
+    if not text.strip():
+        return None
+    기간 = {}
+    for item in re.split(r"[,;]", text):
+        if not item.strip():
+            continue
+        번호, 값 = item.split("=")
+        기간[int(번호) - 1] = int(float(값))
+    return 기간
+
+
+def _요율(row) -> engine.내역서요율:
+    기본 = engine.내역서요율()
+    return engine.내역서요율(**{
+        f.name: _숫자(row, f.name, getattr(기본, f.name)) for f in fields(engine.내역서요율)
+    })
+
+
+def _선택(값: str, options: List[str], 항목: str) -> str:
+    """보기 전체 문구 또는 괄호 앞 첫 단어로 고른다."""
+    for opt in options:
+        if 값 == opt or 값 == opt.split(" ")[0]:
+            return opt
+    raise ValueError(f"{항목} 값이 올바르지 않습니다: {값}")
+
+
+def to_job(순번: int, row) -> 작업:
+    """목록 한 행을 산출 작업으로 바꾼다. 잘못된 값은 ValueError."""
+    설계유형 = _값(row, "설계유형")
+    면적 = _숫자(row, "면적", 0.0)
+    기간 = parse_기간(_값(row, "기간"))
+    용역명 = _값(row, "용역명")
+    발주기관명 = _값(row, "발주기관명")
+
+    if 설계유형 in engine.조경_설계유형:
+        성격 = _선택(_값(row, "대상지 성격", "대상지_성격", default="도시공원"),
+                    engine.성격_options, "대상지 성격")
+        난이도_opts = engine.난이도_map[성격]
+        난이도 = _선택(_값(row, "난이도", default=난이도_opts[0]), 난이도_opts, "난이도")
+        inputs = engine.조경입력(
+            설계유형, 면적, 성격, 난이도, _예(_값(row, "전단계 활용", "전단계_활용")), 기간, _요율(row)
+        )
+        return 작업(순번, "조경", 용역명, 발주기관명, inputs)
+
+    if 설계유형 in engine.환경_설계유형:
+        답 = {
+            key: _선택(_값(row, key, default=opts[0]), opts, key)
+            for key, opts in engine.보정_질문.items()
+        }
+        inputs = engine.환경입력(설계유형, 면적, 기간=기간, 요율=_요율(row), **답)
+        return 작업(순번, "환경", 용역명, 발주기관명, inputs)
+
+    raise ValueError(f"설계유형 값이 올바르지 않습니다: {설계유형}")
+
+
+# ─── 작업 프로세스 ───
+_기준: Dict[str, object] = {}
+
+
+def load_reference() -> Dict[str, object]:
+    """
+    스냅샷 기준자료 전체. 노임단가 열 이름은 화면과 같이 앞뒤 공백을 떼고,
+    단가 색인(engine.노임단가표)은 '노임단가표' 로 한 번만 만들어 둔다.
+    """
+    기준 = {name: refdata.read(name) for name in refdata.SOURCES}
+    기준["노임단가"].columns = [c.strip() for c in 기준["노임단가"].columns]
+    기준["노임단가표"] = engine.노임단가표.from_frame(기준["노임단가"])
+    return 기준
+
+
+def _init_worker(기준: Dict[str, object]):
+    global _기준
+    _기준 = 기준
+
+
+def price(job: 작업, 기준: Dict[str, object]) -> engine.Estimate:
+    if job.분야 == "조경":
+        return engine.price_조경(job.inputs, 기준[f"조경_{job.inputs.설계유형}"], 기준["노임단가표"])
+    기준표 = engine.정리_환경_기준표(기준[f"환경_{job.inputs.설계유형}"])
+    return engine.price_환경(job.inputs, 기준표, 기준["노임단가표"])
+
+
+def 파일명(job: 작업) -> str:
+    suffix = "조경설계 내역서" if job.분야 == "조경" else "환경영향평가 내역서"
+    return f"{job.순번:03d}_{export._파일명(job.용역명 or '용역')}_{suffix}.xlsx"
+
+
+def build(job: 작업, today: dt.date) -> Tuple[engine.Estimate, bytes]:
+    """한 용역을 산출하고 산출내역서 엑셀 바이트를 만든다 (작업 프로세스에서 실행)."""
+    기준 = _기준 or load_reference()
+    est = price(job, 기준)
+    기준결과 = est.기준계산결과.to_frame()
+    if job.분야 == "환경":
+        기준결과 = 기준결과.drop(columns=[c for c in engine.환경_엑셀_제외열 if c in 기준결과.columns])
+    buf = export.build_excel(
+        TEMPLATES[job.분야], job.용역명, job.발주기관명, est.도급예정액,
+        {
+            "내역서": est.df_detail,
+            "투입인원 및 내역": est.투입인원DF,
+            "투입인원수 산정기준": 기준결과,
+            "노임단가": 기준["노임단가"],
+            "손해보험요율": 기준["손해보험요율"],
+        },
+        today,
+    )
+    return est, buf.getvalue()
+
+
+def _run(job: 작업, today: dt.date):
+    try:
+        est, data = build(job, today)
+        return job, est.직접인건비, est.도급예정액, data, ""
+    except Exception as e:
+        return job, None, None, None, f"{type(e).__name__}: {e}"
+
+
+def 합계행(df_요약: pd.DataFrame) -> pd.DataFrame:
+    """요약 표 끝에 붙이는 합계 한 줄: 금액 합과 성공·실패 건수."""
+    실패 = int((df_요약["오류"].fillna("") != "").sum())
+    합계 = {c: "" for c in 요약열}
+    합계["용역명"] = "합계"
+    for c in ("직접인건비", "도급예정액", "용역비"):
+        합계[c] = df_요약[c].sum()
+    합계["오류"] = f"성공 {len(df_요약) - 실패}건 · 실패 {실패}건"
+    return pd.DataFrame([합계], columns=요약열)
+
+
+# ─── 일괄 실행 ───
+def run_batch(
+    projects: pd.DataFrame,
+    workers: Optional[int] = None,
+    today: Optional[dt.date] = None,
+) -> Tuple[BytesIO, pd.DataFrame]:
+    """
+    용역 목록 전체를 산출해 (ZIP BytesIO, 요약 DataFrame) 을 돌려준다.
+    한 용역이 실패해도 나머지는 계속하며, 실패 사유는 요약의 '오류' 열에 남는다.
+    ZIP 안의 요약.xlsx 에는 합계 행을 덧붙이고, 돌려주는 요약 DataFrame 은 용역 행만 담는다.
+    """
+    today = today or dt.date.today()
+    jobs, 요약 = [], []
+    for 순번, (_, row) in enumerate(projects.iterrows(), start=1):
+        try:
+            jobs.append(to_job(순번, row))
+        except Exception as e:
+            요약.append({
+                "순번": 순번, "용역명": _값(row, "용역명"), "발주기관명": _값(row, "발주기관명"),
+                "설계유형": _값(row, "설계유형"), "오류": f"{type(e).__name__}: {e}",
+            })
+
+    workers = workers or os.cpu_count() or 1
+    buf = BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        if jobs:
+            with ProcessPoolExecutor(
+                max_workers=min(workers, len(jobs)),
+                initializer=_init_worker,
+                initargs=(load_reference(),),
+            ) as pool:
+                chunksize = max(1, len(jobs) // (workers * 4))
+                results = pool.map(_run, jobs, [today] * len(jobs), chunksize=chunksize)
+                for job, 직접인건비, 도급예정액, data, 오류 in results:
+                    name = ""
+                    if data is not None:
+                        name = 파일명(job)
+                        zf.writestr(name, data)
+                    요약.append({
+                        "순번": job.순번, "분야": job.분야, "용역명": job.용역명,
+                        "발주기관명": job.발주기관명, "설계유형": job.inputs.설계유형,
+                        "면적": job.inputs.면적, "직접인건비": 직접인건비, "도급예정액": 도급예정액,
+                        "용역비": None if 도급예정액 is None else engine.용역비(도급예정액),
+                        "파일": name, "오류": 오류,
+                    })
+
+        df_요약 = pd.DataFrame(요약, columns=요약열).sort_values("순번", ignore_index=True)
+        summary = BytesIO()
+        pd.concat([df_요약, 합계행(df_요약)], ignore_index=True).to_excel(summary, sheet_name="요약", index=False)
+        zf.writestr("요약.xlsx", summary.getvalue())
+    buf.seek(0)
+    return buf, df_요약
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="용역 목록 일괄 산출")
+    parser.add_argument("projects", help="용역 목록 CSV 또는 XLSX")
+    parser.add_argument("-o", "--output", default="산출결과.zip", help="결과 ZIP 경로")
+    parser.add_argument("--workers", type=int, default=None, help="작업 프로세스 수 (기본: CPU 수)")
+    args = parser.parse_args()
+
+    buf, df_요약 = run_batch(read_projects(args.projects), args.workers)
+    with open(args.output, "wb") as f:
+        f.write(buf.getvalue())
+    실패 = (df_요약["오류"].fillna("") != "").sum()
+    print(f"{len(df_요약)}건 중 {len(df_요약) - 실패}건 산출 → {args.output}")
+    if 실패:
+        print(df_요약.loc[df_요약["오류"].fillna("") != "", ["순번", "용역명", "오류"]].to_string(index=False))
@@ -0,0 +1,856 @@
+"""
+용역대가 산출 엔진 (Streamlit 비의존)
+
+조경 설계 / 소규모 환경영향평가 대행 두 분야의 계산 단계를 순수 함수로 제공한다.
+app.py 의 각 탭은 이 함수들을 호출해 화면만 그리고, 스크립트·테스트에서는
+price_조경() / price_환경() 한 번으로 전체 산출 결과(Estimate)를 얻는다.
+"""
+import sys
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+직급리스트 = ["기술사", "특급기술자", "고급기술자", "중급기술자", "초급기술자"]
+
+# ─── 조경 전용 기준 데이터 ───
+조경_설계유형 = ["기본설계", "실시설계", "기본 및 실시설계"]
+
+성격_options = [
+    "도시공원",
+    "공동주택 및 대지의 조경",
+    "녹지 및 도시숲",
+    "주제형 사업",
+]
+
+난이도_map = {
+    "도시공원": [
+        "단순 (소공원·묘지공원·보행자 전용도로·광장·도시공원 내 시설 교체사업)",
+        "보통 (국가도시공원·근린공원·체육공원·수변공원·도시농업공원·유원지·공공공지·광장(재생사업))",
+        "복잡1 (어린이공원·문화공원·역사공원·방재공원)",
+        "복잡2 (도시공원(재생사업))",
+    ],
+    "공동주택 및 대지의 조경": [
+        "보통 (공동주택 조경)",
+        "복잡1 (주택정원·건축물 조경·옥상조경(옥상정원))",
+        "복잡2 (실내조경(실내정원))",
+    ],
+    "녹지 및 도시숲": [
+        "단순 (완충 녹지·가로변 녹지·가로수·경관숲)",
+        "보통 (연결 녹지·경관 녹지·유휴지 녹화·마을숲·유아숲체험원)",
+        "복잡 (가로변 녹지(정원형)·학교숲·도시숲)",
+    ],
+    "주제형 사업": [
+        "단순 (야영장·둘레길·하천 경관 개선, 생태통로, 숲길조성)",
+        "보통 (테마시설 조성·관광지·관광지 활성화 사업·가로 환경개선 등)",
+        "복잡 (관광단지·동물원·골프장·스키장·2종 이상 복합 사업)",
+    ],
+}
+
+성격_coeffs = {
+    "도시공원":               1.0,
+    "공동주택 및 대지의 조경": 1.1,
+    "녹지 및 도시숲":          0.8,
+    "주제형 사업":             1.2,
+}
+
+난이도_coeffs = {
+    "도시공원": {"단순": 0.9, "보통": 1.0, "복잡1": 1.1, "복잡2": 1.2},
+    "공동주택 및 대지의 조경": {"보통": 1.0, "복잡1": 1.1, "복잡2": 1.2},
+    "녹지 및 도시숲": {"단순": 0.9, "보통": 1.0, "복잡": 1.1},
+    "주제형 사업": {"단순": 0.9, "보통": 1.0, "복잡": 1.1},
+}
+
+횟수_키워드 = ["위원회 심의", "주민설명회", "관계기관 협의"]
+
+# ─── 환경영향평가 전용 기준 데이터 ───
+환경_설계유형 = ["소규모 환경영향평가 대행"]
+
+보정_질문 = {
+    "보정_동식물": ["생태*자연도 2등급 및 3등급 권역", "생태*자연도 1등급 권역 및 별도관리지역"],
+    "보정_자연연경관심의": ["대상", "미대상"],
+    "보정_건강영향평가": ["대상", "미대상"],
+    "보정_수질오염총량계획": ["대상", "미대상"],
+}
+
+환경_엑셀_제외열 = [
+    "환산계수",
+    "α₁(환산계수)",
+    "보정계수(가)",
+    "보정계수(나)",
+    "보정계수(다)",
+    "보정계수(라)",
+]
+
+
+def 정리_환경_기준표(df: pd.DataFrame) -> pd.DataFrame:
+    """환경영향평가 기준 시트의 열 이름을 다듬고 직급 열을 숫자로 바꾼다."""
+    df = df.copy()
+    df.columns = [c.strip() for c in df.columns]
+    for 직급 in 직급리스트:
+        if 직급 in df.columns:
+            df[직급] = pd.to_numeric(df[직급], errors="coerce").fillna(0.0)
+    return df
+
+
+# ─── 입력 / 결과 타입 ───
+@dataclass
+class 내역서요율:
+    제경비율: float = 110.0
+    직접경비: int = 5_000_000
+    기술료율: float = 20.0
+    공제율: float = 0.432
+    부가세율: float = 10.0
+
+
+@dataclass
+class 조경입력:
+    설계유형: str = "기본설계"
+    면적: float = 100.0
+    대상지_성격: str = "도시공원"
+    난이도: str = 난이도_map["도시공원"][0]
+    전단계_활용: bool = False
+    기간: Optional[Dict[int, int]] = None
+    요율: 내역서요율 = field(default_factory=내역서요율)
+
+
+@dataclass
+class 환경입력:
+    설계유형: str = "소규모 환경영향평가 대행"
+    면적: float = 0.0
+    보정_동식물: str = 보정_질문["보정_동식물"][0]
+    보정_자연연경관심의: str = 보정_질문["보정_자연연경관심의"][0]
+    보정_건강영향평가: str = 보정_질문["보정_건강영향평가"][0]
+    보정_수질오염총량계획: str = 보정_질문["보정_수질오염총량계획"][0]
+    기간: Optional[Dict[int, int]] = None
+    요율: 내역서요율 = field(default_factory=내역서요율)
+
+
+@dataclass
+class Estimate:
+    기준계산결과: "산정결과"
+    투입인원DF: pd.DataFrame
+    직접인건비: float
+    df_detail: pd.DataFrame
+    도급예정액: float
+
+
+# ─── 산정기준 결과 (열 단위 표현) ───
+@dataclass(frozen=True, eq=False, slots=True, kw_only=True)
+class 산정결과(ABC):
+    """
+    산정기준 단계의 결과. 직급별 인·일은 float64 (행, 직급) 행렬, 단위는 작은 정수 코드와
+    단위표로 들고, 투입인원 단계에 들어가는 행은 불리언 마스크로 표시한다.
+
+    화면·엑셀용 DataFrame(숫자·빈 문자열·계산식이 섞인 object 열)은 to_frame() 을
+    부를 때만 만든다. 원본 기준표는 복사하지 않고 참조만 하므로 고치지 않는다.
+
+    계산식은 문자열로 들고 있지 않고 기준값(base)과 행별 계수 조합 코드(계수추적)로만
+    남긴다. 문자열은 계산식() 을 처음 부를 때 서로 다른 기준값·계수 조합마다 한 번씩만
+    만들어 붙이고, 전체 행을 만든 결과는 기억해 둔다.
+    """
+    원본: pd.DataFrame
+    업무구분: np.ndarray    # object
+    단위코드: np.ndarray    # int16, -1 = 빈 칸(NaN)
+    단위표: Tuple[str, ...]
+    업무행: np.ndarray      # bool, 투입인원 단계에 들어가는 행
+    base: np.ndarray        # (행, 직급) 기준 인·일
+    인일: np.ndarray        # (행, 직급) 계수를 곱해 반올림한 인·일
+    _계산식: Optional[np.ndarray] = field(default=None, init=False, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.업무구분)
+
+    @property
+    def 단위(self) -> np.ndarray:
+        return np.array(self.단위표 + (np.nan,), dtype=object)[self.단위코드]
+
+    def 업무표(self) -> pd.DataFrame:
+        """투입인원 단계용 표: 업무행만, 업무구분·단위·직급별 인·일(float64)."""
+        표 = pd.DataFrame({
+            "업무구분": self.업무구분[self.업무행],
+            "단위": self.단위[self.업무행],
+        })
+        for i, 직급 in enumerate(직급리스트):
+            표[직급] = self.인일[self.업무행, i]
+        return 표
+
+    # 하위 클래스가 정한다
+    @abstractmethod
+    def 계수추적(self) -> Tuple[np.ndarray, List[str]]:
+        """(행별 계수 조합 번호, 번호별 계산식 꼬리 문자열)."""
+
+    @abstractmethod
+    def _기준값_문자열(self, v: float) -> str:
+        """계산식 앞머리에 쓰는 기준값 표기."""
+
+    @abstractmethod
+    def _빈칸(self) -> np.ndarray:
+        """(행, 직급) 계산값·계산식을 빈 칸으로 두는 칸."""
+
+    @abstractmethod
+    def to_frame(self, rows=None) -> pd.DataFrame:
+        """화면·엑셀용 산정기준 표. rows 를 주면 그 행만."""
+
+    def 계산식(self, rows=None) -> np.ndarray:
+        """
+        (행, 직급) 계산식 문자열 배열. rows 를 주면 그 행만 만든다.
+        전체 행을 만든 결과는 기억해 두고 다시 쓴다.
+        """
+        if rows is None and self._계산식 is not None:
+            return self._계산식
+        idx = np.arange(len(self)) if rows is None else np.asarray(rows)
+        코드, 꼬리표 = self.계수추적()
+        값, 역 = np.unique(self.base[idx], return_inverse=True)
+        기준값 = np.array([self._기준값_문자열(v) for v in 값.tolist()], dtype=object)
+        식 = 기준값[역.reshape(len(idx), -1)] + np.array(꼬리표, dtype=object)[코드[idx]][:, None]
+        식[self._빈칸()[idx]] = ""
+        if rows is None:
+            object.__setattr__(self, "_계산식", 식)
+        return 식
+
+
+def _조합번호(비트: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """행별 계수 조합 값 → (0 부터 매긴 조합 번호, 조합 번호별 원래 값)."""
+    값, 번호 = np.unique(비트, return_inverse=True)
+    return 번호.reshape(-1), 값
+
+
+def _단위_코드(단위: pd.Series) -> Tuple[np.ndarray, Tuple[str, ...]]:
+    codes, uniques = pd.factorize(단위)
+    return codes.astype(np.int16), tuple(sys.intern(str(u)) for u in uniques)
+
+
+# ─── 공통: 배열 반올림 / 노임단가 / 내역서 ───
+def 반올림(v, ndigits: int) -> np.ndarray:
+    """
+    내장 round() 와 같은 값을 내는 배열 반올림.
+
+    np.round 는 v×10ⁿ 을 정수로 맞춘 뒤 나누므로 8.105 처럼 십진 경계에 걸린 값에서
+    round() 와 달라질 수 있다. 경계 근처 칸만 round() 로 다시 계산한다.
+    """
+    v = np.asarray(v, dtype=float)
+    scaled = v * 10.0 ** ndigits
+    out = np.round(scaled) / 10.0 ** ndigits
+    경계 = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if 경계.any():
+        out = np.array(out, copy=True)
+        out[경계] = [round(x, ndigits) for x in v[경계].tolist()]
+    return out
+
+
+def 거듭제곱(x, p: float) -> np.ndarray:
+    """
+    float ** p 와 같은 값을 내는 배열 거듭제곱.
+
+    numpy 배열 ** 는 SIMD 경로를 타서 스칼라 계산과 마지막 자리가 다를 수 있고, 그 차이가
+    반올림 경계를 넘기면 화면 금액이 달라진다. 서로 다른 값마다 한 번씩 파이썬 float 로 계산한다.
+    """
+    x = np.asarray(x, dtype=float)
+    값, 위치 = np.unique(x.ravel(), return_inverse=True)
+    return np.array([v ** p for v in 값.tolist()], dtype=float)[위치].reshape(x.shape)
+
+
+
+@dataclass(frozen=True, slots=True)
+class 노임단가표:
+    """
+    노임단가 시트를 한 번 해석해 둔 읽기 전용 색인: (직종명, 분야) → 단가.
+    조경은 '건설', 환경은 '환경' 분야를 같은 색인에서 찾는다.
+    """
+    단가: Mapping[Tuple[str, str], float]
+    분야: Tuple[str, ...]
+
+    def __post_init__(self):
+        object.__setattr__(self, "단가", MappingProxyType(dict(self.단가)))
+        object.__setattr__(self, "분야", tuple(self.분야))
+
+    def __reduce__(self):
+        # MappingProxyType 은 피클되지 않으므로 dict 로 넘긴다 (작업 프로세스·캐시용)
+        return (노임단가표, (dict(self.단가), self.분야))
+
+    @classmethod
+    def from_frame(cls, 노임단가_df: pd.DataFrame) -> "노임단가표":
+        """
+        직종명 열과 분야 열들을 읽는다. 열 이름·직종명의 앞뒤 공백과 천 단위 쉼표는 뗀다.
+        숫자로 읽히지 않는 분야 열은 색인에서 빠지고, 같은 직종명이 여럿이면 첫 행을 쓴다.
+        """
+        columns = [str(c).strip() for c in 노임단가_df.columns]
+        직종명 = 노임단가_df.iloc[:, columns.index("직종명")].astype(str).str.strip().tolist()
+        단가, 분야목록 = {}, []
+        for i, 분야 in enumerate(columns):
+            if 분야 == "직종명":
+                continue
+            try:
+                값 = (
+                    노임단가_df.iloc[:, i]
+                    .astype(str)
+                    .str.replace(",", "")
+                    .str.strip()
+                    .astype(float)
+                    .tolist()
+                )
+            except ValueError:
+                continue
+            분야목록.append(분야)
+            for 이름, v in zip(직종명, 값):
+                단가.setdefault((이름, 분야), v)
+        return cls(단가, tuple(분야목록))
+
+    def get(self, 직종명: str, 분야: str) -> float:
+        """시트에 없는 직종명은 0.0. 분야 열이 없거나 숫자가 아니면 KeyError."""
+        if 분야 not in self.분야:
+            raise KeyError(f"노임단가 시트에서 '{분야}' 단가를 읽을 수 없습니다")
+        return self.단가.get((직종명, 분야), 0.0)
+
+    def 직급별(self, 분야: str) -> Dict[str, float]:
+        return {직급: self.get(직급, 분야) for 직급 in 직급리스트}
+
+
+def _노임단가표(노임단가) -> 노임단가표:
+    """이미 만든 색인은 그대로, 노임단가 시트 DataFrame 은 색인으로 바꿔 돌려준다."""
+    if isinstance(노임단가, 노임단가표):
+        return 노임단가
+    return 노임단가표.from_frame(노임단가)
+
+
+def 인건비_행렬(인일: np.ndarray, 단가: "Dict[str, float] | np.ndarray", 기간) -> np.ndarray:
+    """
+    (..., 직급) 인·일 배열과 기간(인일에서 직급 축을 뺀 모양으로 broadcast)으로
+    업무별 계 = round(Σ 직급 인·일 × 노임단가 × 기간, 2) 를 구한다.
+    직급 순서대로 더해 행마다 sum() 으로 구한 값과 같다.
+    단가는 직급 → 단가 사전이거나, 마지막 축이 직급(직급리스트 순서)인 배열이다.
+    배열의 앞 축은 인일과 broadcast 되므로 (버전, 1, 직급) 단가로 여러 해 단가를 한 번에 계산한다.
+    """
+    if isinstance(단가, np.ndarray):
+        단가열 = [단가[..., i] for i in range(len(직급리스트))]
+    else:
+        단가열 = [단가[직급] for 직급 in 직급리스트]
+    인건비합 = np.zeros(np.broadcast_shapes(인일.shape[:-1], np.shape(단가열[0])))
+    for i, 값 in enumerate(단가열):
+        인건비합 = 인건비합 + 인일[..., i] * 값
+    return 반올림(인건비합 * np.asarray(기간, dtype=float), 2)
+
+
+def 인건비_계(결과표: pd.DataFrame, 단가: Dict[str, float], 기간) -> np.ndarray:
+    """투입인원 표 모든 행의 계를 한 번에 구한다."""
+    인일 = np.column_stack([결과표[직급].to_numpy(dtype=float) for 직급 in 직급리스트])
+    return 인건비_행렬(인일, 단가, 기간)
+
+
+def 업무합계(계: np.ndarray) -> np.ndarray:
+    """
+    (..., 행) 계를 행 축으로 더한 직접인건비. 불리언 색인 등으로 메모리 순서가 바뀐 배열도
+    연속 배열로 맞춰 더하므로, 점마다 투입인원 표의 계.sum() 과 더하는 순서가 같다.
+    """
+    return np.ascontiguousarray(계).sum(axis=-1)
+
+
+def 내역서_금액(직접인건비, 요율: 내역서요율) -> Tuple:
+    """
+    (제경비, 기술료, 손해공제비, 부가세, 도급예정액).
+    직접인건비는 스칼라 또는 배열이며, 같은 순서의 사칙연산이라 어느 쪽이든 값이 같다.
+    """
+    제경비     = 직접인건비 * 요율.제경비율   / 100
+    기술료     = (직접인건비 + 제경비) * 요율.기술료율 / 100
+    손해공제비 = (직접인건비 + 제경비 + 요율.직접경비 + 기술료) * 요율.공제율   / 100
+    부가세     = (직접인건비 + 제경비 + 요율.직접경비 + 기술료 + 손해공제비) * 요율.부가세율 / 100
+    도급예정액  = 직접인건비 + 제경비 + 요율.직접경비 + 기술료 + 손해공제비 + 부가세
+    return 제경비, 기술료, 손해공제비, 부가세, 도급예정액
+
+
+def 용역비(도급예정액):
+    """도급예정액에서 천 원 미만을 버린 용역비 (갑지·요약 공통). 스칼라는 int, 배열은 int64 배열."""
+    if np.ndim(도급예정액) == 0:
+        return int(도급예정액 // 1000) * 1000
+    return (np.asarray(도급예정액, dtype=float) // 1000 * 1000).astype("int64")
+
+
+def 내역서(직접인건비: float, 요율: 내역서요율) -> Tuple[pd.DataFrame, float]:
+    """직접인건비와 요율로 내역서 표와 도급예정액을 만든다."""
+    제경비율, 직접경비, 기술료율 = 요율.제경비율, 요율.직접경비, 요율.기술료율
+    공제율, 부가세율 = 요율.공제율, 요율.부가세율
+    제경비, 기술료, 손해공제비, 부가세, 도급예정액 = 내역서_금액(직접인건비, 요율)
+
+    rows = [
+        {"공종":"직접인건비", "규격":"-",         "수량":"-", "단위":"", "총액":직접인건비, "노무비":직접인건비, "경비":"",        "비고":""},
+        {"공종":"제경비",     "규격":"직접인건비×율", "수량":"-", "단위":"", "총액":"",    "노무비":"",        "경비":제경비,    "비고":f"{제경비율}%"},
+        {"공종":"직접경비",   "규격":"제출도서 인쇄",   "수량":1,   "단위":"식", "총액":"",    "노무비":"",        "경비":직접경비,  "비고":""},
+        {"공종":"기술료",     "규격":"(직접인건비+제경비)×율","수량":"-", "단위":"", "총액":"",    "노무비":"",        "경비":기술료,    "비고":f"{기술료율}%"},
+        {"공종":"손해공제비", "규격":"용역비×율",      "수량":"-", "단위":"", "총액":"",    "노무비":"",        "경비":손해공제비,"비고":f"{공제율}"},
+        {"공종":"부가가치세", "규격":"합계×율",       "수량":"-", "단위":"", "총액":"",    "노무비":"",        "경비":부가세,    "비고":f"{부가세율}%"},
+        {"공종":"도급예정액","규격":"",             "수량":"-", "단위":"", "총액":도급예정액,"노무비":"",        "경비":"",        "비고":""},
+    ]
+    df = pd.DataFrame(rows)
+
+    for c in ["총액","노무비","경비"]:
+        df[c] = df[c].apply(lambda x: f"{int(x):,}" if isinstance(x,(int,float)) else x)
+
+    return df, 도급예정액
+
+
+# ─── 조경 ───
+@dataclass(frozen=True)
+class 조경계수마스크:
+    """기준표 한 장에 대해 한 번만 구하는 행별 계수 적용 여부."""
+    환산: np.ndarray     # 환산계수(α₁) 적용 행
+    보정: np.ndarray     # 보정계수(α₂, α₃) 적용 행 (조사·기술협의 제외)
+    전단계: np.ndarray   # 업무구분이 2.1 로 시작하는 행
+
+
+@dataclass(frozen=True, eq=False, slots=True, kw_only=True)
+class 조경산정결과(산정결과):
+    환산계수: float
+    a2: float
+    a3: float
+    전단계_활용: bool
+    마스크: 조경계수마스크
+
+    def 계수추적(self) -> Tuple[np.ndarray, List[str]]:
+        """조합 비트: 1 = α₁, 2 = α₂·α₃, 4 = 전단계 (곱하는 순서와 같다)."""
+        비트 = (
+            self.마스크.환산.astype(np.int8)
+            | self.마스크.보정.astype(np.int8) << 1
+            | (self.마스크.전단계 & self.전단계_활용).astype(np.int8) << 2
+        )
+        번호, 조합 = _조합번호(비트)
+        꼬리표 = []
+        for b in 조합.tolist():
+            꼬리 = ""
+            if b & 1:
+                꼬리 += f" × {self.환산계수:.3f}"
+            if b & 2:
+                꼬리 += f" × {self.a2:.3f} × {self.a3:.3f}"
+            if b & 4:
+                꼬리 += " × 0.700"
+            꼬리표.append(꼬리)
+        return 번호, 꼬리표
+
+    def _기준값_문자열(self, v: float) -> str:
+        return str(v)
+
+    def _빈칸(self) -> np.ndarray:
+        return np.repeat(~self.업무행[:, None], len(직급리스트), axis=1)
+
+    def to_frame(self, rows=None) -> pd.DataFrame:
+        """화면·엑셀용 표: 직급 열은 계산값, 뒤에 {직급}_계산식 열. 머리행은 빈 칸."""
+        idx = np.arange(len(self)) if rows is None else np.asarray(rows)
+        기준표 = self.원본.iloc[idx].copy() if rows is not None else self.원본.copy()
+        식 = self.계산식(rows)
+        머리행 = ~self.업무행[idx]
+        for i, 직급 in enumerate(직급리스트):
+            값 = self.인일[idx, i].astype(object)
+            값[머리행] = ""
+            기준표[직급] = 값
+            기준표[f"{직급}_계산식"] = 식[:, i]
+        return 기준표.fillna("")
+
+
+def 계수마스크_조경(기준표: pd.DataFrame) -> 조경계수마스크:
+    업무구분 = 기준표["업무구분"]
+    첫토큰 = 업무구분.astype(str).str.strip().str.split().str[0]
+    return 조경계수마스크(
+        환산=(기준표["환산계수(α₁)"] == "적용").to_numpy(),
+        보정=((기준표["보정계수(α₂, α₃)"] == "적용") & ~업무구분.isin(["조사", "기술협의"])).to_numpy(),
+        전단계=첫토큰.str.startswith("2.1").fillna(False).to_numpy(dtype=bool),
+    )
+
+
+def 환산계수_조경(면적) -> np.ndarray:
+    """대상 면적(스칼라 또는 배열)의 환산계수. 5,000㎡ 이하는 0.7승, 초과는 0.4승."""
+    면적 = np.asarray(면적, dtype=float)
+    return np.where(면적 <= 5000, 거듭제곱(면적 / 5000, 0.7), 거듭제곱(면적 / 5000, 0.4))
+
+
+def 보정계수_조경(성격: str, 난이도: str) -> Tuple[float, float]:
+    """대상지 성격(α₂)과 업무 난이도 라벨(α₃)의 보정계수."""
+    diff_key = 난이도.split()[0] if 난이도 else ""
+    a2 = 성격_coeffs.get(성격, 1.0)
+    a3 = 난이도_coeffs.get(성격, {}).get(diff_key, 1.0)
+    return a2, a3
+
+
+def 투입인원_행렬_조경(
+    base: np.ndarray,
+    마스크: 조경계수마스크,
+    환산계수,
+    보정계수,
+    전단계_활용,
+) -> np.ndarray:
+    """
+    (행, 직급) 기준 인·일 행렬에 계수를 한 번에 곱한다.
+
+    환산계수·보정계수(α₂·α₃)·전단계_활용은 길이 k 의 배열로 줄 수 있고,
+    결과는 (k, 행, 직급) 배열이다. 곱하는 순서는 화면 계산과 같다.
+    """
+    환산계수 = np.atleast_1d(np.asarray(환산계수, dtype=float))[:, None]
+    보정계수 = np.atleast_1d(np.asarray(보정계수, dtype=float))[:, None]
+    전단계_활용 = np.atleast_1d(np.asarray(전단계_활용, dtype=bool))[:, None]
+
+    f1 = np.where(마스크.환산[None, :], 환산계수, 1.0)
+    f2 = np.where(마스크.보정[None, :], 보정계수, 1.0)
+    f3 = np.where(마스크.전단계[None, :] & 전단계_활용, 0.7, 1.0)
+
+    v = base[None, :, :] * f1[:, :, None]
+    v = v * f2[:, :, None]
+    v = v * f3[:, :, None]
+    return 반올림(v, 2)
+
+
+def 산정기준_조경(
+    기준표: pd.DataFrame,
+    면적: float,
+    성격: str,
+    난이도: str,
+    전단계_활용: bool = False,
+) -> 조경산정결과:
+    """조경 기준표에 환산계수(α₁)·보정계수(α₂, α₃)·전단계 계수를 적용한다."""
+    base = np.column_stack([
+        pd.to_numeric(기준표[직급], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+        for 직급 in 직급리스트
+    ])
+    환산계수 = float(환산계수_조경(면적))
+    a2, a3 = 보정계수_조경(성격, 난이도)
+    마스크 = 계수마스크_조경(기준표)
+    계산값 = 투입인원_행렬_조경(base, 마스크, 환산계수, a2 * a3, 전단계_활용)[0]
+
+    단위코드, 단위표 = _단위_코드(기준표["단위"])
+    return 조경산정결과(
+        원본=기준표,
+        업무구분=기준표["업무구분"].fillna("").to_numpy(dtype=object),
+        단위코드=단위코드,
+        단위표=단위표,
+        업무행=(기준표["단위"].fillna("") != "").to_numpy(),
+        base=base,
+        인일=계산값,
+        환산계수=환산계수,
+        a2=a2,
+        a3=a3,
+        전단계_활용=bool(전단계_활용),
+        마스크=마스크,
+    )
+
+
+def 기간항목_조경(기준결과: 조경산정결과) -> List[Tuple[str, int]]:
+    """투입인원 탭의 기간 입력란 (라벨, 기본값) 목록. 횟수 키워드는 왼쪽 열에서만 본다."""
+    결과표 = 기준결과.업무표()
+    half = (len(결과표) + 1) // 2
+    항목 = []
+    for idx, row in 결과표.iterrows():
+        업무 = row["업무구분"]
+        단위 = row["단위"].strip()
+        if 단위 == "식":
+            기본값 = 1
+            라벨 = f"{업무} (식)"
+        elif idx < half and any(kw in 업무 for kw in 횟수_키워드):
+            기본값 = 2 if "주민설명회" in 업무 else 1
+            라벨 = f"{업무} (회)"
+        else:
+            기본값 = 2
+            라벨 = f"{업무} 기간 (일)"
+        항목.append((라벨, 기본값))
+    return 항목
+
+
+def 투입인원_조경(
+    기준결과: 조경산정결과,
+    노임단가: "노임단가표 | pd.DataFrame",
+    기간값: Optional[Dict[int, int]] = None,
+) -> Tuple[pd.DataFrame, float]:
+    """기간과 건설 노임단가로 업무별 인건비(계)를 구해 (투입인원DF, 직접인건비)를 돌려준다."""
+    결과표 = 기준결과.업무표()
+
+    기본 = [기본값 for _, 기본값 in 기간항목_조경(기준결과)]
+    기간값 = 기간값 or {}
+    결과표["기간"] = [기간값.get(i, 기본[i]) for i in range(len(결과표))]
+
+    건설단가 = _노임단가표(노임단가).직급별("건설")
+
+    결과표["계"] = 인건비_계(결과표, 건설단가, 결과표["기간"])
+
+    표시열   = ["업무구분","계"] + 직급리스트 + ["기간"]
+    sum_계   = 결과표["계"].sum()
+    총계행    = {c: "" for c in 표시열}
+    총계행["업무구분"] = "총계"
+    총계행["계"]    = sum_계
+    total_df = pd.DataFrame([총계행])
+    final_df = pd.concat([total_df, 결과표[표시열]], ignore_index=True)
+
+    for c in ["계","기간"] + 직급리스트:
+        final_df[c] = final_df[c].apply(
+            lambda x: f"{x:,.2f}" if isinstance(x, (int, float)) else x
+        )
+
+    return final_df, sum_계
+
+
+def price_조경(
+    inputs: 조경입력,
+    기준표: pd.DataFrame,
+    노임단가: "노임단가표 | pd.DataFrame",
+) -> Estimate:
+    """조경 설계 대가를 기준표 → 투입인원 → 내역서 순으로 한 번에 산출한다."""
+    기준결과 = 산정기준_조경(
+        기준표, inputs.면적, inputs.대상지_성격, inputs.난이도, inputs.전단계_활용
+    )
+    투입인원DF, 직접인건비 = 투입인원_조경(기준결과, 노임단가, inputs.기간)
+    df_detail, 도급예정액 = 내역서(직접인건비, inputs.요율)
+    return Estimate(기준결과, 투입인원DF, 직접인건비, df_detail, 도급예정액)
+
+
+# ─── 환경영향평가 ───
+보정열_환경 = ["보정계수(가)", "보정계수(나)", "보정계수(다)", "보정계수(라)"]
+
+
+def 규칙번호_환경(기준표_env: pd.DataFrame) -> np.ndarray:
+    """'환산계수' 열의 규칙 번호(1~3)를 숫자 배열로. 숫자가 아닌 칸은 0(=α₁ 1.0)."""
+    if "환산계수" not in 기준표_env.columns:
+        return np.zeros(len(기준표_env))
+    rule = 기준표_env["환산계수"]
+    if pd.api.types.is_numeric_dtype(rule):
+        return rule.fillna(0).to_numpy(dtype=float)
+    return np.array(
+        [r if isinstance(r, (int, float)) and r == r else 0 for r in rule],
+        dtype=float,
+    )
+
+
+def 환산계수_환경(rule, A) -> np.ndarray:
+    """
+    환산계수 규칙 번호와 대상 면적으로 α₁ 을 구한다.
+
+    rule·A 는 스칼라 또는 배열이며 서로 broadcast 된다
+    (예: rule[None, :] 와 면적[:, None] → (면적 수, 행) 배열).
+    """
+    rule = np.asarray(rule, dtype=float)
+    A = np.asarray(A, dtype=float)
+    rule, A = np.broadcast_arrays(rule, A)
+    r2, r3 = rule == 2, rule == 3
+    pow06 = 반올림(거듭제곱(A / 100000, 0.6), 3)
+    pow03 = 반올림(거듭제곱(A / 100000, 0.3), 3)
+    return np.select(
+        [
+            r2 & (A <= 10000),
+            r2 & (A <= 100000),
+            r2 & (A <= 1000000),
+            r2,
+            r3 & (A <= 30000),
+            r3 & (A <= 1000000),
+            r3,
+        ],
+        [0.25, pow06, pow03, 2.00, 0.49, pow06, 3.98],
+        default=1.00,
+    )
+
+
+def 보정계수_환경(q1: str, q2: str, q3: str, q4: str) -> Tuple[float, float, float, float]:
+    """기초입력의 추가 질문 답변으로 보정계수 (가, 나, 다, 라)를 정한다."""
+    factor_가 = 1.00 if q1 == "생태*자연도 2등급 및 3등급 권역" else 1.20
+    factor_나 = 1.00 if q2 == "미대상" else 2.00
+    factor_다 = 1.00 if q3 == "미대상" else 1.15
+    factor_라 = 1.00 if q4 == "미대상" else 1.40
+    return factor_가, factor_나, factor_다, factor_라
+
+
+def 보정마스크_환경(기준표_env: pd.DataFrame) -> np.ndarray:
+    """(행, 4) 불리언 행렬: 보정계수(가~라) 열이 '반영'인 칸."""
+    return np.column_stack([
+        (기준표_env[c] == "반영").to_numpy() if c in 기준표_env.columns
+        else np.zeros(len(기준표_env), dtype=bool)
+        for c in 보정열_환경
+    ])
+
+
+def 투입인원_행렬_환경(
+    base: np.ndarray,
+    α1: np.ndarray,
+    보정마스크: np.ndarray,
+    보정계수,
+) -> np.ndarray:
+    """
+    (행, 직급) 기준 인·일 행렬에 α₁ 과 보정계수(가~라)를 곱한다.
+
+    α1 은 (k, 행), 보정계수는 (k, 4) 까지 줄 수 있고 결과는 (k, 행, 직급) 이다.
+    보정계수는 '반영' 마스크로 고른 (k, 행, 4) 계수 행렬을 가→라 순서로 곱한다.
+    """
+    α1 = np.atleast_2d(np.asarray(α1, dtype=float))
+    보정계수 = np.atleast_2d(np.asarray(보정계수, dtype=float))
+    계수 = np.where(보정마스크[None, :, :], 보정계수[:, None, :], 1.0)
+
+    v = base[None, :, :] * α1[:, :, None]
+    for j in range(계수.shape[2]):
+        v = v * 계수[:, :, j, None]
+    return 반올림(v, 2)
+
+
+@dataclass(frozen=True, eq=False, slots=True, kw_only=True)
+class 환경산정결과(산정결과):
+    α1: np.ndarray           # (행,) 환산계수
+    보정계수: Tuple[float, float, float, float]
+    보정마스크: np.ndarray   # (행, 4)
+    유효: np.ndarray         # (행, 직급) 기준 인·일이 0 보다 큰 칸
+
+    def 계수추적(self) -> Tuple[np.ndarray, List[str]]:
+        """조합: 행의 α₁ 값과 보정계수(가~라) 반영 비트(1, 2, 4, 8)."""
+        α값, α번호 = np.unique(self.α1, return_inverse=True)
+        비트 = (self.보정마스크.astype(np.int64) << np.arange(4)).sum(axis=1)
+        번호, 조합 = _조합번호(α번호.reshape(-1) * 16 + 비트)
+        꼬리표 = []
+        for c in 조합.tolist():
+            꼬리 = f" × {α값[c // 16]:.3f}"
+            for j, factor in enumerate(self.보정계수):
+                if c & (1 << j):
+                    꼬리 += f" × {factor:.2f}"
+            꼬리표.append(꼬리)
+        return 번호, 꼬리표
+
+    def _기준값_문자열(self, v: float) -> str:
+        return f"{v:.2f}"
+
+    def _빈칸(self) -> np.ndarray:
+        return ~self.유효
+
+    def to_frame(self, rows=None) -> pd.DataFrame:
+        """화면·엑셀용 표: α₁(환산계수) 열과 {직급}_계산식 열을 붙이고, 인·일이 없는 칸은 빈 칸."""
+        idx = np.arange(len(self)) if rows is None else np.asarray(rows)
+        기준표_env = self.원본.iloc[idx].copy() if rows is not None else self.원본.copy()
+        기준표_env["α₁(환산계수)"] = self.α1[idx].tolist()
+        식 = self.계산식(rows)
+        for i, 직급 in enumerate(직급리스트):
+            값 = self.인일[idx, i].astype(object)
+            값[~self.유효[idx, i]] = ""
+            기준표_env[직급] = 값.tolist()
+            기준표_env[f"{직급}_계산식"] = 식[:, i].tolist()
+        return 기준표_env
+
+
+def 산정기준_환경(
+    기준표_env: pd.DataFrame,
+    면적: float,
+    q1: str,
+    q2: str,
+    q3: str,
+    q4: str,
+) -> 환경산정결과:
+    """환경영향평가 기준표에 α₁ 과 보정계수(가~라)를 적용한다."""
+    A = float(면적)
+    α1 = 환산계수_환경(규칙번호_환경(기준표_env), A)
+
+    factors = 보정계수_환경(q1, q2, q3, q4)
+    마스크 = 보정마스크_환경(기준표_env)
+
+    base = np.column_stack([
+        pd.to_numeric(기준표_env[직급], errors="coerce").to_numpy(dtype=float)
+        if 직급 in 기준표_env.columns else np.zeros(len(기준표_env))
+        for 직급 in 직급리스트
+    ])
+    유효 = base > 0
+    계산값 = 투입인원_행렬_환경(np.where(유효, base, 0.0), α1[None, :], 마스크, factors)[0]
+
+    단위코드, 단위표 = _단위_코드(기준표_env["단위"])
+    return 환경산정결과(
+        원본=기준표_env,
+        업무구분=기준표_env["업무구분"].to_numpy(dtype=object),
+        단위코드=단위코드,
+        단위표=단위표,
+        # 빈 단위(NaN)는 'nan' 으로 읽혀 머리행도 투입인원 표에 남는다 (기간·계 없음)
+        업무행=(기준표_env["단위"].astype(str).str.strip() != "").to_numpy(),
+        base=base,
+        인일=np.where(유효, 계산값, 0.0),
+        α1=α1,
+        보정계수=factors,
+        보정마스크=마스크,
+        유효=유효,
+    )
+
+
+def 표시용_기준표_환경(기준결과_env: 환경산정결과) -> pd.DataFrame:
+    표시열 = ["업무구분", "단위"]
+    for 직급 in 직급리스트:
+        표시열 += [직급, f"{직급}_계산식"]
+    return 기준결과_env.to_frame()[표시열].copy().replace(0, "").fillna("")
+
+
+def _투입인원표_환경(기준결과_env: 환경산정결과) -> Tuple[pd.DataFrame, pd.Series]:
+    결과표 = 기준결과_env.업무표()
+    is_technical = 결과표[직급리스트].sum(axis=1) > 0
+    return 결과표, is_technical
+
+
+def 기간항목_환경(기준결과_env: 환경산정결과) -> List[Optional[Tuple[str, int]]]:
+    """투입인원 탭의 기간 입력란 (라벨, 기본값) 목록. 기술인력이 없는 행은 None."""
+    결과표, is_technical = _투입인원표_환경(기준결과_env)
+    항목 = []
+    for idx, row in 결과표.iterrows():
+        if not is_technical.iloc[idx]:
+            항목.append(None)
+            continue
+        업무 = row["업무구분"]
+        단위 = str(row["단위"]).strip()
+        if 단위 == "식":
+            항목.append((f"{업무} (식)", 1))
+        else:
+            항목.append((f"{업무} 기간 (일)", 1))
+    return 항목
+
+
+def 투입인원_환경(
+    기준결과_env: 환경산정결과,
+    노임단가: "노임단가표 | pd.DataFrame",
+    기간값: Optional[Dict[int, int]] = None,
+) -> Tuple[pd.DataFrame, float]:
+    """기간과 환경 노임단가로 업무별 인건비(계)를 구해 (투입인원DF, 직접인건비)를 돌려준다."""
+    결과표, is_technical = _투입인원표_환경(기준결과_env)
+
+    기간값 = 기간값 or {}
+    기간 = []
+    for i, 항목 in enumerate(기간항목_환경(기준결과_env)):
+        기간.append(0 if 항목 is None else 기간값.get(i, 항목[1]))
+    결과표["기간"] = 기간
+
+    단가사전 = _노임단가표(노임단가).직급별("환경")
+
+    결과표["계"] = np.where(is_technical, 인건비_계(결과표, 단가사전, 결과표["기간"]), 0.0)
+
+    표시열 = ["업무구분", "계"] + 직급리스트 + ["기간"]
+
+    sum_계_env = 결과표["계"].sum()
+    총계행 = {c: "" for c in 표시열}
+    총계행["업무구분"] = "총계"
+    총계행["계"] = sum_계_env
+    total_df = pd.DataFrame([총계행])
+
+    final_df = pd.concat([total_df, 결과표[표시열]], ignore_index=True)
+
+    def fmt(x):
+        if isinstance(x, (int, float)):
+            return "" if x == 0 else f"{x:,.2f}"
+        return x
+
+    for c in ["계", "기간"] + 직급리스트:
+        final_df[c] = final_df[c].apply(fmt)
+
+    return final_df, sum_계_env
+
+
+def price_환경(
+    inputs: 환경입력,
+    기준표_env: pd.DataFrame,
+    노임단가: "노임단가표 | pd.DataFrame",
+) -> Estimate:
+    """소규모 환경영향평가 대행 비용을 기준표 → 투입인원 → 내역서 순으로 한 번에 산출한다."""
+    기준결과 = 산정기준_환경(
+        기준표_env,
+        inputs.면적,
+        inputs.보정_동식물,
+        inputs.보정_자연연경관심의,
+        inputs.보정_건강영향평가,
+        inputs.보정_수질오염총량계획,
+    )
+    투입인원DF, 직접인건비 = 투입인원_환경(기준결과, 노임단가, inputs.기간)
+    df_detail, 도급예정액 = 내역서(직접인건비, inputs.요율)
+    return Estimate(기준결과, 투입인원DF, 직접인건비, df_detail, 도급예정액)
@@ -0,0 +1,327 @@
+"""
+산출내역서 엑셀 내보내기 (Streamlit 비의존)
+
+템플릿을 한 번만 열어 '갑지' 칸과 다섯 개 데이터 시트를 같은 워크북에 채운 뒤
+곧바로 메모리 버퍼로 저장한다. 임시 파일을 만들지 않는다.
+데이터 시트는 pandas 의 to_excel(index=False, header=False, startrow=2) 과
+같은 위치·같은 값으로 기록된다.
+
+파싱한 템플릿은 (경로, 수정시각) 별로 프로세스에 한 번만 보관하고, 요청마다
+pickle 사본을 꺼내 쓴다. 사본 복원은 XML 을 다시 파싱하는 것보다 서너 배 빠르며,
+템플릿 파일이 바뀌면 수정시각이 달라져 자동으로 다시 읽는다.
+(openpyxl Workbook 은 copy.deepcopy 후 저장하면 스타일 색인이 깨진다.)
+과업지시서 DOCX 도 같은 방식으로, docxtpl 의 XML 전처리와 Jinja 컴파일 결과를
+템플릿별로 한 번만 만들어 둔다.
+
+excel_bytes() / directive_bytes() 는 입력 전체(세션 값, 결과 DataFrame, 날짜,
+템플릿 수정시각)의 지문으로 결과 바이트를 기억해, 같은 산출 결과를 다시 받을 때는
+새로 만들지 않는다.
+"""
+import datetime as dt
+import hashlib
+import math
+import os
+import pickle
+import re
+import threading
+import zipfile
+from collections import OrderedDict
+from io import BytesIO
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from docxtpl import DocxTemplate
+from jinja2 import Template
+from openpyxl import load_workbook
+
+import engine
+
+
+DIRECTIVE_TEMPLATE = "template_directive.docx"
+
+데이터시트 = ["내역서", "투입인원 및 내역", "투입인원수 산정기준", "노임단가", "손해보험요율"]
+
+DATA_START_ROW = 3   # 1행 제목, 2행 머리글 다음부터
+
+
+_템플릿: Dict[str, Tuple[int, bytes]] = {}
+_템플릿_lock = threading.Lock()
+
+
+def load_template(template_path: str):
+    """파싱해 둔 템플릿의 새 사본(Workbook). 파일이 없으면 FileNotFoundError."""
+    key = os.path.abspath(template_path)
+    mtime = os.stat(key).st_mtime_ns
+    cached = _템플릿.get(key)
+    if cached is None or cached[0] != mtime:
+        blob = pickle.dumps(load_workbook(key), protocol=pickle.HIGHEST_PROTOCOL)
+        with _템플릿_lock:
+            _템플릿[key] = cached = (mtime, blob)
+    return pickle.loads(cached[1])
+
+
+def 셀값(val):
+    """DataFrame 값을 엑셀 셀 값으로 바꾼다 (pandas ExcelWriter 와 같은 규칙)."""
+    if val is None or (isinstance(val, (float, np.floating)) and math.isnan(val)):
+        return ""
+    if val is pd.NaT:
+        return ""
+    if isinstance(val, (bool, np.bool_)):
+        return bool(val)
+    if isinstance(val, (int, np.integer)):
+        return int(val)
+    if isinstance(val, (float, np.floating)):
+        return float(val)
+    if isinstance(val, (dt.date, dt.datetime)):
+        return val
+    return str(val)
+
+
+def write_frame(ws, df: pd.DataFrame, startrow: int = DATA_START_ROW):
+    """머리글·인덱스 없이 df 값을 startrow 행 A열부터 덮어쓴다."""
+    for r, values in enumerate(df.itertuples(index=False, name=None), start=startrow):
+        for c, val in enumerate(values, start=1):
+            ws.cell(row=r, column=c).value = 셀값(val)
+
+
+def fill_갑지(ws, 용역명: str, 발주기관명: str, 도급예정액: float, today: Optional[dt.date] = None):
+    ws["D10"].value = 용역명
+    ws["G22"].value = 발주기관명
+    ws["G20"].value = f"{engine.용역비(도급예정액):,} 원"
+    ws["A1"].value = (today or dt.date.today()).strftime("%Y-%m-%d")
+
+
+def build_excel(
+    template_path: str,
+    용역명: str,
+    발주기관명: str,
+    도급예정액: float,
+    sheets: Dict[str, pd.DataFrame],
+    today: Optional[dt.date] = None,
+) -> BytesIO:
+    """
+    템플릿에 갑지 정보와 데이터 시트를 채운 엑셀 파일을 BytesIO 로 돌려준다.
+    비어 있는 DataFrame 은 건너뛴다. 템플릿이 없으면 FileNotFoundError.
+    """
+    wb = load_template(template_path)
+    fill_갑지(wb["갑지"], 용역명, 발주기관명, 도급예정액, today)
+
+    for sheet_name in 데이터시트:
+        df = sheets.get(sheet_name)
+        if df is not None and not df.empty:
+            write_frame(wb[sheet_name], df)
+
+    buf = BytesIO()
+    wb.save(buf)
+    buf.seek(0)
+    return buf
+
+
+# ─── 과업지시서 (DOCX) ───
+class _CompiledDirective:
+    """
+    템플릿 한 개의 원본 바이트와, docxtpl 이 렌더링마다 다시 하는 XML 전처리(patch_xml)·
+    Jinja 컴파일 결과를 원본 XML 문자열별로 들고 있다.
+    """
+
+    def __init__(self, blob: bytes):
+        self.blob = blob
+        self.patched: Dict[str, str] = {}
+        self.compiled: Dict[str, Template] = {}
+
+    def from_string(self, source: str) -> Template:
+        # render_xml_part 가 jinja_env 없이 만드는 Template(source) 와 같은 것을 한 번만 만든다
+        template = self.compiled.get(source)
+        if template is None:
+            template = self.compiled[source] = Template(source)
+        return template
+
+
+class _CachedDocxTemplate(DocxTemplate):
+    """
+    _CompiledDirective 의 전처리·컴파일 결과를 재사용하는 DocxTemplate.
+    렌더링·문서 조립은 docxtpl 그대로이고(TemplateError 처리 포함), 컴파일만 캐시에서 꺼낸다.
+    """
+
+    def __init__(self, compiled: _CompiledDirective):
+        super().__init__(BytesIO(compiled.blob))
+        self._compiled = compiled
+
+    def patch_xml(self, src_xml):
+        patched = self._compiled.patched.get(src_xml)
+        if patched is None:
+            patched = self._compiled.patched[src_xml] = super().patch_xml(src_xml)
+        return patched
+
+    def render_xml_part(self, src_xml, part, context, jinja_env=None):
+        return super().render_xml_part(src_xml, part, context, jinja_env or self._compiled)
+
+
+_지시서: Dict[str, Tuple[int, _CompiledDirective]] = {}
+
+
+def _load_directive(template_path: str) -> _CompiledDirective:
+    key = os.path.abspath(template_path)
+    mtime = os.stat(key).st_mtime_ns
+    cached = _지시서.get(key)
+    if cached is None or cached[0] != mtime:
+        with open(key, "rb") as f:
+            compiled = _CompiledDirective(f.read())
+        with _템플릿_lock:
+            _지시서[key] = cached = (mtime, compiled)
+    return cached[1]
+
+
+def directive_context(
+    용역명: str,
+    발주기관명: str,
+    과업대상지: str,
+    면적: float,
+    과업기간: int,
+    날짜: Optional[dt.date] = None,
+) -> Dict[str, str]:
+    """과업지시서 템플릿 변수. 면적은 '1,234㎡', 과업기간은 '90일' 형식."""
+    return {
+        "용역명":     용역명,
+        "발주기관명": 발주기관명,
+        "날짜":       (날짜 or dt.date.today()).strftime("%Y-%m-%d"),
+        "과업대상지":   과업대상지,
+        "면적":       f"{면적:,.0f}㎡",
+        "과업기간":   f"{과업기간}일",
+    }
+
+
+def render_directive(context: Dict[str, str], template_path: str = DIRECTIVE_TEMPLATE) -> BytesIO:
+    """과업지시서 템플릿에 context 를 채운 DOCX 를 BytesIO 로 돌려준다."""
+    tpl = _CachedDocxTemplate(_load_directive(template_path))
+    tpl.render(context)
+    buf = BytesIO()
+    tpl.save(buf)
+    buf.seek(0)
+    return buf
+
+
+def _파일명(name: str) -> str:
+    return re.sub(r'[\\/:*?"<>|\s]+', "_", str(name)).strip("_") or "과업지시서"
+
+
+def render_directives(
+    contexts: Iterable[Dict[str, str]],
+    template_path: str = DIRECTIVE_TEMPLATE,
+) -> BytesIO:
+    """
+    여러 과업지시서를 한 번에 만들어 ZIP(BytesIO)으로 돌려준다.
+    파일 이름은 '<순번>_<용역명>_과업지시서.docx'.
+    """
+    compiled = _load_directive(template_path)
+    buf = BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i, context in enumerate(contexts, start=1):
+            tpl = _CachedDocxTemplate(compiled)
+            tpl.render(context)
+            doc = BytesIO()
+            tpl.save(doc)
+            zf.writestr(f"{i:03d}_{_파일명(context.get('용역명', ''))}_과업지시서.docx", doc.getvalue())
+    buf.seek(0)
+    return buf
+
+
+# ─── 결과물 캐시 (입력 지문별) ───
+def fingerprint(*parts) -> str:
+    """DataFrame·dict·스칼라가 섞인 입력의 내용 지문(sha256)."""
+    h = hashlib.sha256()
+
+    def feed(part):
+        if isinstance(part, pd.DataFrame):
+            h.update(repr((list(part.columns), part.shape)).encode())
+            h.update(pd.util.hash_pandas_object(part, index=True).to_numpy().tobytes())
+        elif isinstance(part, dict):
+            for k in sorted(part, key=str):
+                feed(k)
+                feed(part[k])
+        else:
+            h.update(repr(part).encode())
+        h.update(b"\x1f")
+
+    for part in parts:
+        feed(part)
+    return h.hexdigest()
+
+
+class ArtifactCache:
+    """
+    지문 → 결과(바이트 등). 크기 제한이 있는 LRU 이며 스레드에서 함께 써도 된다.
+    적중·실패 횟수를 세어 stats() 로 보여 준다.
+    """
+
+    def __init__(self, maxsize: int = 64):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[str, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key: str, build: Callable[[], object]):
+        with self._lock:
+            if key in self._items:
+                self.hits += 1
+                self._items.move_to_end(key)
+                return self._items[key]
+            self.misses += 1
+        data = build()
+        with self._lock:
+            self._items[key] = data
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return data
+
+    def values(self) -> list:
+        with self._lock:
+            return list(self._items.values())
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "항목": len(self._items),
+                "최대": self.maxsize,
+                "적중": self.hits,
+                "실패": self.misses,
+                "적중률": self.hits / total if total else 0.0,
+            }
+
+
+artifacts = ArtifactCache()
+
+
+def excel_bytes(
+    template_path: str,
+    용역명: str,
+    발주기관명: str,
+    도급예정액: float,
+    sheets: Dict[str, pd.DataFrame],
+    today: Optional[dt.date] = None,
+) -> bytes:
+    """build_excel() 결과 바이트. 입력이 같으면 앞서 만든 것을 돌려준다."""
+    today = today or dt.date.today()
+    key = fingerprint(
+        "excel",
+        os.path.abspath(template_path),
+        os.stat(template_path).st_mtime_ns,
+        용역명, 발주기관명, 도급예정액, today,
+        {name: sheets.get(name) for name in 데이터시트},
+    )
+    return artifacts.get_or_build(
+        key,
+        lambda: build_excel(template_path, 용역명, 발주기관명, 도급예정액, sheets, today).getvalue(),
+    )
+
+
+def directive_bytes(context: Dict[str, str], template_path: str = DIRECTIVE_TEMPLATE) -> bytes:
+    """render_directive() 결과 바이트. context 가 같으면 앞서 만든 것을 돌려준다."""
+    key = fingerprint(
+        "docx", os.path.abspath(template_path), os.stat(template_path).st_mtime_ns, context
+    )
+    return artifacts.get_or_build(key, lambda: render_directive(context, template_path).getvalue())
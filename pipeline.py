@@ -0,0 +1,157 @@
+"""
+산출 단계 의존 그래프 (Streamlit 비의존)
+
+기준표 → 산정기준 → 투입인원 → 직접인건비 → 내역서 → 도급예정액 을 이름 있는 노드로
+두고, 노드마다 자기 입력(입력값의 지문 또는 상위 노드의 키)으로 만든 키와 마지막 결과를
+기억한다. 입력 하나가 바뀌면 그 입력에서 닿는 아래쪽 노드만 다시 계산되고, 나머지는
+앞서 만든 결과 객체를 그대로 돌려준다.
+
+Pipeline 은 세션마다 하나씩 두고 쓴다 (스레드 안전하지 않다).
+입력값과 노드 결과는 읽기 전용으로 다룬다. 돌려받은 DataFrame 을 고치면 캐시도 바뀐다.
+
+산정기준 · 투입인원 노드는 프로세스 전체가 함께 쓰는 LRU(공유결과)에도 결과를 둔다.
+노드 키는 기준표 내용(= 설계유형과 기준자료 버전)과 입력값의 지문으로 만들어지므로,
+다른 세션이 같은 조건으로 이미 산출했다면 다시 계산하지 않고 그 결과를 받는다.
+
+    pipe = pipeline.조경()
+    pipe.set(기준표=df, 면적=3000.0, 대상지_성격="도시공원", 난이도=..., 전단계_활용=False)
+    pipe.set(노임단가=engine.노임단가표.from_frame(wage), 기간={}, 요율=engine.내역서요율())
+    pipe.get("도급예정액")
+    pipe.set(요율=engine.내역서요율(부가세율=0.0))   # 내역서 · 도급예정액 만 다시 계산
+    pipe.restore(산정기준=저장한_결과)          # 저장해 둔 결과를 다시 계산 없이 쓴다
+"""
+from dataclasses import dataclass
+from operator import itemgetter
+from typing import Callable, Dict, Optional, Tuple
+
+import engine
+from export import ArtifactCache, fingerprint
+
+
+@dataclass(frozen=True)
+class Node:
+    fn: Callable
+    deps: Tuple[str, ...]
+    shared: Optional[ArtifactCache] = None   # 세션 사이에 결과를 나눠 쓸 LRU
+
+
+# 노드 이름 → 프로세스 공유 LRU (두 분야가 함께 쓴다. 키에 기준표 지문이 들어가 섞이지 않는다)
+공유결과 = {
+    "산정기준": ArtifactCache(maxsize=256),
+    "투입인원": ArtifactCache(maxsize=512),
+}
+
+
+class Pipeline:
+    """노드 이름 → Node. deps 의 각 이름은 다른 노드이거나 set() 으로 넣는 입력값이다."""
+
+    def __init__(self, nodes: Dict[str, Node]):
+        self.nodes = nodes
+        self._inputs: Dict[str, Tuple[str, object]] = {}   # 입력 이름 → (지문, 값)
+        self._memo: Dict[str, Tuple[str, object]] = {}     # 노드 이름 → (키, 결과)
+
+    def set(self, **values):
+        """입력값을 넣는다. 같은 객체나 같은 내용이면 키가 그대로라 아래쪽도 그대로다."""
+        for name, value in values.items():
+            if name in self.nodes:
+                raise KeyError(f"노드 이름은 입력으로 쓸 수 없습니다: {name}")
+            old = self._inputs.get(name)
+            if old is not None and old[1] is value:
+                continue
+            self._inputs[name] = (fingerprint(value), value)
+
+    def input(self, name: str, default=None):
+        """set() 으로 넣은 입력값 (없으면 default)."""
+        entry = self._inputs.get(name)
+        return default if entry is None else entry[1]
+
+    def ready(self, name: str) -> bool:
+        """name 을 계산하는 데 필요한 입력값이 모두 들어왔는지."""
+        if name in self._inputs:
+            return True
+        node = self.nodes.get(name)
+        return node is not None and all(self.ready(dep) for dep in node.deps)
+
+    def key(self, name: str) -> str:
+        """name 의 지금 키 (계산하지 않고 입력 지문만으로 만든다)."""
+        if name in self._inputs:
+            return self._inputs[name][0]
+        node = self.nodes.get(name)
+        if node is None:
+            raise KeyError(f"입력값이 없습니다: {name}")
+        return fingerprint(name, *[self.key(dep) for dep in node.deps])
+
+    def restore(self, **results):
+        """
+        지금 입력값으로 이미 만든 결과(저장해 둔 용역 등)를 노드 결과로 넣는다.
+        입력값과 맞는 결과인지는 호출 측이 보장한다. 아래쪽 노드는 이 결과에서 이어 계산한다.
+        """
+        for name, value in results.items():
+            if name not in self.nodes:
+                raise KeyError(f"노드가 아닙니다: {name}")
+            self._memo[name] = (self.key(name), value)
+
+    def _resolve(self, name: str) -> Tuple[str, object]:
+        if name in self._inputs:
+            return self._inputs[name]
+        node = self.nodes.get(name)
+        if node is None:
+            raise KeyError(f"입력값이 없습니다: {name}")
+        resolved = [self._resolve(dep) for dep in node.deps]
+        key = fingerprint(name, *[k for k, _ in resolved])
+        memo = self._memo.get(name)
+        if memo is None or memo[0] != key:
+            def build():
+                return node.fn(*[v for _, v in resolved])
+
+            value = node.shared.get_or_build(key, build) if node.shared else build()
+            memo = self._memo[name] = (key, value)
+        return memo
+
+    def get(self, name: str):
+        return self._resolve(name)[1]
+
+
+def 공유_객체() -> list:
+    """세션의 Pipeline 이 가리키지만 프로세스가 함께 쓰는 객체: 공유 LRU 와 그 안의 결과."""
+    객체 = list(공유결과.values())
+    for cache in 공유결과.values():
+        객체.extend(cache.values())
+    return 객체
+
+
+def 캐시_현황() -> Dict[str, Dict[str, float]]:
+    """공유 LRU 노드별 항목 수와 적중률."""
+    return {name: cache.stats() for name, cache in 공유결과.items()}
+
+
+# ─── 분야별 그래프 ───
+def 조경() -> Pipeline:
+    """입력: 기준표, 면적, 대상지_성격, 난이도, 전단계_활용, 노임단가, 기간, 요율"""
+    return Pipeline({
+        "산정기준":   Node(
+            engine.산정기준_조경, ("기준표", "면적", "대상지_성격", "난이도", "전단계_활용"),
+            공유결과["산정기준"],
+        ),
+        "기간항목":   Node(engine.기간항목_조경, ("산정기준",)),
+        "투입인원":   Node(engine.투입인원_조경, ("산정기준", "노임단가", "기간"), 공유결과["투입인원"]),
+        "직접인건비": Node(itemgetter(1), ("투입인원",)),
+        "내역서":     Node(engine.내역서, ("직접인건비", "요율")),
+        "도급예정액": Node(itemgetter(1), ("내역서",)),
+    })
+
+
+def 환경() -> Pipeline:
+    """입력: 기준표(원본), 면적, 보정_동식물 … 보정_수질오염총량계획, 노임단가, 기간, 요율"""
+    return Pipeline({
+        "정리된_기준표": Node(engine.정리_환경_기준표, ("기준표",)),
+        "산정기준": Node(engine.산정기준_환경, (
+            "정리된_기준표", "면적",
+            "보정_동식물", "보정_자연연경관심의", "보정_건강영향평가", "보정_수질오염총량계획",
+        ), 공유결과["산정기준"]),
+        "기간항목":   Node(engine.기간항목_환경, ("산정기준",)),
+        "투입인원":   Node(engine.투입인원_환경, ("산정기준", "노임단가", "기간"), 공유결과["투입인원"]),
+        "직접인건비": Node(itemgetter(1), ("투입인원",)),
+        "내역서":     Node(engine.내역서, ("직접인건비", "요율")),
+        "도급예정액": Node(itemgetter(1), ("내역서",)),
+    })
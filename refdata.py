@@ -0,0 +1,291 @@
+"""
+기준자료(노임단가·손해보험요율·투입인원 기준표) 스냅샷 저장소와 프로세스 캐시
+
+구글 시트에 게시된 CSV 를 받아 data/snapshots/<이름>/<버전>.csv 로 보관하고,
+평소에는 디스크의 최신 스냅샷만 읽는다(네트워크 없이 기동).
+새로고침은 명시적으로 refresh() 를 부를 때만 일어나며, 받아오기에 실패하면
+마지막으로 성공한 스냅샷을 그대로 쓴다.
+
+스냅샷은 받은 CSV 바이트를 그대로 저장하므로 pd.read_csv 결과가 원본 URL 을
+직접 읽을 때와 같다.
+
+ReferenceCache 는 프로세스 시작 시 모든 기준자료를 동시에 읽어 두고
+(stale-while-revalidate) 뒤에서 원본을 다시 확인해 바뀐 것만 통째로 교체한다.
+
+    python refdata.py refresh                # 게시 URL 에서 모두 새로고침
+    python refdata.py refresh --from DIR     # DIR/<이름>.csv 에서 새로고침
+    python refdata.py list
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+
+SOURCES = {
+    "노임단가": "https://docs.google.com/spreadsheets/d/e/2PACX-1vSlIUPyOxmtCRrXFqQKZ7Ge3um3xi5VCaua1OvyC27Y7vw5jqJhzbFpnTeb-fcxGS3_wNxuhnBddRl4/pub?output=csv",
+    "손해보험요율": "https://docs.google.com/spreadsheets/d/e/2PACX-1vRzdleYSG38-1FpxjoIkQbhWHbwY4himRBCO7LR8wWkCg0bnplhSTecIHNInZ-5NCjcjfuwmGotRFd_/pub?output=csv",
+    "조경_기본설계": "https://docs.google.com/spreadsheets/d/e/2PACX-1vSffous-aCPOAcKkizEiELMpZVECskizIxlP2Vn_eHTfLnviFFCn0S1fAZPy0OkFLE508TspBu9VuuV/pub?output=csv",
+    "조경_실시설계": "https://docs.google.com/spreadsheets/d/e/2PACX-1vSRBhcxu6BMlio-obyGAj44PhEP07BPAFC9l53gad1TqZPgQyAkj289qqshKNFQ1jHYYtIrWlO9wKOm/pub?output=csv",
+    "조경_기본 및 실시설계": "https://docs.google.com/spreadsheets/d/e/2PACX-1vTcmEUxkny-pnOAPFvb67DH-MpINOZY6PqCGz9m6U3DUzFcTeqgd7Mvm7Ss1_m7i0RYE4locXoE1HuK/pub?output=csv",
+    "환경_소규모 환경영향평가 대행": "https://docs.google.com/spreadsheets/d/e/2PACX-1vQK25xZ-K2mo1mpr_Sz4cUEv8lHW6gY0-Ps0BVW-GSFRk7_53WBVHXBIBOQChTrtdYaJIP8T1p1U0sX/pub?output=csv",
+}
+
+DEFAULT_DIR = Path(__file__).resolve().parent / "data" / "snapshots"
+
+
+# ─── 원본(source) ───
+class HttpSource:
+    """게시된 구글 시트 CSV URL 에서 받아온다."""
+
+    def __init__(self, urls: Dict[str, str] = SOURCES, timeout: float = 30):
+        self.urls = urls
+        self.timeout = timeout
+
+    def fetch(self, name: str) -> bytes:
+        with urllib.request.urlopen(self.urls[name], timeout=self.timeout) as resp:
+            return resp.read()
+
+
+class LocalDirSource:
+    """<디렉터리>/<이름>.csv 파일을 원본으로 쓴다 (망분리 환경, 테스트용)."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def fetch(self, name: str) -> bytes:
+        return (self.path / f"{name}.csv").read_bytes()
+
+
+# ─── 스냅샷 저장소 ───
+class SnapshotStore:
+    """이름별 디렉터리에 버전 파일과 마지막 정상 버전(LATEST)을 기록한다."""
+
+    def __init__(self, root=DEFAULT_DIR):
+        self.root = Path(root)
+
+    def _dir(self, name: str) -> Path:
+        return self.root / name
+
+    def versions(self, name: str) -> List[str]:
+        d = self._dir(name)
+        if not d.is_dir():
+            return []
+        return sorted(p.stem for p in d.glob("*.csv"))
+
+    def latest_version(self, name: str) -> Optional[str]:
+        pointer = self._dir(name) / "LATEST"
+        if pointer.exists():
+            version = pointer.read_text(encoding="utf-8").strip()
+            if (self._dir(name) / f"{version}.csv").exists():
+                return version
+        versions = self.versions(name)
+        return versions[-1] if versions else None
+
+    def read_bytes(self, name: str, version: Optional[str] = None) -> bytes:
+        version = version or self.latest_version(name)
+        if version is None:
+            raise FileNotFoundError(f"저장된 스냅샷이 없습니다: {name}")
+        return (self._dir(name) / f"{version}.csv").read_bytes()
+
+    def save(self, name: str, data: bytes) -> str:
+        """스냅샷을 기록하고 LATEST 를 옮긴다. 내용이 같으면 기존 버전을 그대로 쓴다."""
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        current = self.latest_version(name)
+        if current is not None and current.endswith(digest):
+            return current
+
+        d = self._dir(name)
+        d.mkdir(parents=True, exist_ok=True)
+        version = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{digest}"
+        # 임시 파일은 저장마다 다른 이름이라, 같은 내용을 동시에 저장해도 서로의 파일을 옮기지 않는다
+        self._write(d, f"{version}.csv", data)
+        self._write(d, "LATEST", version.encode("utf-8"))
+        return version
+
+    @staticmethod
+    def _write(d: Path, filename: str, data: bytes):
+        with tempfile.NamedTemporaryFile(dir=d, prefix=f".{filename}.", suffix=".tmp", delete=False) as f:
+            f.write(data)
+        try:
+            os.replace(f.name, d / filename)
+        except BaseException:
+            os.unlink(f.name)
+            raise
+
+
+def default_source():
+    """REFDATA_SOURCE_DIR 이 있으면 로컬 디렉터리, 없으면 게시 URL."""
+    local = os.environ.get("REFDATA_SOURCE_DIR")
+    return LocalDirSource(local) if local else HttpSource()
+
+
+def default_store() -> SnapshotStore:
+    return SnapshotStore(os.environ.get("REFDATA_DIR", DEFAULT_DIR))
+
+
+# ─── 읽기 / 새로고침 ───
+def refresh(name: str, source=None, store: Optional[SnapshotStore] = None) -> Tuple[str, bool]:
+    """
+    원본에서 받아 스냅샷으로 저장한다. (버전, 새로 받았는지) 를 돌려준다.
+    받아오기나 CSV 해석에 실패하면 마지막 정상 스냅샷으로 대신하고, 그것도 없으면 예외.
+    """
+    source = source or default_source()
+    store = store or default_store()
+    try:
+        data = source.fetch(name)
+        pd.read_csv(BytesIO(data))   # 깨진 응답은 저장하지 않는다
+    except Exception:
+        version = store.latest_version(name)
+        if version is None:
+            raise
+        return version, False
+    return store.save(name, data), True
+
+
+def refresh_all(source=None, store: Optional[SnapshotStore] = None) -> Dict[str, Tuple[str, bool]]:
+    return {name: refresh(name, source, store) for name in SOURCES}
+
+
+def read(
+    name: str,
+    source=None,
+    store: Optional[SnapshotStore] = None,
+    version: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    최신 스냅샷(version 을 주면 그 버전)을 읽는다. 아직 스냅샷이 없을 때만 원본에서
+    한 번 받아온다. 지정한 버전이 없으면 FileNotFoundError.
+    """
+    store = store or default_store()
+    if version is None and store.latest_version(name) is None:
+        refresh(name, source, store)
+    return pd.read_csv(BytesIO(store.read_bytes(name, version)))
+
+
+def version(name: str, store: Optional[SnapshotStore] = None) -> Optional[str]:
+    return (store or default_store()).latest_version(name)
+
+
+# ─── 프로세스 캐시 (동시 선읽기 + stale-while-revalidate) ───
+class ReferenceCache:
+    """
+    기준자료를 이름별 (버전, DataFrame) 으로 들고 있는 프로세스 단위 캐시.
+
+    prefetch() 는 모든 이름을 스레드 풀에서 동시에 읽고, get() 은 가진 것을 바로
+    돌려준다. max_age 초가 지나면 get() 이 뒤에서 revalidate() 를 걸 뿐 기다리지
+    않으며, 새 버전은 사전 전체를 바꿔 끼우는 방식으로 한 번에 반영된다.
+    """
+
+    def __init__(
+        self,
+        names=tuple(SOURCES),
+        source=None,
+        store: Optional[SnapshotStore] = None,
+        max_age: float = float(os.environ.get("REFDATA_MAX_AGE", 6 * 3600)),
+    ):
+        self.names = tuple(names)
+        self.source = source or default_source()
+        self.store = store or default_store()
+        self.max_age = max_age
+        self._frames: Dict[str, Tuple[Optional[str], pd.DataFrame]] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(len(self.names), 1), thread_name_prefix="refdata"
+        )
+        self._loading: Dict[str, Future] = {}
+        self._revalidating: List[Future] = []
+        self._checked_at = time.monotonic()
+
+    def _swap(self, name: str, version: Optional[str], df: pd.DataFrame, replace: bool = True):
+        with self._lock:
+            if not replace and name in self._frames:
+                return
+            frames = dict(self._frames)
+            frames[name] = (version, df)
+            self._frames = frames
+
+    def _load(self, name: str):
+        df = read(name, self.source, self.store)
+        # 뒤에서 먼저 끝난 revalidate 결과가 있으면 그쪽이 더 새롭다
+        self._swap(name, self.store.latest_version(name), df, replace=False)
+
+    def prefetch(self) -> "ReferenceCache":
+        with self._lock:
+            for name in self.names:
+                if name not in self._loading:
+                    self._loading[name] = self._pool.submit(self._load, name)
+        return self
+
+    def get(self, name: str) -> pd.DataFrame:
+        entry = self._frames.get(name)
+        if entry is None:
+            with self._lock:
+                future = self._loading.get(name)
+                if future is None or (future.done() and future.exception() is not None):
+                    future = self._loading[name] = self._pool.submit(self._load, name)
+            future.result()
+            entry = self._frames[name]
+        if self.max_age and time.monotonic() - self._checked_at > self.max_age:
+            self.revalidate()
+        return entry[1]
+
+    def version(self, name: str) -> Optional[str]:
+        entry = self._frames.get(name)
+        return entry[0] if entry else None
+
+    def _revalidate_one(self, name: str, 선읽기: Optional[Future] = None) -> Tuple[str, bool]:
+        # 선읽기가 아직 스냅샷을 만드는 중이면 끝난 뒤에 확인한다 (같은 시트를 동시에 받지 않는다)
+        if 선읽기 is not None:
+            wait([선읽기])
+        version, fresh = refresh(name, self.source, self.store)
+        if version != self.version(name):
+            self._swap(name, version, pd.read_csv(BytesIO(self.store.read_bytes(name, version))))
+        return version, fresh
+
+    def revalidate(self, wait: bool = False) -> Dict[str, Tuple[str, bool]]:
+        """원본을 동시에 다시 확인한다. 이미 진행 중이면 새로 걸지 않는다."""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            if not self._revalidating or all(f.done() for f in self._revalidating):
+                self._revalidating = [
+                    self._pool.submit(self._revalidate_one, name, self._loading.get(name))
+                    for name in self.names
+                ]
+            futures = list(self._revalidating)
+        if not wait:
+            return {}
+        return {name: f.result() for name, f in zip(self.names, futures)}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="기준자료 스냅샷 관리")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_refresh = sub.add_parser("refresh", help="원본에서 스냅샷 새로고침")
+    p_refresh.add_argument("--from", dest="src", help="<이름>.csv 가 있는 로컬 디렉터리")
+    sub.add_parser("list", help="저장된 스냅샷 버전 보기")
+    args = parser.parse_args()
+
+    store = default_store()
+    if args.cmd == "refresh":
+        source = LocalDirSource(args.src) if args.src else default_source()
+        for name in SOURCES:
+            try:
+                ver, fresh = refresh(name, source, store)
+                print(f"{name}: {ver}{'' if fresh else ' (이전 스냅샷 유지)'}")
+            except Exception as e:
+                print(f"{name}: 실패 - {e}")
+    else:
+        for name in SOURCES:
+            print(f"{name}: {', '.join(store.versions(name)) or '-'}")
@@ -0,0 +1,240 @@
+"""
+기준자료가 바뀐 뒤 저장된 용역 일괄 재산출 (Streamlit 비의존)
+
+새 노임단가나 투입인원 기준표가 게시되면, 저장소(store)의 용역 가운데 저장 당시
+기준자료 버전이 지금 스냅샷과 다른 것만 골라 옛 스냅샷과 새 스냅샷을 비교한다.
+
+- 노임단가: 용역 분야의 단가 열(조경 → 건설, 환경 → 환경)에서 단가가 바뀐 직급을 찾고,
+  저장된 산정기준 결과에 그 직급 인·일이 있는 용역만 다시 산출한다.
+- 기준표: 바뀐 행이 하나라도 있으면 그 설계유형 용역은 모두 다시 산출한다
+  (기준표의 모든 업무행이 산정기준에 들어간다).
+- 옛 스냅샷이 지워져 비교할 수 없으면 바뀐 것으로 본다.
+
+다시 산출할 용역은 batch 와 같이 프로세스 풀에서 저장된 입력값 그대로 산출하고,
+직접인건비·도급예정액·결과를 저장소에 되쓴다. 영향이 없는 용역은 결과가 그대로이므로
+기준자료 버전만 옮긴다. 기준표 행 구성이 바뀌어 저장된 기간을 업무에 맞출 수 없으면
+되쓰지 않고 보고서에 오류로 남긴다.
+
+    python reprice.py [--db 경로] [-o 증감보고서.xlsx] [--workers N] [--dry-run]
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+import batch
+import engine
+import refdata
+import store
+from engine import 직급리스트
+
+
+보고서열 = [
+    "id", "분야", "용역명", "발주기관명", "설계유형", "상태", "변경",
+    "직접인건비_이전", "직접인건비", "도급예정액_이전", "도급예정액", "증감", "증감률", "오류",
+]
+
+단가분야 = {"조경": "건설", "환경": "환경"}
+
+
+# ─── 스냅샷 비교 ───
+def _옛_스냅샷(name: str, version: Optional[str]) -> Optional[pd.DataFrame]:
+    if version is None:
+        return None
+    try:
+        return refdata.read(name, version=version)
+    except FileNotFoundError:
+        return None
+
+
+def 바뀐_직급(옛: Optional[engine.노임단가표], 새: engine.노임단가표, 분야: str) -> Set[str]:
+    """분야 열에서 단가가 달라진 직급. 옛 단가를 읽을 수 없으면 모든 직급."""
+    if 옛 is None or 분야 not in 옛.분야:
+        return set(직급리스트)
+    이전, 지금 = 옛.직급별(분야), 새.직급별(분야)
+    return {직급 for 직급 in 직급리스트 if 이전[직급] != 지금[직급]}
+
+
+def 바뀐_행(옛: Optional[pd.DataFrame], 새: pd.DataFrame) -> Optional[List[int]]:
+    """달라진 행 번호(0부터). 옛 표가 없거나 행 수·열 구성이 다르면 None (전체가 바뀐 것)."""
+    if 옛 is None or 옛.shape != 새.shape or list(옛.columns) != list(새.columns):
+        return None
+    같음 = (옛 == 새) | (옛.isna() & 새.isna())
+    return np.flatnonzero(~같음.all(axis=1).to_numpy()).tolist()
+
+
+def 사용_직급(기준결과: engine.산정결과) -> Set[str]:
+    """산정기준 결과에서 업무행 인·일이 있는 직급."""
+    합 = 기준결과.인일[기준결과.업무행].sum(axis=0)
+    return {직급 for 직급, 값 in zip(직급리스트, 합) if 값 > 0}
+
+
+def _기간라벨(분야: str, 기준결과) -> List[Optional[str]]:
+    항목 = (engine.기간항목_조경 if 분야 == "조경" else engine.기간항목_환경)(기준결과)
+    return [None if 칸 is None else 칸[0] for 칸 in 항목]
+
+
+def _투입인원부터(항목: store.저장용역, 노임단가) -> engine.Estimate:
+    """기준표가 그대로면 저장된 산정기준 결과에서 투입인원 → 내역서만 다시 구한다."""
+    inputs, 기준결과 = 항목.inputs, 항목.estimate.기준계산결과
+    투입인원 = engine.투입인원_조경 if 항목.분야 == "조경" else engine.투입인원_환경
+    투입인원DF, 직접인건비 = 투입인원(기준결과, 노임단가, inputs.기간)
+    df_detail, 도급예정액 = engine.내역서(직접인건비, inputs.요율)
+    return engine.Estimate(기준결과, 투입인원DF, 직접인건비, df_detail, 도급예정액)
+
+
+# ─── 작업 프로세스 ───
+# 저장소 경로, 새 기준자료, 지금 버전, 스냅샷 비교 결과. 부모가 한 번 만들어 넘긴다.
+_환경: Dict[str, object] = {}
+
+
+def _init_worker(환경: Dict[str, object]):
+    global _환경
+    _환경 = {**환경, "저장소": store.EstimateStore(환경["db"])}
+
+
+def _재산출(id: int, 기준자료: Dict[str, Optional[str]]) -> Tuple[dict, Optional[engine.Estimate]]:
+    """
+    용역 하나를 불러와 바뀐 기준자료가 닿는지 보고, 닿으면 다시 산출한다.
+    (보고서 행, 새 결과 또는 None) 을 돌려준다.
+    """
+    기준, 현재 = _환경["기준"], _환경["현재"]
+    항목 = _환경["저장소"].load(id)
+    이전 = 항목.estimate
+    표이름 = f"{항목.분야}_{항목.inputs.설계유형}"
+    행 = {
+        "id": id, "분야": 항목.분야, "용역명": 항목.용역명, "발주기관명": 항목.발주기관명,
+        "설계유형": 항목.inputs.설계유형, "상태": "영향 없음", "변경": "",
+        "직접인건비_이전": 이전.직접인건비, "도급예정액_이전": 이전.도급예정액, "오류": "",
+    }
+    try:
+        변경 = []
+        표변경 = 기준자료.get(표이름) != 현재.get(표이름)
+        if 표변경:
+            바뀐 = _환경["행변경"][(표이름, 기준자료.get(표이름))]
+            표변경 = 바뀐 is None or bool(바뀐)
+            if 바뀐 is None:
+                변경.append("기준표 전체")
+            elif 바뀐:
+                변경.append("기준표 " + ", ".join(str(i + 1) for i in 바뀐) + "행")
+        if 기준자료.get("노임단가") != 현재.get("노임단가"):
+            직급 = _환경["직급변경"][(기준자료.get("노임단가"), 단가분야[항목.분야])]
+            직급 = 직급 & 사용_직급(이전.기준계산결과)
+            if 직급:
+                변경.append("노임단가 " + ", ".join(j for j in 직급리스트 if j in 직급))
+
+        if not 변경:
+            est = None
+        elif 표변경:
+            est = batch.price(batch.작업(id, 항목.분야, 항목.용역명, 항목.발주기관명, 항목.inputs), 기준)
+            옛라벨, 새라벨 = _기간라벨(항목.분야, 이전.기준계산결과), _기간라벨(항목.분야, est.기준계산결과)
+            for i in 항목.inputs.기간 or {}:
+                if i >= len(새라벨) or i >= len(옛라벨) or 새라벨[i] != 옛라벨[i]:
+                    raise ValueError("기준표 행 구성이 바뀌어 저장된 기간을 업무에 맞출 수 없습니다")
+        else:
+            est = _투입인원부터(항목, 기준["노임단가표"])
+    except Exception as e:
+        행.update(상태="오류", 오류=f"{type(e).__name__}: {e}")
+        return 행, None
+
+    새 = est or 이전
+    행.update(
+        상태="재산출" if 변경 else "영향 없음",
+        변경=" · ".join(변경),
+        직접인건비=새.직접인건비,
+        도급예정액=새.도급예정액,
+        증감=새.도급예정액 - 이전.도급예정액,
+        증감률=(새.도급예정액 - 이전.도급예정액) / 이전.도급예정액 if 이전.도급예정액 else None,
+    )
+    return 행, est
+
+
+# ─── 일괄 재산출 ───
+def run_reprice(
+    db: Optional[store.EstimateStore] = None,
+    workers: Optional[int] = None,
+    dry_run: bool = False,
+) -> pd.DataFrame:
+    """
+    기준자료 버전이 지금과 다른 용역을 골라 필요한 것만 다시 산출하고 증감 보고서를 돌려준다.
+    dry_run 이면 산출만 하고 저장소는 고치지 않는다.
+    """
+    db = db or store.EstimateStore()
+    현재 = {name: refdata.version(name) for name in refdata.SOURCES}
+    기준 = batch.load_reference()
+
+    # 저장 당시 버전이 지금과 다른 용역만 (요약 표만 읽고 결과 BLOB 은 작업 프로세스가 읽는다)
+    대상 = [
+        row for row in db.기준자료_목록().itertuples(index=False)
+        if any(
+            row.기준자료.get(name) != 현재.get(name)
+            for name in ("노임단가", f"{row.분야}_{row.설계유형}")
+        )
+    ]
+
+    # 옛 버전마다 한 번만 새 스냅샷과 비교한다
+    행변경: Dict[tuple, Optional[List[int]]] = {}
+    직급변경: Dict[tuple, Set[str]] = {}
+    옛단가: Dict[Optional[str], Optional[engine.노임단가표]] = {}
+    for row in 대상:
+        표이름 = f"{row.분야}_{row.설계유형}"
+        표버전 = row.기준자료.get(표이름)
+        if 표버전 != 현재.get(표이름) and (표이름, 표버전) not in 행변경:
+            행변경[(표이름, 표버전)] = 바뀐_행(_옛_스냅샷(표이름, 표버전), 기준[표이름])
+        단가버전 = row.기준자료.get("노임단가")
+        if 단가버전 != 현재.get("노임단가") and (단가버전, 단가분야[row.분야]) not in 직급변경:
+            if 단가버전 not in 옛단가:
+                옛 = _옛_스냅샷("노임단가", 단가버전)
+                옛단가[단가버전] = None if 옛 is None else engine.노임단가표.from_frame(옛)
+            직급변경[(단가버전, 단가분야[row.분야])] = 바뀐_직급(
+                옛단가[단가버전], 기준["노임단가표"], 단가분야[row.분야]
+            )
+
+    보고, 갱신 = [], []
+    if 대상:
+        workers = workers or os.cpu_count() or 1
+        환경 = {"db": db.path, "기준": 기준, "현재": 현재, "행변경": 행변경, "직급변경": 직급변경}
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(대상)),
+            initializer=_init_worker,
+            initargs=(환경,),
+        ) as pool:
+            chunksize = max(1, len(대상) // (workers * 4))
+            results = pool.map(
+                _재산출, [row.id for row in 대상], [row.기준자료 for row in 대상], chunksize=chunksize
+            )
+            for row, (행, est) in zip(대상, results):
+                보고.append(행)
+                if 행["상태"] != "오류":
+                    표이름 = f"{row.분야}_{row.설계유형}"
+                    새버전 = {**row.기준자료, **{name: 현재.get(name) for name in ("노임단가", 표이름)}}
+                    갱신.append((row.id, 새버전, est))
+
+    if 갱신 and not dry_run:
+        db.update(갱신)
+    return pd.DataFrame(보고, columns=보고서열)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="기준자료 변경분 저장 용역 재산출")
+    parser.add_argument("--db", default=None, help="용역 저장소 경로 (기본: ESTIMATES_DB 또는 data/estimates.sqlite3)")
+    parser.add_argument("-o", "--output", default="증감보고서.xlsx", help="증감 보고서 엑셀 경로")
+    parser.add_argument("--workers", type=int, default=None, help="작업 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--dry-run", action="store_true", help="산출만 하고 저장소는 고치지 않는다")
+    args = parser.parse_args()
+
+    보고서 = run_reprice(store.EstimateStore(args.db), args.workers, args.dry_run)
+    보고서.to_excel(args.output, sheet_name="증감", index=False)
+    상태 = 보고서["상태"].value_counts()
+    재산출 = 보고서[보고서["상태"] == "재산출"]
+    print(
+        f"{len(보고서)}건 중 재산출 {상태.get('재산출', 0)}건 (도급예정액 증감 {재산출['증감'].sum():,.0f}원), "
+        f"영향 없음 {상태.get('영향 없음', 0)}건, 오류 {상태.get('오류', 0)}건 → {args.output}"
+        + (" (저장소는 그대로)" if args.dry_run else "")
+    )
+    if 상태.get("오류", 0):
+        print(보고서.loc[보고서["상태"] == "오류", ["id", "용역명", "오류"]].to_string(index=False))
@@ -0,0 +1,140 @@
+"""
+기간·요율 불확실성 모의실험 (Streamlit 비의존)
+
+기간 기본값(1·2일, 주민설명회 2회 등)과 제경비율·기술료율은 추정값이므로, 각각을
+분포에서 뽑아 직접인건비 → 내역서 → 도급예정액 을 표본 10⁵~10⁶ 개에 대해 배열
+계산으로 한 번에 돌리고 분위수(P10/P50/P90)와 히스토그램을 돌려준다.
+
+- 기간: 행마다 독립으로 배율을 뽑아 지금 기간에 곱하고 일(회) 단위로 반올림한다.
+  '(식)' 행과 기술인력이 없는 행은 그대로 둔다.
+- 산정기준(인·일)은 입력값 그대로 한 번만 구한다. 표본마다 달라지는 것은 기간과 요율뿐이다.
+- 표본은 묶음 단위로 계산해 메모리를 일정하게 쓰고, 결과에는 요약만 남긴다.
+
+    r = simulate.simulate_조경(inputs, 기준표, wage, 기간배율=simulate.분포("삼각", 0.5, 1.0, 2.0))
+    r.분위수["P50"], r.히스토그램
+"""
+from dataclasses import dataclass, replace
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+import engine
+import solver
+
+
+분포종류 = ["고정", "균등", "삼각"]
+
+
+@dataclass(frozen=True)
+class 분포:
+    """고정(최빈값), 균등(하한~상한), 삼각(하한·최빈값·상한) 중 하나."""
+    종류: str
+    하한: float
+    최빈: float
+    상한: float
+
+    def __post_init__(self):
+        if self.종류 not in 분포종류:
+            raise ValueError(f"분포 종류가 올바르지 않습니다: {self.종류}")
+        if self.종류 != "고정" and not self.하한 <= self.최빈 <= self.상한:
+            raise ValueError(f"하한 ≤ 최빈값 ≤ 상한 이어야 합니다: {self}")
+
+    def 추출(self, rng: np.random.Generator, size) -> np.ndarray:
+        if self.종류 == "고정" or self.하한 == self.상한:
+            return np.full(size, float(self.최빈))
+        if self.종류 == "균등":
+            return rng.uniform(self.하한, self.상한, size)
+        return rng.triangular(self.하한, self.최빈, self.상한, size)
+
+
+@dataclass
+class 모의결과:
+    표본수: int
+    분위수: Dict[str, float]              # "P10" → 금액
+    평균: float
+    히스토그램: Tuple[np.ndarray, np.ndarray]   # (도수, 구간 경계)
+
+
+def 기본_분포(요율: engine.내역서요율) -> Dict[str, 분포]:
+    """기간은 지금 값의 0.5~2배 삼각, 요율은 입력란 범위에서 균등 (최빈값은 지금 요율)."""
+    return {
+        "기간배율": 분포("삼각", 0.5, 1.0, 2.0),
+        **{
+            이름: 분포("균등", 하한, min(max(getattr(요율, 이름), 하한), 상한), 상한)
+            for 이름, (하한, 상한) in solver.법정범위.items()
+        },
+    }
+
+
+def _모의(
+    분야: str,
+    inputs,
+    기준표,
+    노임단가,
+    기간배율: Optional[분포],
+    제경비율: Optional[분포],
+    기술료율: Optional[분포],
+    표본수: int,
+    seed,
+    분위: Sequence[float],
+    구간수: int,
+    묶음: int = 100_000,
+) -> 모의결과:
+    기본 = 기본_분포(inputs.요율)
+    기간배율 = 기간배율 or 기본["기간배율"]
+    제경비율 = 제경비율 or 기본["제경비율"]
+    기술료율 = 기술료율 or 기본["기술료율"]
+
+    인일, 기간, is_technical, 항목 = solver.업무행렬(분야, inputs, 기준표)
+    단가 = engine._노임단가표(노임단가).직급별("건설" if 분야 == "조경" else "환경")
+    변동 = solver.변동행(항목, is_technical)
+
+    rng = np.random.default_rng(seed)
+    금액 = np.empty(int(표본수))
+    for 시작 in range(0, len(금액), 묶음):
+        k = min(묶음, len(금액) - 시작)
+        기간표 = np.broadcast_to(기간, (k, len(기간))).copy()
+        기간표[:, 변동] = np.rint(기간[변동] * 기간배율.추출(rng, (k, int(변동.sum()))))
+        계 = engine.인건비_행렬(인일[None, :, :], 단가, 기간표)
+        직접인건비 = engine.업무합계(np.where(is_technical[None, :], 계, 0.0))
+        요율 = replace(inputs.요율, 제경비율=제경비율.추출(rng, k), 기술료율=기술료율.추출(rng, k))
+        금액[시작:시작 + k] = engine.내역서_금액(직접인건비, 요율)[-1]
+
+    return 모의결과(
+        표본수=len(금액),
+        분위수={f"P{q * 100:g}": float(v) for q, v in zip(분위, np.quantile(금액, 분위))},
+        평균=float(금액.mean()),
+        히스토그램=np.histogram(금액, bins=구간수),
+    )
+
+
+def simulate_조경(
+    inputs: engine.조경입력,
+    기준표,
+    노임단가,
+    기간배율: Optional[분포] = None,
+    제경비율: Optional[분포] = None,
+    기술료율: Optional[분포] = None,
+    표본수: int = 200_000,
+    seed=None,
+    분위: Sequence[float] = (0.1, 0.5, 0.9),
+    구간수: int = 50,
+) -> 모의결과:
+    """조경 입력 그대로의 산정기준에서 기간·요율만 분포로 뽑아 도급예정액 분포를 요약한다."""
+    return _모의("조경", inputs, 기준표, 노임단가, 기간배율, 제경비율, 기술료율, 표본수, seed, 분위, 구간수)
+
+
+def simulate_환경(
+    inputs: engine.환경입력,
+    기준표,
+    노임단가,
+    기간배율: Optional[분포] = None,
+    제경비율: Optional[분포] = None,
+    기술료율: Optional[분포] = None,
+    표본수: int = 200_000,
+    seed=None,
+    분위: Sequence[float] = (0.1, 0.5, 0.9),
+    구간수: int = 50,
+) -> 모의결과:
+    """환경영향평가 입력(기준표는 시트 원본)에서 기간·요율만 분포로 뽑아 요약한다."""
+    return _모의("환경", inputs, 기준표, 노임단가, 기간배율, 제경비율, 기술료율, 표본수, seed, 분위, 구간수)
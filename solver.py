@@ -0,0 +1,253 @@
+"""
+목표 도급예정액 역산 (Streamlit 비의존)
+
+예산(목표 도급예정액)을 먼저 정하고, 남은 변수 하나를 목표 이하가 되는 가장 큰 값으로
+찾는다. 변수는 면적, 기간 배율(기술인력 행의 기간에 같은 배율을 곱하고 일 단위로 내림,
+'(식)' 행은 그대로 — simulate 와 같은 행), 제경비율·기술료율(법정 범위 안) 중 하나다.
+
+- 면적·기간: 도급예정액은 이 변수에 대해 단조 증가(환산계수 거듭제곱 법칙, 기간 비례)
+  하므로, 구간을 64 칸 격자로 나눠 sweep 한 번(배열 계산 한 번)에 평가하고 목표를 넘는
+  첫 칸으로 구간을 좁힌다. 면적은 1천만㎡ 구간도 다섯 번 안팎으로 0.01㎡ 까지 좁혀진다.
+  환경 α₁ 은 3만㎡·100만㎡ 경계에서 내려가므로(0.49 → 0.486, 3.981 → 3.98) 면적 범위를
+  환산계수 경계로 나눠 구간마다 단조로 보고, 가장 위 구간부터 찾는다.
+- 요율: 내역서 합산은 요율에 대해 1차식이므로 양 끝 두 번 평가로 바로 푼다.
+
+    r = solver.역산_조경(engine.조경입력("실시설계", 3000.0), 기준표, wage, 목표=1.5e8)
+    r.값, r.도급예정액, r.평가횟수
+"""
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+import engine
+import sweep
+from engine import 직급리스트
+
+
+변수목록 = ["면적", "기간", "제경비율", "기술료율"]
+
+# 화면 입력란에 적힌 범위와 같다
+법정범위 = {"제경비율": (110.0, 120.0), "기술료율": (20.0, 40.0)}
+
+기본범위 = {
+    "조경": {"면적": (100.0, 10_000_000.0), "기간": (0.0, 20.0)},
+    "환경": {"면적": (0.0, 2_000_000.0), "기간": (0.0, 20.0)},
+}
+
+# 환산계수 구간 경계 (경계 값은 아래 구간에 든다). 경계 사이에서는 도급예정액이 면적에 단조 증가.
+면적경계 = {
+    "조경": (),
+    "환경": (10_000.0, 30_000.0, 100_000.0, 1_000_000.0),
+}
+
+
+@dataclass
+class 역산결과:
+    변수: str
+    값: float
+    도급예정액: float
+    목표: float
+    도달: bool        # False: 범위 끝에서도 목표에 못 미치거나(값=상한) 하한부터 넘는다(값=하한)
+    평가횟수: int
+    기간: Optional[Dict[int, int]] = None   # 변수가 기간일 때 행별 기간
+    구간: Optional[Tuple[float, float]] = None   # 변수가 면적일 때 값을 찾은 단조 구간
+
+
+# ─── 단조 함수 격자 탐색 ───
+def _최대값(
+    f: Callable[[np.ndarray], np.ndarray],
+    목표: float,
+    하한: float,
+    상한: float,
+    정밀도: float,
+    칸수: int = 64,
+) -> Tuple[float, float, bool, int]:
+    """
+    단조 증가 f 에서 f(x) ≤ 목표 인 가장 큰 x 를 (x, f(x), 도달, 평가횟수) 로 찾는다.
+    f 는 x 배열을 받아 배열을 돌려주며, 한 번 부를 때 칸수+1 개 점을 함께 평가한다.
+    """
+    평가 = 0
+    while True:
+        x = np.linspace(하한, 상한, 칸수 + 1)
+        y = f(x)
+        평가 += 1
+        넘음 = np.flatnonzero(y > 목표)
+        if 넘음.size == 0:
+            # 처음 구간의 상한까지 목표 이하 (다음 구간부터는 상한이 늘 목표를 넘는다)
+            return float(x[-1]), float(y[-1]), False, 평가
+        i = int(넘음[0])
+        if i == 0:
+            return float(x[0]), float(y[0]), False, 평가
+        하한, 상한 = float(x[i - 1]), float(x[i])
+        if 상한 - 하한 <= 정밀도:
+            return 하한, float(y[i - 1]), True, 평가
+
+
+# ─── 분야별 평가 함수 ───
+def _면적_평가(분야: str, inputs, 기준표, 노임단가):
+    if 분야 == "조경":
+        return lambda x: sweep.sweep_조경(
+            {inputs.설계유형: 기준표}, 노임단가, x,
+            [(inputs.대상지_성격, inputs.난이도)], [inputs.전단계_활용],
+            inputs.요율, inputs.기간,
+        )["도급예정액"].to_numpy()
+    보정 = {key: [getattr(inputs, key)] for key in engine.보정_질문}
+    return lambda x: sweep.sweep_환경(
+        기준표, 노임단가, x, 보정, inputs.요율, inputs.기간, inputs.설계유형,
+    )["도급예정액"].to_numpy()
+
+
+def 업무행렬(분야: str, inputs, 기준표) -> Tuple[np.ndarray, np.ndarray, np.ndarray, list]:
+    """
+    inputs 그대로 산출한 투입인원 표를 배열로:
+    (행별 인·일 (행, 직급), 행별 지금 기간, 기술인력 행 마스크, 기간항목).
+    기준표는 시트 원본이다 (환경도 정리 전).
+    """
+    if 분야 == "조경":
+        기준결과 = engine.산정기준_조경(
+            기준표, inputs.면적, inputs.대상지_성격, inputs.난이도, inputs.전단계_활용
+        )
+    else:
+        기준결과 = engine.산정기준_환경(
+            engine.정리_환경_기준표(기준표), inputs.면적,
+            *(getattr(inputs, key) for key in engine.보정_질문),
+        )
+    return 업무배열(분야, 기준결과, inputs.기간)
+
+
+def 업무배열(
+    분야: str, 기준결과: engine.산정결과, 기간값: Optional[Dict[int, int]] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, list]:
+    """이미 구한 산정기준 결과의 투입인원 표를 배열로 (업무행렬 과 같은 네 값)."""
+    기간값 = 기간값 or {}
+    if 분야 == "조경":
+        결과표 = 기준결과.업무표()
+        항목 = engine.기간항목_조경(기준결과)
+        is_technical = np.ones(len(결과표), dtype=bool)
+    else:
+        결과표, technical = engine._투입인원표_환경(기준결과)
+        항목 = engine.기간항목_환경(기준결과)
+        is_technical = technical.to_numpy()
+    기간 = [0 if 칸 is None else 기간값.get(i, 칸[1]) for i, 칸 in enumerate(항목)]
+    인일 = np.column_stack([결과표[직급].to_numpy(dtype=float) for 직급 in 직급리스트])
+    return 인일, np.asarray(기간, dtype=float), is_technical, 항목
+
+
+def 변동행(항목: list, is_technical: np.ndarray) -> np.ndarray:
+    """기간을 바꿀 수 있는 행: 기술인력이 있고 '(식)' 이 아닌 행."""
+    return is_technical & np.array(
+        [칸 is not None and not 칸[0].endswith("(식)") for 칸 in 항목], dtype=bool
+    )
+
+
+def _배율_기간(기간: np.ndarray, 배율, 변동: np.ndarray) -> np.ndarray:
+    """
+    변동 행의 기간 × 배율을 일 단위로 내린다 (목표를 넘지 않도록). 나머지 행은 그대로.
+    배율 배열 → (배율 수, 행).
+    """
+    배율 = np.asarray(배율, dtype=float)
+    새기간 = np.broadcast_to(기간, (len(배율), len(기간))).copy()
+    새기간[:, 변동] = np.floor(기간[변동][None, :] * 배율[:, None] + 1e-9)
+    return 새기간
+
+
+def _기간_평가(분야: str, inputs, 기준표, 노임단가):
+    인일, 기간, is_technical, 항목 = 업무행렬(분야, inputs, 기준표)
+    변동 = 변동행(항목, is_technical)
+    단가 = engine._노임단가표(노임단가).직급별("건설" if 분야 == "조경" else "환경")
+
+    def f(배율):
+        계 = engine.인건비_행렬(인일[None, :, :], 단가, _배율_기간(기간, 배율, 변동))
+        직접인건비 = engine.업무합계(np.where(is_technical[None, :], 계, 0.0))
+        return engine.내역서_금액(직접인건비, inputs.요율)[-1]
+
+    def 행별(배율) -> Dict[int, int]:
+        새기간 = _배율_기간(기간, [배율], 변동)[0]
+        return {i: int(v) for i, v in enumerate(새기간) if 변동[i]}
+
+    return f, 행별
+
+
+def _요율_역산(변수: str, 직접인건비: float, 요율: engine.내역서요율, 목표: float, 범위):
+    """도급예정액은 요율에 대해 1차식이므로 양 끝 값으로 목표를 지나는 요율을 바로 구한다."""
+    하한, 상한 = 범위
+    직접인건비 = float(직접인건비)
+    끝값 = [engine.내역서_금액(직접인건비, replace(요율, **{변수: r}))[-1] for r in (하한, 상한)]
+    if 끝값[0] > 목표:
+        return 하한, 끝값[0], False, 2
+    if 끝값[1] <= 목표:
+        return 상한, 끝값[1], 끝값[1] == 목표, 2
+    r = 하한 + (목표 - 끝값[0]) / (끝값[1] - 끝값[0]) * (상한 - 하한)
+    값 = engine.내역서_금액(직접인건비, replace(요율, **{변수: r}))[-1]
+    평가 = 3
+    while 값 > 목표 and r > 하한:   # 부동소수 오차로 살짝 넘으면 한 ulp 씩 내린다
+        r = float(np.nextafter(r, 하한))
+        값 = engine.내역서_금액(직접인건비, replace(요율, **{변수: r}))[-1]
+        평가 += 1
+    return r, 값, True, 평가
+
+
+def _면적_역산(분야: str, f, 목표: float, 하한: float, 상한: float) -> 역산결과:
+    """
+    면적 범위를 환산계수 경계로 나눈 단조 구간을 위에서부터 찾는다. 목표 이하인 값이 있는
+    첫 구간의 최댓값이 범위 전체의 최댓값이다 (위 구간은 모두 하한부터 목표를 넘는다).
+    """
+    경계 = [b for b in 면적경계[분야] if 하한 < b < 상한]
+    구간들 = list(zip([하한, *(float(np.nextafter(b, np.inf)) for b in 경계)], [*경계, 상한]))
+    평가 = 0
+    for 구하, 구상 in reversed(구간들):
+        값, 금액, 도달, n = _최대값(f, 목표, 구하, 구상, 정밀도=0.01)
+        평가 += n
+        if 금액 <= 목표:
+            # 구간 끝까지 목표 이하여도, 바로 위 구간이 목표를 넘으면 범위 안의 답이다
+            return 역산결과("면적", 값, 금액, 목표, 도달 or 구상 < 상한, 평가, 구간=(구하, 구상))
+    return 역산결과("면적", 값, 금액, 목표, False, 평가, 구간=(구하, 구상))
+
+
+def _역산(분야: str, inputs, 기준표, 노임단가, 목표: float, 변수: str, 범위) -> 역산결과:
+    if 변수 not in 변수목록:
+        raise ValueError(f"역산할 수 없는 변수입니다: {변수}")
+    목표 = float(목표)
+
+    if 변수 in 법정범위:
+        if 분야 == "조경":
+            est = engine.price_조경(inputs, 기준표, 노임단가)
+        else:
+            est = engine.price_환경(inputs, engine.정리_환경_기준표(기준표), 노임단가)
+        값, 금액, 도달, 평가 = _요율_역산(
+            변수, est.직접인건비, inputs.요율, 목표, 범위 or 법정범위[변수]
+        )
+        return 역산결과(변수, 값, 금액, 목표, 도달, 평가 + 1)
+
+    하한, 상한 = 범위 or 기본범위[분야][변수]
+    if 변수 == "면적":
+        return _면적_역산(분야, _면적_평가(분야, inputs, 기준표, 노임단가), 목표, 하한, 상한)
+
+    f, 행별 = _기간_평가(분야, inputs, 기준표, 노임단가)
+    값, 금액, 도달, 평가 = _최대값(f, 목표, 하한, 상한, 정밀도=1e-6)
+    return 역산결과(변수, 값, 금액, 목표, 도달, 평가 + 1, 기간=행별(값))
+
+
+def 역산_조경(
+    inputs: engine.조경입력,
+    기준표,
+    노임단가,
+    목표: float,
+    변수: str = "면적",
+    범위: Optional[Tuple[float, float]] = None,
+) -> 역산결과:
+    """조경 입력에서 변수 하나만 바꿔 도급예정액이 목표 이하가 되는 가장 큰 값을 찾는다."""
+    return _역산("조경", inputs, 기준표, 노임단가, 목표, 변수, 범위)
+
+
+def 역산_환경(
+    inputs: engine.환경입력,
+    기준표,
+    노임단가,
+    목표: float,
+    변수: str = "면적",
+    범위: Optional[Tuple[float, float]] = None,
+) -> 역산결과:
+    """환경영향평가 입력(기준표는 시트 원본)에서 변수 하나만 바꿔 목표 이하 최댓값을 찾는다."""
+    return _역산("환경", inputs, 기준표, 노임단가, 목표, 변수, 범위)
@@ -0,0 +1,245 @@
+"""
+산출한 용역 저장소 (로컬 SQLite, Streamlit 비의존)
+
+용역 하나를 저장하면 입력값, 기준자료 버전, 산출 결과(산정기준 결과·투입인원 표·
+내역서 표·직접인건비·도급예정액)를 함께 남긴다. 불러올 때는 저장된 결과를 그대로
+돌려주므로 다시 계산하지 않는다.
+
+검색용 요약(발주기관명, 설계유형, 저장일시, 도급예정액 …)은 색인이 걸린 '용역' 표에,
+결과 객체는 '용역결과' 표에 따로 두어 수천 건을 검색해도 결과 BLOB 은 읽지 않는다.
+결과 객체는 pickle 로 저장한다. 이 앱이 쓰는 로컬 파일이므로 남이 만든 DB 는 열지 않는다.
+
+    db = store.EstimateStore()
+    id = db.save("조경", "OO공원", "OO시", inputs, est, {"노임단가": "2024…"})
+    db.search(발주기관명="OO시", 최소금액=1e8)
+    db.load(id).estimate.도급예정액
+"""
+import datetime as dt
+import json
+import os
+import pickle
+import sqlite3
+from contextlib import closing
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+import engine
+
+
+DEFAULT_PATH = Path(__file__).resolve().parent / "data" / "estimates.sqlite3"
+
+요약열 = ["id", "분야", "용역명", "발주기관명", "설계유형", "면적", "직접인건비", "도급예정액", "저장일시"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS 용역 (
+    id          INTEGER PRIMARY KEY,
+    분야        TEXT NOT NULL,
+    용역명      TEXT NOT NULL DEFAULT '',
+    발주기관명  TEXT NOT NULL DEFAULT '',
+    설계유형    TEXT NOT NULL,
+    면적        REAL NOT NULL,
+    직접인건비  REAL NOT NULL,
+    도급예정액  REAL NOT NULL,
+    저장일시    TEXT NOT NULL,
+    입력        TEXT NOT NULL,
+    기준자료    TEXT NOT NULL,
+    부가정보    TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS 용역_발주기관명 ON 용역 (발주기관명);
+CREATE INDEX IF NOT EXISTS 용역_설계유형 ON 용역 (설계유형);
+CREATE INDEX IF NOT EXISTS 용역_저장일시 ON 용역 (저장일시);
+CREATE INDEX IF NOT EXISTS 용역_도급예정액 ON 용역 (도급예정액);
+CREATE TABLE IF NOT EXISTS 용역결과 (
+    id      INTEGER PRIMARY KEY REFERENCES 용역 (id) ON DELETE CASCADE,
+    결과    BLOB NOT NULL
+);
+"""
+
+_입력타입 = {"조경": engine.조경입력, "환경": engine.환경입력}
+
+
+@dataclass
+class 저장용역:
+    id: int
+    분야: str
+    용역명: str
+    발주기관명: str
+    저장일시: str
+    inputs: object            # engine.조경입력 | engine.환경입력
+    기준자료: Dict[str, Optional[str]]   # 기준자료 이름 → 저장 당시 스냅샷 버전
+    estimate: engine.Estimate
+    부가정보: Dict[str, object]
+
+
+def default_path() -> Path:
+    """ESTIMATES_DB 가 있으면 그 경로, 없으면 data/estimates.sqlite3."""
+    return Path(os.environ.get("ESTIMATES_DB", DEFAULT_PATH))
+
+
+def _입력_json(inputs) -> str:
+    return json.dumps(asdict(inputs), ensure_ascii=False)
+
+
+def _입력_복원(분야: str, text: str):
+    값 = json.loads(text)
+    값["요율"] = engine.내역서요율(**값["요율"])
+    if 값.get("기간") is not None:
+        값["기간"] = {int(k): v for k, v in 값["기간"].items()}   # JSON 키는 문자열이 된다
+    return _입력타입[분야](**값)
+
+
+class EstimateStore:
+    """호출마다 연결을 새로 열어 세션 스레드에서 함께 써도 된다 (WAL 모드)."""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path is not None else default_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as con, con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        con = sqlite3.connect(self.path, timeout=30)
+        con.execute("PRAGMA foreign_keys=ON")
+        return con
+
+    def save(
+        self,
+        분야: str,
+        용역명: str,
+        발주기관명: str,
+        inputs,
+        estimate: engine.Estimate,
+        기준자료: Dict[str, Optional[str]],
+        부가정보: Optional[Dict[str, object]] = None,
+    ) -> int:
+        """용역 하나를 저장하고 id 를 돌려준다."""
+        if 분야 not in _입력타입:
+            raise ValueError(f"분야 값이 올바르지 않습니다: {분야}")
+        결과 = pickle.dumps(estimate, protocol=pickle.HIGHEST_PROTOCOL)
+        with closing(self._connect()) as con, con:
+            cur = con.execute(
+                "INSERT INTO 용역 (분야, 용역명, 발주기관명, 설계유형, 면적, 직접인건비, 도급예정액,"
+                " 저장일시, 입력, 기준자료, 부가정보) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    분야, 용역명 or "", 발주기관명 or "", inputs.설계유형, float(inputs.면적),
+                    float(estimate.직접인건비), float(estimate.도급예정액),
+                    dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    _입력_json(inputs),
+                    json.dumps(기준자료, ensure_ascii=False),
+                    json.dumps(부가정보 or {}, ensure_ascii=False),
+                ),
+            )
+            con.execute("INSERT INTO 용역결과 (id, 결과) VALUES (?, ?)", (cur.lastrowid, 결과))
+            return cur.lastrowid
+
+    def search(
+        self,
+        분야: Optional[str] = None,
+        발주기관명: Optional[str] = None,
+        설계유형: Optional[str] = None,
+        용역명: Optional[str] = None,
+        시작일: Optional[dt.date] = None,
+        종료일: Optional[dt.date] = None,
+        최소금액: Optional[float] = None,
+        최대금액: Optional[float] = None,
+        limit: int = 200,
+    ) -> pd.DataFrame:
+        """
+        조건에 맞는 용역 요약을 최근 저장 순으로. 발주기관명·설계유형은 같은 값,
+        용역명은 부분 일치, 날짜는 저장일 기준 양 끝 포함.
+        """
+        조건, 인자 = [], []
+        for 열, 값 in (("분야", 분야), ("발주기관명", 발주기관명), ("설계유형", 설계유형)):
+            if 값:
+                조건.append(f"{열} = ?")
+                인자.append(값)
+        if 용역명:
+            조건.append("용역명 LIKE ?")
+            인자.append(f"%{용역명}%")
+        if 시작일:
+            조건.append("저장일시 >= ?")
+            인자.append(f"{시작일:%Y-%m-%d}")
+        if 종료일:
+            조건.append("저장일시 < ?")
+            인자.append(f"{종료일 + dt.timedelta(days=1):%Y-%m-%d}")
+        if 최소금액 is not None:
+            조건.append("도급예정액 >= ?")
+            인자.append(float(최소금액))
+        if 최대금액 is not None:
+            조건.append("도급예정액 <= ?")
+            인자.append(float(최대금액))
+        sql = f"SELECT {', '.join(요약열)} FROM 용역"
+        if 조건:
+            sql += " WHERE " + " AND ".join(조건)
+        sql += " ORDER BY 저장일시 DESC, id DESC LIMIT ?"
+        with closing(self._connect()) as con:
+            return pd.read_sql_query(sql, con, params=[*인자, int(limit)])
+
+    def 발주기관목록(self, 분야: Optional[str] = None) -> list:
+        sql = "SELECT DISTINCT 발주기관명 FROM 용역 WHERE 발주기관명 != ''"
+        인자 = []
+        if 분야:
+            sql += " AND 분야 = ?"
+            인자.append(분야)
+        with closing(self._connect()) as con:
+            return [r[0] for r in con.execute(sql + " ORDER BY 발주기관명", 인자)]
+
+    def 기준자료_목록(self) -> pd.DataFrame:
+        """모든 용역의 id·분야·설계유형과 저장 당시 기준자료 버전(dict). 결과 BLOB 은 읽지 않는다."""
+        with closing(self._connect()) as con:
+            df = pd.read_sql_query("SELECT id, 분야, 설계유형, 기준자료 FROM 용역 ORDER BY id", con)
+        df["기준자료"] = df["기준자료"].map(json.loads)
+        return df
+
+    def update(self, 갱신목록: Iterable[Tuple[int, Dict[str, Optional[str]], Optional[engine.Estimate]]]):
+        """
+        (id, 기준자료, estimate) 들을 한 트랜잭션으로 고친다. estimate 가 None 이면
+        기준자료 버전만 바꾼다 (결과가 그대로인 용역). 저장일시는 그대로 둔다.
+        """
+        with closing(self._connect()) as con, con:
+            for id, 기준자료, estimate in 갱신목록:
+                con.execute(
+                    "UPDATE 용역 SET 기준자료 = ? WHERE id = ?",
+                    (json.dumps(기준자료, ensure_ascii=False), int(id)),
+                )
+                if estimate is None:
+                    continue
+                con.execute(
+                    "UPDATE 용역 SET 직접인건비 = ?, 도급예정액 = ? WHERE id = ?",
+                    (float(estimate.직접인건비), float(estimate.도급예정액), int(id)),
+                )
+                con.execute(
+                    "UPDATE 용역결과 SET 결과 = ? WHERE id = ?",
+                    (pickle.dumps(estimate, protocol=pickle.HIGHEST_PROTOCOL), int(id)),
+                )
+
+    def load(self, id: int) -> 저장용역:
+        """저장한 입력값과 산출 결과를 그대로 돌려준다. 없는 id 는 KeyError."""
+        with closing(self._connect()) as con:
+            row = con.execute(
+                "SELECT 용역.id, 분야, 용역명, 발주기관명, 저장일시, 입력, 기준자료, 부가정보, 결과"
+                " FROM 용역 JOIN 용역결과 USING (id) WHERE 용역.id = ?",
+                (int(id),),
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"저장된 용역이 없습니다: {id}")
+        id, 분야, 용역명, 발주기관명, 저장일시, 입력, 기준자료, 부가정보, 결과 = row
+        return 저장용역(
+            id=id,
+            분야=분야,
+            용역명=용역명,
+            발주기관명=발주기관명,
+            저장일시=저장일시,
+            inputs=_입력_복원(분야, 입력),
+            기준자료=json.loads(기준자료),
+            estimate=pickle.loads(결과),
+            부가정보=json.loads(부가정보),
+        )
+
+    def delete(self, id: int):
+        with closing(self._connect()) as con, con:
+            con.execute("DELETE FROM 용역 WHERE id = ?", (int(id),))
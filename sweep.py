@@ -0,0 +1,163 @@
+"""
+면적 · 보기 조합 격자 민감도 분석 (Streamlit 비의존)
+
+면적 여러 개와 범주형 보기(설계유형, 대상지 성격·난이도, 전단계 활용 / 보정 답변)의
+모든 조합을 기준표 → 산정기준 → 투입인원 → 도급예정액 까지 한 번에 산출한다.
+격자 점마다 화면 코드를 돌지 않고, 조합 k 개를 (k, 행, 직급) 배열 하나로 쌓아
+engine 의 행렬 함수로 계산하므로 수천 점도 1초 안에 끝난다.
+값은 price_조경() / price_환경() 을 점마다 부른 결과와 같다 (기간은 기본값 또는
+모든 점에 같은 기간값). 비교_조경() 은 세 설계유형을 같은 입력으로 나란히 산출한다.
+
+    df = sweep.sweep_조경({"실시설계": 기준표}, wage, 면적=np.linspace(1000, 20000, 200),
+                          성격_난이도=[("도시공원", 난이도_map["도시공원"][1])])
+    df.pivot(index="면적", columns="난이도", values="도급예정액")
+"""
+import itertools
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+import engine
+
+
+조경_결과열 = ["설계유형", "대상지_성격", "난이도", "전단계_활용", "면적", "직접인건비", "도급예정액"]
+환경_결과열 = ["설계유형", *engine.보정_질문, "면적", "직접인건비", "도급예정액"]
+
+
+def _격자(*크기: int) -> Tuple[np.ndarray, ...]:
+    """축 크기들의 모든 조합 번호 (앞 축이 바깥쪽). 길이 Π크기 배열들."""
+    return tuple(g.reshape(-1) for g in np.meshgrid(*[np.arange(n) for n in 크기], indexing="ij"))
+
+
+def _기간(기본: Sequence[int], 기간값: Optional[Dict[int, int]]) -> np.ndarray:
+    기간값 = 기간값 or {}
+    return np.array([기간값.get(i, v) for i, v in enumerate(기본)], dtype=float)
+
+
+# ─── 조경 ───
+def sweep_조경(
+    기준표: Dict[str, pd.DataFrame],
+    노임단가,
+    면적: Sequence[float],
+    성격_난이도: Optional[Sequence[Tuple[str, str]]] = None,
+    전단계_활용: Sequence[bool] = (False,),
+    요율: Optional[engine.내역서요율] = None,
+    기간: Optional[Dict[int, int]] = None,
+) -> pd.DataFrame:
+    """
+    기준표(설계유형 → 기준표) × 성격_난이도 × 전단계_활용 × 면적 격자의 산출 결과 표.
+    성격_난이도를 주지 않으면 모든 (대상지 성격, 난이도) 쌍을 쓴다.
+    """
+    면적 = np.asarray(면적, dtype=float).reshape(-1)
+    if 성격_난이도 is None:
+        성격_난이도 = [(성격, nd) for 성격, opts in engine.난이도_map.items() for nd in opts]
+    요율 = 요율 or engine.내역서요율()
+    단가 = engine._노임단가표(노임단가).직급별("건설")
+
+    환산 = engine.환산계수_조경(면적)
+    보정 = np.array([a2 * a3 for a2, a3 in (engine.보정계수_조경(*p) for p in 성격_난이도)])
+    전단계 = np.asarray(전단계_활용, dtype=bool)
+    p, j, a = _격자(len(성격_난이도), len(전단계), len(면적))
+
+    조각 = []
+    for 설계유형, 표 in 기준표.items():
+        # 행 구성(업무행·마스크·기본 기간)은 면적·보정과 무관하므로 한 번만 구한다
+        견본 = engine.산정기준_조경(표, 면적[0], *성격_난이도[0])
+        인일 = engine.투입인원_행렬_조경(견본.base, 견본.마스크, 환산[a], 보정[p], 전단계[j])
+        계 = engine.인건비_행렬(
+            인일[:, 견본.업무행, :], 단가,
+            _기간([v for _, v in engine.기간항목_조경(견본)], 기간),
+        )
+        직접인건비 = engine.업무합계(계)
+        조각.append(pd.DataFrame({
+            "설계유형": 설계유형,
+            "대상지_성격": [성격_난이도[i][0] for i in p],
+            "난이도": [성격_난이도[i][1] for i in p],
+            "전단계_활용": 전단계[j],
+            "면적": 면적[a],
+            "직접인건비": 직접인건비,
+            "도급예정액": engine.내역서_금액(직접인건비, 요율)[-1],
+        }))
+    if not 조각:
+        return pd.DataFrame(columns=조경_결과열)
+    return pd.concat(조각, ignore_index=True)[조경_결과열]
+
+
+분리발주 = "기본설계 + 실시설계"
+
+
+def 비교_조경(
+    기준표: Dict[str, pd.DataFrame],
+    노임단가,
+    inputs: engine.조경입력,
+) -> pd.DataFrame:
+    """
+    설계유형(기준표 키)마다 같은 면적·성격·난이도·요율로 산출한 직접인건비·도급예정액 표.
+    기본설계·실시설계가 모두 있으면 둘을 나눠 발주할 때의 합계 행을 덧붙인다.
+    inputs.기간은 inputs.설계유형의 행 구성에 맞춘 값이므로 그 유형에만 쓰고, 나머지는 기본 기간.
+    """
+    행 = [
+        sweep_조경(
+            {설계유형: 표}, 노임단가, [inputs.면적],
+            [(inputs.대상지_성격, inputs.난이도)], [inputs.전단계_활용],
+            inputs.요율, inputs.기간 if 설계유형 == inputs.설계유형 else None,
+        )
+        for 설계유형, 표 in 기준표.items()
+    ]
+    결과 = pd.concat(행, ignore_index=True)[["설계유형", "직접인건비", "도급예정액"]]
+    # 용역비는 발주 건마다 천 원 미만을 버린다 (갑지와 같다)
+    결과["용역비"] = engine.용역비(결과["도급예정액"])
+    if {"기본설계", "실시설계"} <= set(결과["설계유형"]):
+        분리 = 결과[결과["설계유형"].isin(["기본설계", "실시설계"])]
+        결과.loc[len(결과)] = [분리발주, *분리[["직접인건비", "도급예정액", "용역비"]].sum()]
+        결과["용역비"] = 결과["용역비"].astype("int64")
+    return 결과
+
+
+# ─── 환경영향평가 ───
+def sweep_환경(
+    기준표: pd.DataFrame,
+    노임단가,
+    면적: Sequence[float],
+    보정: Optional[Dict[str, Sequence[str]]] = None,
+    요율: Optional[engine.내역서요율] = None,
+    기간: Optional[Dict[int, int]] = None,
+    설계유형: str = "소규모 환경영향평가 대행",
+) -> pd.DataFrame:
+    """
+    보정 답변 조합 × 면적 격자의 산출 결과 표. 기준표는 시트 원본(정리 전)이다.
+    보정에 없는 질문은 첫 번째 보기 하나만 쓴다.
+    """
+    면적 = np.asarray(면적, dtype=float).reshape(-1)
+    보정 = 보정 or {}
+    보기 = [list(보정.get(key) or opts[:1]) for key, opts in engine.보정_질문.items()]
+    답변 = list(itertools.product(*보기))
+    요율 = 요율 or engine.내역서요율()
+    단가 = engine._노임단가표(노임단가).직급별("환경")
+
+    정리 = engine.정리_환경_기준표(기준표)
+    견본 = engine.산정기준_환경(정리, 면적[0], *답변[0])
+    α1 = engine.환산계수_환경(engine.규칙번호_환경(정리)[None, :], 면적[:, None])
+    계수 = np.array([engine.보정계수_환경(*q) for q in 답변])
+    q, a = _격자(len(답변), len(면적))
+
+    base = np.where(견본.유효, 견본.base, 0.0)
+    인일 = engine.투입인원_행렬_환경(base, α1[a], 견본.보정마스크, 계수[q])
+    인일 = np.where(견본.유효, 인일, 0.0)[:, 견본.업무행, :]
+
+    # 기술인력이 없는 행은 기간 0, 계 0 (투입인원_환경 과 같다)
+    is_technical = 인일.sum(axis=2) > 0
+    기간값 = _기간(np.ones(인일.shape[1], dtype=int), 기간)
+    기간표 = np.where(is_technical, 기간값, 0.0)
+    계 = np.where(is_technical, engine.인건비_행렬(인일, 단가, 기간표), 0.0)
+    직접인건비 = engine.업무합계(계)
+
+    결과 = pd.DataFrame({
+        "설계유형": [설계유형] * len(q),
+        **{key: [답변[i][n] for i in q] for n, key in enumerate(engine.보정_질문)},
+        "면적": 면적[a],
+        "직접인건비": 직접인건비,
+        "도급예정액": engine.내역서_금액(직접인건비, 요율)[-1],
+    })
+    return 결과[환경_결과열]
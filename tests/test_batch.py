@@ -0,0 +1,73 @@
+"""run_batch() 가 성공·실패 용역을 나눠 요약과 ZIP 을 만드는지."""
+import datetime as dt
+import zipfile
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import batch
+import refdata
+
+
+기준자료 = {
+    "노임단가": """ 직종명 ,건설,환경
+기술사,"308,966","361,124"
+특급기술자,"246,879","434,829"
+고급기술자,"221,523","371,568"
+중급기술자,"252,925","485,330"
+초급기술자,"410,645","237,920"
+""",
+    "손해보험요율": """공사종류,요율1,요율2
+관람집회,0.432,0.1
+""",
+    "환경_소규모 환경영향평가 대행": """업무구분,단위,기술사,특급기술자,고급기술자,중급기술자,초급기술자,환산계수,보정계수(가),보정계수(나),보정계수(다),보정계수(라)
+1. 조사,,,,,,,,,,,
+1.0 현황조사,일,0.5,2.5,1,0.5,0,2,,반영,,
+1.1 주민의견,식,0,0.5,0,1,2.5,,반영,반영,반영,반영
+""",
+}
+조경_기준표 = """업무구분,단위,기술사,특급기술자,고급기술자,중급기술자,초급기술자,환산계수(α₁),"보정계수(α₂, α₃)"
+1. 사전조사,,,,,,,,
+1.1 현황조사,일,0.5,2.25,0,1,0,미적용,미적용
+1.2 자료분석,일,1.5,3,1.5,0.5,0,적용,적용
+주민설명회 개최,일,3,1,3,3,2.25,미적용,적용
+"""
+for _설계유형 in ("기본설계", "실시설계", "기본 및 실시설계"):
+    기준자료[f"조경_{_설계유형}"] = 조경_기준표
+
+
+@pytest.fixture
+def 기준(tmp_path, monkeypatch):
+    """기준자료 원본 디렉터리와 빈 스냅샷 저장소를 tmp_path 에 두고, 템플릿이 있는 저장소 루트에서 실행한다."""
+    source = tmp_path / "source"
+    source.mkdir()
+    for name in refdata.SOURCES:
+        (source / f"{name}.csv").write_text(기준자료[name], encoding="utf-8")
+    monkeypatch.setenv("REFDATA_SOURCE_DIR", str(source))
+    monkeypatch.setenv("REFDATA_DIR", str(tmp_path / "snapshots"))
+    monkeypatch.chdir(Path(__file__).resolve().parent.parent)
+
+
+def test_run_batch_성공과_실패를_나눈다(기준, tmp_path):
+    목록 = tmp_path / "용역목록.csv"
+    목록.write_text(
+        "용역명,발주기관명,설계유형,면적,대상지 성격,난이도,기간\n"
+        'OO공원 조성,OO시,기본설계,"12,000",도시공원,보통,1=3\n'
+        "잘못된 용역,OO시,없는유형,1000,,,\n",
+        encoding="utf-8-sig",
+    )
+    buf, df_요약 = batch.run_batch(batch.read_projects(목록), workers=1, today=dt.date(2026, 3, 2))
+
+    assert df_요약["순번"].tolist() == [1, 2]
+    성공, 실패 = df_요약.iloc[0], df_요약.iloc[1]
+    assert 성공["오류"] == "" and 성공["도급예정액"] > 0
+    assert 성공["파일"] == "001_OO공원_조성_조경설계 내역서.xlsx"
+    assert 실패["오류"] == "ValueError: 설계유형 값이 올바르지 않습니다: 없는유형"
+    assert batch.합계행(df_요약)["오류"].iloc[0] == "성공 1건 · 실패 1건"
+
+    with zipfile.ZipFile(buf) as zf:
+        assert sorted(zf.namelist()) == sorted([성공["파일"], "요약.xlsx"])
+        요약 = pd.read_excel(zf.open("요약.xlsx"), dtype={"오류": str})
+    assert 요약["용역명"].iloc[-1] == "합계"
+    assert 요약["오류"].iloc[-1] == "성공 1건 · 실패 1건"
@@ -0,0 +1,49 @@
+"""캐시를 쓰는 과업지시서 렌더링이 docxtpl 을 그대로 쓴 결과와 같은지."""
+import datetime as dt
+import zipfile
+from io import BytesIO
+
+import pytest
+from docxtpl import DocxTemplate
+from jinja2 import TemplateError
+
+import export
+
+
+def _그대로(context, template_path=export.DIRECTIVE_TEMPLATE):
+    tpl = DocxTemplate(template_path)
+    tpl.render(context)
+    buf = BytesIO()
+    tpl.save(buf)
+    return buf
+
+
+def _파트(docx):
+    # ZIP 항목의 수정시각은 저장 시각이라 컨테이너 대신 파트 이름·순서·바이트를 비교한다
+    with zipfile.ZipFile(docx) as zf:
+        return [(info.filename, zf.read(info)) for info in zf.infolist()]
+
+
+@pytest.mark.parametrize("면적, 기간", [(1234.5, 90), (250000, 365)])
+def test_render_directive_바이트가_같다(면적, 기간):
+    context = export.directive_context("OO공원 조성", "OO시", "OO동 일원", 면적, 기간, dt.date(2026, 3, 2))
+    # 두 번째 호출은 캐시에서 꺼낸 전처리·컴파일 결과로 렌더링한다
+    for _ in range(2):
+        assert _파트(export.render_directive(context)) == _파트(_그대로(context))
+
+
+def test_render_directive_템플릿_오류는_docx_context를_단다(tmp_path):
+    doc = DocxTemplate(export.DIRECTIVE_TEMPLATE).get_docx()
+    doc.add_paragraph("{{ 용역명 ")
+    path = tmp_path / "broken.docx"
+    doc.save(path)
+    context = export.directive_context("OO공원", "OO시", "OO동", 1000, 30)
+    with pytest.raises(TemplateError) as info:
+        export.render_directive(context, template_path=str(path))
+    assert hasattr(info.value, "docx_context")
+
+
+def test_render_directives_zip_이름():
+    contexts = [export.directive_context(f"용역{i}", "OO시", "OO동", 1000, 30) for i in range(2)]
+    with zipfile.ZipFile(export.render_directives(contexts)) as zf:
+        assert zf.namelist() == ["001_용역0_과업지시서.docx", "002_용역1_과업지시서.docx"]
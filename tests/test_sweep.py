@@ -0,0 +1,78 @@
+"""sweep 격자의 점마다 값이 price_조경() / price_환경() 단건 산출과 비트까지 같은지."""
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import engine
+import sweep
+
+
+조경_기준표 = """업무구분,단위,기술사,특급기술자,고급기술자,중급기술자,초급기술자,환산계수(α₁),"보정계수(α₂, α₃)"
+1. 사전조사,,,,,,,,
+1.1 현황조사,일,0.5,2.25,0,1,0,미적용,미적용
+1.2 자료분석,일,1.5,3,1.5,0.5,0,미적용,적용
+위원회 심의,일,1.5,1.5,2.25,0,3,미적용,미적용
+1.4 기본구상,식,3,0.5,2.25,0,1,적용,적용
+조사,일,0,3,2.25,0,1.5,적용,미적용
+2. 설계,,,,,,,,
+2.1 기본계획 검토,일,1,2,3,0,1.5,적용,적용
+2.2 도면작성,일,1.5,2.25,3,0,0.5,미적용,적용
+주민설명회 개최,일,3,1,3,3,2.25,미적용,적용
+2.4 수량산출,식,1,1,2.25,1.5,2.25,미적용,적용
+2.5 시방서,일,2.25,3,3,3,1,적용,미적용
+"""
+
+환경_기준표 = """업무구분,단위,기술사,특급기술자,고급기술자,중급기술자,초급기술자,환산계수,보정계수(가),보정계수(나),보정계수(다),보정계수(라)
+1. 조사,,,,,,,,,,,
+1.0 현황조사,일,0.5,2.5,1,0.5,0,2,,반영,,
+1.1 주민의견,식,0,0.5,0,1,2.5,,반영,반영,반영,반영
+1.2 대기질,식,0,0,0,2.5,0,3,,,,
+1.3 수질,일,0,0.5,0,2.5,1,1,,반영,,반영
+1.4 소음진동,인,1,0,0,0.5,0,,반영,반영,반영,
+1.5 경관,식,0,0,0,0,0,3,반영,반영,,반영
+1.6 동식물상,일,2.5,0,0,1,0,2,반영,,반영,반영
+"""
+
+노임단가 = """직종명,건설,환경
+기술사,"308,966","361,124"
+특급기술자,"246,879","434,829"
+고급기술자,"221,523","371,568"
+중급기술자,"252,925","485,330"
+초급기술자,"410,645","237,920"
+"""
+
+
+@pytest.fixture(scope="module")
+def 단가():
+    return engine.노임단가표.from_frame(pd.read_csv(StringIO(노임단가)))
+
+
+def test_환산계수_조경_스칼라와_같다():
+    면적 = np.linspace(100, 40000, 2000)
+    기대 = [(a / 5000) ** (0.7 if a <= 5000 else 0.4) for a in 면적.tolist()]
+    assert engine.환산계수_조경(면적).tolist() == 기대
+
+
+def test_sweep_조경_단건과_같다(단가):
+    기준표 = pd.read_csv(StringIO(조경_기준표))
+    면적 = np.linspace(100, 40000, 200)
+    결과 = sweep.sweep_조경({"기본설계": 기준표}, 단가, 면적, 전단계_활용=[False, True])
+    for r in 결과.sample(400, random_state=0).itertuples(index=False):
+        est = engine.price_조경(
+            engine.조경입력("기본설계", r.면적, r.대상지_성격, r.난이도, bool(r.전단계_활용)),
+            기준표, 단가,
+        )
+        assert (est.직접인건비, est.도급예정액) == (r.직접인건비, r.도급예정액), r
+
+
+def test_sweep_환경_단건과_같다(단가):
+    기준표 = pd.read_csv(StringIO(환경_기준표))
+    면적 = np.linspace(1000, 2_000_000, 200)
+    보정 = {key: opts for key, opts in engine.보정_질문.items()}
+    결과 = sweep.sweep_환경(기준표, 단가, 면적, 보정)
+    for r in 결과.sample(400, random_state=0).itertuples(index=False):
+        답변 = [getattr(r, key) for key in engine.보정_질문]
+        est = engine.price_환경(engine.환경입력(r.설계유형, r.면적, *답변), 기준표, 단가)
+        assert (est.직접인건비, est.도급예정액) == (r.직접인건비, r.도급예정액), r
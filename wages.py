@@ -0,0 +1,181 @@
+"""
+연도별 노임단가 이력 (Streamlit 비의존)
+
+노임단가 시트는 해마다(때로는 반기마다) 바뀐다. 적용일마다 시트 한 벌을 두고
+(적용일, 직종명, 분야) 로 단가를 찾는 시계열을 만든다. 이력은 두 곳에서 모은다.
+
+- data/wages/<적용일 YYYY-MM-DD>.csv (WAGE_HISTORY_DIR): 지난해 시트처럼 직접 넣은 것.
+  게시 시트와 같은 모양(직종명 열 + 분야 열)이다.
+- refdata 의 노임단가 스냅샷: 받아온 날짜를 적용일로 본다. 새로고침으로 단가가 바뀔 때마다
+  이력이 저절로 늘어난다.
+
+단가가 바로 앞 적용일과 같은 항목은 빼고, 같은 날짜에 둘 다 있으면 직접 넣은 파일을 쓴다.
+
+산정기준 결과 하나를 여러 버전 단가로 다시 합산할 때는 (버전, 직급) 단가 행렬과
+(행, 직급) 인·일을 engine.인건비_행렬 한 번으로 곱해 (버전, 행) 계를 얻는다.
+버전마다 값은 그 단가로 price_조경() / price_환경() 을 부른 것과 같다.
+
+    python wages.py add 2024년_노임단가.csv --from 2024-01-01
+    python wages.py list
+    이력 = wages.load()
+    wages.시점별("조경", 기준결과, 기간값, 이력, 요율)
+"""
+import bisect
+import datetime as dt
+import os
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+import engine
+import refdata
+import solver
+from engine import 직급리스트
+
+
+DEFAULT_DIR = Path(__file__).resolve().parent / "data" / "wages"
+
+단가분야 = {"조경": "건설", "환경": "환경"}
+
+
+@dataclass(frozen=True)
+class 노임단가이력:
+    적용일: Tuple[dt.date, ...]              # 오름차순
+    표: Tuple[engine.노임단가표, ...]
+    출처: Tuple[str, ...]                    # 파일 이름 또는 스냅샷 버전
+
+    def 시점(self, 날짜: dt.date) -> int:
+        """날짜에 적용되는 버전 번호 (적용일 ≤ 날짜 인 마지막). 첫 적용일보다 이르면 KeyError."""
+        i = bisect.bisect_right(self.적용일, 날짜) - 1
+        if i < 0:
+            raise KeyError(f"{날짜} 에 적용할 노임단가가 없습니다 (첫 적용일 {self.적용일[0]})")
+        return i
+
+    def 노임단가(self, 날짜: Optional[dt.date] = None) -> engine.노임단가표:
+        """날짜에 적용되는 단가표. 날짜를 주지 않으면 가장 최근 것."""
+        return self.표[-1 if 날짜 is None else self.시점(날짜)]
+
+    def 직급행렬(self, 분야: str) -> np.ndarray:
+        """(버전, 직급) 단가. 분야 열이 없는 버전이 있으면 KeyError."""
+        return np.array([[표.get(직급, 분야) for 직급 in 직급리스트] for 표 in self.표])
+
+    def to_frame(self) -> pd.DataFrame:
+        """(적용일, 직종명, 분야) → 단가 긴 표."""
+        행 = [
+            (적용일, 직종명, 분야, 단가)
+            for 적용일, 표 in zip(self.적용일, self.표)
+            for (직종명, 분야), 단가 in 표.단가.items()
+        ]
+        df = pd.DataFrame(행, columns=["적용일", "직종명", "분야", "단가"])
+        return df.set_index(["적용일", "직종명", "분야"]).sort_index()
+
+
+# ─── 이력 파일 ───
+def default_dir() -> Path:
+    """WAGE_HISTORY_DIR 이 있으면 그 경로, 없으면 data/wages."""
+    return Path(os.environ.get("WAGE_HISTORY_DIR", DEFAULT_DIR))
+
+
+def _읽기(data: bytes) -> engine.노임단가표:
+    return engine.노임단가표.from_frame(pd.read_csv(BytesIO(data)))
+
+
+def _스냅샷_날짜(version: str) -> dt.date:
+    return dt.datetime.strptime(version[:8], "%Y%m%d").date()
+
+
+def add(data: bytes, 적용일: dt.date, root=None) -> Path:
+    """시트 CSV 바이트를 적용일 이력으로 넣는다. 같은 적용일 파일은 바꿔 쓴다."""
+    _읽기(data)   # 직종명 열이 없는 등 읽을 수 없는 시트는 넣지 않는다
+    root = Path(root) if root is not None else default_dir()
+    root.mkdir(parents=True, exist_ok=True)
+    path = root / f"{적용일:%Y-%m-%d}.csv"
+    tmp = root / f".{path.name}.tmp"
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return path
+
+
+def 이력_키(root=None, store: Optional[refdata.SnapshotStore] = None) -> tuple:
+    """이력을 이루는 파일과 스냅샷 목록. 바뀌었을 때만 load() 를 다시 부르는 캐시 키로 쓴다."""
+    root = Path(root) if root is not None else default_dir()
+    store = store or refdata.default_store()
+    파일 = tuple(sorted((p.name, p.stat().st_mtime_ns) for p in root.glob("*.csv"))) if root.is_dir() else ()
+    return 파일, tuple(store.versions("노임단가"))
+
+
+def load(root=None, store: Optional[refdata.SnapshotStore] = None) -> 노임단가이력:
+    """이력 파일과 노임단가 스냅샷을 적용일 순으로 모은다. 하나도 없으면 FileNotFoundError."""
+    root = Path(root) if root is not None else default_dir()
+    store = store or refdata.default_store()
+    항목 = []   # (적용일, 우선순위, 출처, 단가표)
+    if root.is_dir():
+        for path in root.glob("*.csv"):
+            항목.append((dt.date.fromisoformat(path.stem), 0, path.name, _읽기(path.read_bytes())))
+    for version in store.versions("노임단가"):
+        항목.append((_스냅샷_날짜(version), 1, version, _읽기(store.read_bytes("노임단가", version))))
+    항목.sort(key=lambda x: (x[0], x[1]))
+
+    정리 = []
+    for 적용일, _, 출처, 표 in 항목:
+        if 정리 and 정리[-1][0] == 적용일:
+            continue
+        if 정리 and dict(정리[-1][2].단가) == dict(표.단가):
+            continue
+        정리.append((적용일, 출처, 표))
+    if not 정리:
+        raise FileNotFoundError("노임단가 이력이 없습니다")
+    적용일, 출처, 표 = zip(*정리)
+    return 노임단가이력(적용일=tuple(적용일), 표=tuple(표), 출처=tuple(출처))
+
+
+# ─── 버전별 재합산 ───
+def 시점별(
+    분야: str,
+    기준결과: engine.산정결과,
+    기간값: Optional[Dict[int, int]],
+    이력: 노임단가이력,
+    요율: Optional[engine.내역서요율] = None,
+    날짜: Optional[Sequence[dt.date]] = None,
+) -> pd.DataFrame:
+    """
+    산정기준 결과 하나의 투입인원을 이력의 모든 버전 단가로 다시 합산한 표
+    (적용일, 직접인건비, 도급예정액). 날짜를 주면 날짜마다 그때 적용되는 버전으로 한 행씩.
+    """
+    인일, 기간, is_technical, _ = solver.업무배열(분야, 기준결과, 기간값)
+    단가 = 이력.직급행렬(단가분야[분야])
+    번호 = list(range(len(이력.적용일))) if 날짜 is None else [이력.시점(d) for d in 날짜]
+    계 = engine.인건비_행렬(인일[None, :, :], 단가[번호][:, None, :], 기간)
+    직접인건비 = engine.업무합계(np.where(is_technical[None, :], 계, 0.0))
+    결과 = pd.DataFrame({
+        "적용일": [이력.적용일[i] for i in 번호],
+        "직접인건비": 직접인건비,
+        "도급예정액": engine.내역서_금액(직접인건비, 요율 or engine.내역서요율())[-1],
+    })
+    if 날짜 is not None:
+        결과.insert(0, "날짜", list(날짜))
+    return 결과
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="연도별 노임단가 이력")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_add = sub.add_parser("add", help="시트 CSV 를 적용일 이력으로 넣는다")
+    p_add.add_argument("csv", help="노임단가 시트 CSV (게시 시트와 같은 모양)")
+    p_add.add_argument("--from", dest="적용일", required=True, type=dt.date.fromisoformat,
+                       help="적용일 YYYY-MM-DD")
+    sub.add_parser("list", help="적용일 목록")
+    args = parser.parse_args()
+
+    if args.cmd == "add":
+        print(add(Path(args.csv).read_bytes(), args.적용일))
+    else:
+        이력 = load()
+        for 적용일, 출처 in zip(이력.적용일, 이력.출처):
+            print(f"{적용일}  {출처}")